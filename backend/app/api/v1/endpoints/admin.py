@@ -0,0 +1,279 @@
+"""
+Unified Backend Platform - Admin Endpoints
+
+运维管理 API 端点
+"""
+from fastapi import APIRouter, Query, status
+
+from app.api.v1.schemas.admin import (
+    AppRecordStats,
+    CollectionRecordStats,
+    IndexDriftReport,
+    QueryExplainResult,
+    QueryShapeReport,
+    RecordPartitionRoute,
+)
+from app.core.permissions import RequireSuperuser
+from app.db.index_manager import index_manager
+from app.db.mongodb import mongodb
+from app.services.loop_lag_service import LoopLagSnapshot, loop_lag_monitor
+from app.services.query_planner_service import query_planner
+from app.services.record_partition_service import record_partitions
+from app.services.record_stats_service import record_stats
+from app.services.retention_service import retention_service
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+# 扫描文档数超过返回数的倍数时视为低效
+INEFFICIENT_SCAN_RATIO = 10
+
+
+# =============================================================================
+# Query Planner Endpoints - 慢查询与索引建议
+# =============================================================================
+
+@router.get(
+    "/query-stats",
+    response_model=list[QueryShapeReport],
+    summary="慢查询形态与索引建议",
+)
+async def get_query_stats(
+    current_user: RequireSuperuser,
+    limit: int = Query(10, ge=1, le=100, description="返回形态数量"),
+    explain: bool = Query(True, description="是否对样本查询执行 explain()"),
+) -> list[QueryShapeReport]:
+    """
+    按平均耗时返回最慢的列表查询形态
+
+    - 统计来自当前 worker 进程
+    - explain=true 时对每个形态的最近一次查询执行 explain()
+    - 存在内存排序、全集合扫描或扫描量远大于返回量时给出建议索引
+
+    需要超级管理员权限
+    """
+    reports = []
+
+    for stats in query_planner.slowest_shapes(limit):
+        plan = stats.plan
+        report = QueryShapeReport(
+            collection=plan.collection,
+            filter_fields=list(plan.filter_fields),
+            has_search=plan.has_search,
+            sort=plan.sort,
+            supporting_index=list(plan.index) if plan.index else None,
+            count=stats.count,
+            avg_ms=round(stats.avg_ms, 3),
+            max_ms=round(stats.max_ms, 3),
+        )
+
+        needs_index = plan.index is None
+        if explain:
+            try:
+                report.explain = QueryExplainResult(**await query_planner.explain(stats))
+            except Exception as e:
+                report.explain_error = str(e)
+            else:
+                scanned = report.explain.docs_examined or 0
+                returned = max(report.explain.n_returned or 0, 1)
+                needs_index = (
+                    report.explain.blocking_sort
+                    or report.explain.collection_scan
+                    or scanned > returned * INEFFICIENT_SCAN_RATIO
+                )
+
+        if needs_index:
+            report.suggested_index = query_planner.suggest_index(plan)
+
+        reports.append(report)
+
+    return reports
+
+
+@router.delete(
+    "/query-stats",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="清空查询统计",
+)
+async def reset_query_stats(current_user: RequireSuperuser) -> None:
+    """
+    清空当前 worker 的查询形态统计
+
+    需要超级管理员权限
+    """
+    query_planner.reset()
+
+
+# =============================================================================
+# Index Endpoints - 索引对账
+# =============================================================================
+
+@router.get(
+    "/indexes",
+    response_model=list[IndexDriftReport],
+    summary="索引漂移报告",
+)
+async def get_index_drift(current_user: RequireSuperuser) -> list[IndexDriftReport]:
+    """
+    对比数据库实际索引与 app.db.indexes 中的声明
+
+    只读；修复请执行 scripts/reconcile_indexes.py
+
+    需要超级管理员权限
+    """
+    report = await index_manager.diff(await mongodb.get_database())
+    return [
+        IndexDriftReport(collection=collection, **result)
+        for collection, result in report.items()
+    ]
+
+
+# =============================================================================
+# Retention Endpoints - 软删除数据归档
+# =============================================================================
+
+@router.post(
+    "/retention/run",
+    response_model=dict[str, int],
+    summary="立即执行软删除数据归档",
+)
+async def run_retention(current_user: RequireSuperuser) -> dict[str, int]:
+    """
+    立即执行一次归档 (不等待定时任务)
+
+    返回每个集合移入归档集合的文档数
+
+    需要超级管理员权限
+    """
+    return await retention_service.run_once(use_lock=False)
+
+
+# =============================================================================
+# Partition Endpoints - 记录分区路由
+# =============================================================================
+
+@router.get(
+    "/partitions",
+    response_model=list[RecordPartitionRoute],
+    summary="记录分区路由表",
+)
+async def list_record_partitions(current_user: RequireSuperuser) -> list[RecordPartitionRoute]:
+    """
+    列出拥有独立集合的应用及迁移进度
+
+    只读；创建分区和迁移请执行 scripts/partition_records.py
+
+    需要超级管理员权限
+    """
+    return [
+        RecordPartitionRoute(
+            app_identifier=route.app_identifier,
+            collection_name=route.collection_name,
+            status=route.status.value,
+            migrated_count=route.migrated_count,
+            created_at=route.created_at,
+            activated_at=route.activated_at,
+        )
+        for route in await record_partitions.list_routes()
+    ]
+
+
+# =============================================================================
+# Record Stats Endpoints - 记录统计
+# =============================================================================
+
+@router.get(
+    "/record-stats",
+    response_model=list[AppRecordStats],
+    summary="按应用的记录统计",
+)
+async def get_record_stats(
+    current_user: RequireSuperuser,
+    app_identifier: str | None = Query(None, description="应用标识符"),
+) -> list[AppRecordStats]:
+    """
+    返回每个应用的记录数、已发布数、存储字节数和最后写入时间 (含按数据类型的明细)
+
+    读取物化的统计集合，不扫描记录；写入时增量更新，定时对账修正
+
+    需要超级管理员权限
+    """
+    apps: dict[str, AppRecordStats] = {}
+    for stats in await record_stats.list_stats(app_identifier):
+        app = apps.get(stats.app_identifier)
+        if app is None:
+            app = apps[stats.app_identifier] = AppRecordStats(
+                app_identifier=stats.app_identifier,
+                record_count=0,
+                published_count=0,
+                storage_bytes=0,
+                reconciled_at=stats.reconciled_at,
+            )
+        app.record_count += stats.record_count
+        app.published_count += stats.published_count
+        app.storage_bytes += stats.storage_bytes
+        if stats.last_activity_at and (
+            app.last_activity_at is None or stats.last_activity_at > app.last_activity_at
+        ):
+            app.last_activity_at = stats.last_activity_at
+        if app.reconciled_at and (
+            stats.reconciled_at is None or stats.reconciled_at < app.reconciled_at
+        ):
+            app.reconciled_at = stats.reconciled_at
+        app.collections.append(
+            CollectionRecordStats(
+                collection_type=stats.collection_type,
+                record_count=stats.record_count,
+                published_count=stats.published_count,
+                storage_bytes=stats.storage_bytes,
+                last_activity_at=stats.last_activity_at,
+            )
+        )
+    return list(apps.values())
+
+
+@router.post(
+    "/record-stats/reconcile",
+    response_model=dict[str, int],
+    summary="立即对账记录统计",
+)
+async def reconcile_record_stats(current_user: RequireSuperuser) -> dict[str, int]:
+    """
+    按实际数据重新计算记录统计 (不等待定时任务)
+
+    需要超级管理员权限
+    """
+    return {"entries": await record_stats.reconcile(use_lock=False) or 0}
+
+
+# =============================================================================
+# Event Loop Endpoints - 事件循环延迟
+# =============================================================================
+
+@router.get(
+    "/loop-lag",
+    response_model=LoopLagSnapshot,
+    summary="事件循环延迟",
+)
+async def get_loop_lag(current_user: RequireSuperuser) -> LoopLagSnapshot:
+    """
+    当前 worker 最近一段时间的事件循环延迟 (毫秒)
+
+    延迟持续偏高说明有同步阻塞调用或 CPU 密集任务在事件循环中执行
+
+    需要超级管理员权限
+    """
+    return loop_lag_monitor.snapshot()
+
+
+@router.delete(
+    "/loop-lag",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="清空事件循环延迟统计",
+)
+async def reset_loop_lag(current_user: RequireSuperuser) -> None:
+    """
+    清空当前 worker 的事件循环延迟统计
+
+    需要超级管理员权限
+    """
+    loop_lag_monitor.reset()
@@ -3,31 +3,74 @@ Unified Backend Platform - File Management Endpoints
 
 文件上传, 下载, 删除 API
 """
-from typing import Any
+import re
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Literal
+from urllib.parse import quote
 from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, File as FastAPIFile, Form, HTTPException, Query, UploadFile, status
+from beanie.operators import In
+from botocore.exceptions import ClientError
+from fastapi import APIRouter, Depends, File as FastAPIFile, Form, Header, HTTPException, Query, Response, UploadFile, status
+from fastapi.responses import RedirectResponse, StreamingResponse
 from pydantic import ValidationError
 
 from app.api.v1.schemas.file import (
+    CompleteMultipartRequest,
     ConfirmUploadRequest,
+    DownloadUrlError,
+    DownloadUrlItem,
+    DownloadUrlsRequest,
+    DownloadUrlsResponse,
     FileListResponse,
     FileMetadataUpdate,
     FileResponse,
     FileUploadResponse,
+    InstantUploadChallenge,
+    InstantUploadRequest,
+    InstantUploadResponse,
+    InstantUploadVerifyRequest,
+    MultipartPartsResponse,
+    MultipartPartUrlsRequest,
+    MultipartPartUrlsResponse,
+    MultipartUploadResponse,
     PresignedUploadRequest,
     PresignedUploadResponse,
+    UploadedPart,
 )
+from app.api.v1.serializers import file_document_to_response, json_response, render_page
 from app.core.config import get_settings
 from app.core.permissions import require_permission
 from app.core.security import get_current_user, get_current_user_optional
+from app.db.read_preference import ReadClass, with_read_class
 from app.models.file import File, FileCategory, FileStatus
 from app.models.user import User
-from app.services.minio_service import minio_service
+from app.services.download_service import download_service
+from app.services.image_service import ImageTransform, image_service
+from app.services.instant_upload_service import ContentMissingError, instant_uploads
+from app.services.minio_service import FileTooLargeError, minio_service
+from app.services.query_planner_service import query_planner
 
 router = APIRouter(prefix="/files", tags=["Files"])
 settings = get_settings()
 
+# S3 limit on the number of parts in one multipart upload
+MAX_MULTIPART_PARTS = 10000
+
+# Single byte range: bytes=start-end / bytes=start- / bytes=-suffix
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+
+# Upper bound for how long browsers may cache an image-variant redirect
+IMAGE_REDIRECT_MAX_AGE = 300
+
+# Only fields with a supporting index may be sorted on (see app.db.indexes)
+query_planner.register(
+    File,
+    sortable_fields=["created_at", "updated_at"],
+)
+
 
 # =============================================================================
 # Helper functions
@@ -65,6 +108,104 @@ def validate_file_type(content_type: str) -> FileCategory:
         )
 
 
+async def get_multipart_upload_or_404(file_id: UUID, current_user: User) -> File:
+    """Get the caller's file with a multipart upload in progress"""
+    file_record = await get_file_or_404(file_id)
+
+    if file_record.owner_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied: not the owner",
+        )
+
+    if file_record.status != FileStatus.UPLOADING or not file_record.multipart_upload_id:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="No multipart upload in progress for this file",
+        )
+
+    return file_record
+
+
+async def finalize_upload(file_record: File, expected_hash: str | None) -> File:
+    """
+    Mark an uploaded object as completed
+
+    A client-supplied hash is verified by reading the object back; only
+    verified hashes take part in content deduplication.
+    """
+    file_hash = None
+    file_size = None
+    if expected_hash:
+        try:
+            file_size, file_hash = await minio_service.hash_object(
+                file_record.bucket_name,
+                file_record.storage_path,
+            )
+        except ClientError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Uploaded object not found in storage",
+            ) from e
+
+        if file_hash != expected_hash.lower():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="file_hash does not match the uploaded content",
+            )
+
+    file_record = await minio_service.confirm_upload(
+        file_id=file_record.id,
+        file_hash=file_hash,
+        file_size=file_size,
+        deduplicate=file_hash is not None,
+    )
+    image_service.enqueue(file_record)
+    return file_record
+
+
+def parse_range_header(value: str | None) -> str | None:
+    """
+    Normalize a single byte range (`bytes=a-b`, `bytes=a-`, `bytes=-n`)
+
+    Multiple ranges and malformed values are ignored (the full object is
+    served), as allowed by RFC 9110
+    """
+    if not value:
+        return None
+    match = RANGE_PATTERN.fullmatch(value.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if start and end and int(start) > int(end):
+        return None
+    return f"bytes={start}-{end}"
+
+
+def format_http_date(value: datetime) -> str:
+    """Format a datetime as an HTTP date (RFC 9110)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def content_disposition(filename: str, disposition: str) -> str:
+    """Content-Disposition with an RFC 5987 encoded filename"""
+    fallback = filename.encode("ascii", "replace").decode().replace('"', "")
+    return f"{disposition}; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename)}"
+
+
+def get_max_file_size(category: FileCategory) -> int:
+    """Effective size limit for a category (the smaller of category and global limits)"""
+    if category == FileCategory.IMAGE:
+        return min(settings.max_image_size, settings.max_file_size)
+    elif category == FileCategory.VIDEO:
+        return min(settings.max_video_size, settings.max_file_size)
+    return settings.max_file_size
+
+
 def validate_file_size(file_size: int, category: FileCategory) -> None:
     """Validate file size"""
     if category == FileCategory.IMAGE and file_size > settings.max_image_size:
@@ -84,6 +225,15 @@ def validate_file_size(file_size: int, category: FileCategory) -> None:
         )
 
 
+def instant_upload_response(file_record: File) -> InstantUploadResponse:
+    """Response for a file created by instant upload"""
+    image_service.enqueue(file_record)
+    return InstantUploadResponse(
+        instant=True,
+        file=FileResponse.model_validate(file_record),
+    )
+
+
 # =============================================================================
 # File upload API
 # =============================================================================
@@ -101,21 +251,27 @@ async def upload_file(
     is_public: bool = Form(True, description="Is public"),
     current_user: User = Depends(get_current_user),
 ) -> File:
-    """Upload file directly (for small files)"""
+    """
+    Upload file directly
+
+    The body is streamed to object storage in parts (multipart upload) and
+    the size limit is enforced while reading, so memory per upload stays at
+    about one part regardless of file size. SHA-256 is computed while
+    streaming; when the app already stores identical content, the new record
+    points at the existing object and the duplicate upload is removed.
+    """
     if not minio_service.is_available():
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="MinIO service is not available",
         )
 
-    # Read file content
-    content = await file.read()
-
     # Validate file type
     category = validate_file_type(file.content_type or "")
 
-    # Validate file size
-    validate_file_size(len(content), category)
+    # Reject early when the multipart parser already knows the size
+    if file.size is not None:
+        validate_file_size(file.size, category)
 
     # Generate storage path
     file_id = uuid4()
@@ -125,13 +281,13 @@ async def upload_file(
         file.filename or "unnamed",
     )
 
-    # Create file record
+    # Create file record (size is updated once the upload completes)
     file_record = await minio_service.create_file_record(
         owner_id=current_user.id,
         app_identifier=app_identifier,
         filename=file.filename or "unnamed",
         content_type=file.content_type or "application/octet-stream",
-        file_size=len(content),
+        file_size=file.size or 0,
         storage_path=storage_path,
         file_id=file_id,
     )
@@ -144,17 +300,30 @@ async def upload_file(
     file_record.is_public = is_public
 
     try:
-        # Upload to MinIO
-        minio_service.s3_client.put_object(
-            Bucket=settings.minio_bucket,
-            Key=storage_path,
-            Body=content,
-            ContentType=file.content_type,
+        # Stream to MinIO
+        file_size, file_hash = await minio_service.upload_stream(
+            file.read,
+            bucket=settings.minio_bucket,
+            object_name=storage_path,
+            content_type=file.content_type or "application/octet-stream",
+            max_size=get_max_file_size(category),
         )
 
-        # Confirm upload
-        file_record = await minio_service.confirm_upload(file_id)
+        # Confirm upload (identical content already stored for this app is reused)
+        file_record = await minio_service.confirm_upload(
+            file_id,
+            file_hash=file_hash,
+            file_size=file_size,
+            deduplicate=True,
+        )
+        image_service.enqueue(file_record)
 
+    except FileTooLargeError as e:
+        await minio_service.mark_upload_failed(file_id, str(e))
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e),
+        ) from e
     except Exception as e:
         # Mark as failed
         await minio_service.mark_upload_failed(file_id, str(e))
@@ -207,7 +376,7 @@ async def get_presigned_upload_url(
     )
 
     # Generate presigned URL
-    upload_url = minio_service.generate_presigned_url(
+    upload_url = await minio_service.generate_presigned_url(
         bucket=settings.minio_bucket,
         object_name=storage_path,
         expiration=3600,
@@ -226,6 +395,131 @@ async def get_presigned_upload_url(
     )
 
 
+@router.post(
+    "/upload/instant",
+    response_model=InstantUploadResponse,
+    summary="Instant upload by content hash",
+)
+async def instant_upload(
+    request: InstantUploadRequest,
+    current_user: User = Depends(get_current_user),
+) -> InstantUploadResponse:
+    """
+    Check whether the content is already stored before uploading
+
+    When the app already stores an object with the same SHA-256 and size and
+    the caller owns a file referencing it (or a public file does), a completed
+    file record referencing it is created and returned (`instant=true`);
+    nothing needs to be uploaded.
+
+    When the content is only referenced by other users' private files, the
+    response carries a proof-of-possession `challenge` instead: hash the
+    requested byte range as described and submit it to
+    `/upload/instant/verify`, or upload normally via `/upload/presigned`.
+
+    Otherwise the response carries the same presigned upload as
+    `/upload/presigned`; confirming it with `file_hash` makes the content
+    available for later instant uploads.
+    """
+    if not minio_service.is_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="MinIO service is not available",
+        )
+
+    category = validate_file_type(request.content_type)
+    validate_file_size(request.file_size, category)
+
+    stored = await minio_service.find_stored_object(
+        request.app_identifier, request.file_hash, request.file_size
+    )
+    if stored is not None:
+        # Knowing the hash is not enough to reference someone else's private content
+        if await instant_uploads.has_visible_reference(stored, current_user):
+            file_record = await minio_service.create_from_existing(
+                owner_id=current_user.id,
+                app_identifier=request.app_identifier,
+                filename=request.filename,
+                content_type=request.content_type,
+                file_size=request.file_size,
+                file_hash=request.file_hash,
+            )
+            if file_record is not None:
+                return instant_upload_response(file_record)
+        else:
+            challenge = await instant_uploads.issue_challenge(
+                stored, request.model_dump(), current_user
+            )
+            if challenge is not None:
+                return InstantUploadResponse(
+                    instant=False,
+                    challenge=InstantUploadChallenge(**challenge.model_dump()),
+                )
+
+    upload = await get_presigned_upload_url(request, current_user)
+    return InstantUploadResponse(instant=False, upload=upload)
+
+
+@router.post(
+    "/upload/instant/verify",
+    response_model=InstantUploadResponse,
+    summary="Complete an instant upload with proof of possession",
+)
+async def verify_instant_upload(
+    request: InstantUploadVerifyRequest,
+    current_user: User = Depends(get_current_user),
+) -> InstantUploadResponse:
+    """
+    Answer a proof-of-possession challenge from `/upload/instant`
+
+    Each challenge can be answered once. A correct proof creates the file
+    record (`instant=true`); a wrong proof returns 403 and the file has to be
+    uploaded normally. If the content was deleted in the meantime, the
+    response carries a presigned upload instead.
+    """
+    if not minio_service.is_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="MinIO service is not available",
+        )
+
+    try:
+        state = await instant_uploads.verify(request.challenge_id, request.proof, current_user)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        ) from e
+    except ContentMissingError as e:
+        upload = await get_presigned_upload_url(InstantUploadRequest(**e.state), current_user)
+        return InstantUploadResponse(instant=False, upload=upload)
+    except ClientError as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Storage error: {str(e)}",
+        ) from e
+    if state is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Proof of possession failed, upload the file instead",
+        )
+
+    upload_request = InstantUploadRequest(**state)
+    file_record = await minio_service.create_from_existing(
+        owner_id=current_user.id,
+        app_identifier=upload_request.app_identifier,
+        filename=upload_request.filename,
+        content_type=upload_request.content_type,
+        file_size=upload_request.file_size,
+        file_hash=upload_request.file_hash,
+    )
+    if file_record is not None:
+        return instant_upload_response(file_record)
+
+    upload = await get_presigned_upload_url(upload_request, current_user)
+    return InstantUploadResponse(instant=False, upload=upload)
+
+
 @router.post(
     "/upload/confirm",
     response_model=FileResponse,
@@ -235,13 +529,255 @@ async def confirm_upload(
     request: ConfirmUploadRequest,
     current_user: User = Depends(get_current_user),
 ) -> File:
-    """Confirm presigned upload completion"""
-    file_record = await minio_service.confirm_upload(
-        file_id=request.file_id,
-        file_hash=request.file_hash,
+    """
+    Confirm presigned upload completion
+
+    When `file_hash` is given, the uploaded object is read back and hashed
+    server-side; a mismatch is rejected, a match takes part in content
+    deduplication (and later instant uploads).
+    """
+    file_record = await get_file_or_404(request.file_id)
+
+    # Already confirmed: do not take a second content reference
+    if file_record.status == FileStatus.COMPLETED:
+        return file_record
+
+    return await finalize_upload(file_record, request.file_hash)
+
+
+# =============================================================================
+# Multipart upload API (resumable, parallel parts)
+# =============================================================================
+@router.post(
+    "/upload/multipart",
+    response_model=MultipartUploadResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Initiate multipart upload",
+)
+async def initiate_multipart_upload(
+    request: PresignedUploadRequest,
+    current_user: User = Depends(get_current_user),
+) -> MultipartUploadResponse:
+    """
+    Start a resumable multipart upload
+
+    Parts are uploaded directly to object storage with presigned URLs
+    (see `/parts`), in parallel and in any order. After a failure the client
+    lists the uploaded parts and only sends the missing ones.
+    """
+    if not minio_service.is_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="MinIO service is not available",
+        )
+
+    category = validate_file_type(request.content_type)
+    validate_file_size(request.file_size, category)
+
+    # S3 allows at most 10000 parts of at least 5MB (except the last one)
+    part_size = max(settings.upload_part_size, -(-request.file_size // MAX_MULTIPART_PARTS))
+    part_count = max(1, -(-request.file_size // part_size))
+
+    file_id = uuid4()
+    storage_path = minio_service.generate_storage_path(
+        request.app_identifier,
+        file_id,
+        request.filename,
+    )
+    file_record = await minio_service.create_file_record(
+        owner_id=current_user.id,
+        app_identifier=request.app_identifier,
+        filename=request.filename,
+        content_type=request.content_type,
+        file_size=request.file_size,
+        storage_path=storage_path,
+        file_id=file_id,
     )
 
-    return file_record
+    try:
+        upload_id = await minio_service.create_multipart_upload(
+            settings.minio_bucket,
+            storage_path,
+            request.content_type,
+        )
+    except ClientError as e:
+        await minio_service.mark_upload_failed(file_id, str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Upload failed: {str(e)}",
+        ) from e
+
+    file_record.multipart_upload_id = upload_id
+    await file_record.save()
+
+    return MultipartUploadResponse(
+        file_id=file_id,
+        upload_id=upload_id,
+        part_size=part_size,
+        part_count=part_count,
+        storage_path=storage_path,
+        bucket=settings.minio_bucket,
+    )
+
+
+@router.post(
+    "/upload/multipart/{file_id}/parts",
+    response_model=MultipartPartUrlsResponse,
+    summary="Presign part upload URLs",
+)
+async def presign_multipart_parts(
+    file_id: UUID,
+    request: MultipartPartUrlsRequest,
+    current_user: User = Depends(get_current_user),
+) -> MultipartPartUrlsResponse:
+    """
+    Presign PUT URLs for several parts in one call
+
+    Each part is uploaded with `PUT <url>` (body = part bytes); URLs can be
+    requested again at any time, e.g. when resuming after they expired.
+    """
+    file_record = await get_multipart_upload_or_404(file_id, current_user)
+
+    invalid = [n for n in request.part_numbers if not 1 <= n <= MAX_MULTIPART_PARTS]
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Part numbers must be between 1 and {MAX_MULTIPART_PARTS}: {invalid[:10]}",
+        )
+
+    urls = await minio_service.generate_presigned_part_urls(
+        file_record.bucket_name,
+        file_record.storage_path,
+        file_record.multipart_upload_id,
+        sorted(set(request.part_numbers)),
+        expiration=request.expires_in,
+    )
+    return MultipartPartUrlsResponse(
+        upload_id=file_record.multipart_upload_id,
+        urls=urls,
+        expires_in=request.expires_in,
+    )
+
+
+@router.get(
+    "/upload/multipart/{file_id}/parts",
+    response_model=MultipartPartsResponse,
+    summary="List uploaded parts",
+)
+async def list_multipart_parts(
+    file_id: UUID,
+    current_user: User = Depends(get_current_user),
+) -> MultipartPartsResponse:
+    """List the parts already stored, so an interrupted upload can resume"""
+    file_record = await get_multipart_upload_or_404(file_id, current_user)
+
+    try:
+        parts = await minio_service.list_parts(
+            file_record.bucket_name,
+            file_record.storage_path,
+            file_record.multipart_upload_id,
+        )
+    except ClientError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Multipart upload is no longer available: {str(e)}",
+        ) from e
+
+    return MultipartPartsResponse(
+        upload_id=file_record.multipart_upload_id,
+        parts=[
+            UploadedPart(part_number=part["PartNumber"], etag=part["ETag"], size=part.get("Size"))
+            for part in parts
+        ],
+        uploaded_bytes=sum(part.get("Size", 0) for part in parts),
+    )
+
+
+@router.post(
+    "/upload/multipart/{file_id}/complete",
+    response_model=FileResponse,
+    summary="Complete multipart upload",
+)
+async def complete_multipart_upload(
+    file_id: UUID,
+    request: CompleteMultipartRequest,
+    current_user: User = Depends(get_current_user),
+) -> File:
+    """
+    Assemble the uploaded parts into the final object
+
+    Without `parts`, all parts currently stored are used (the browser does
+    not need to read ETag headers). The assembled size is checked against
+    the limits; `file_hash` works as in `/upload/confirm`.
+    """
+    file_record = await get_multipart_upload_or_404(file_id, current_user)
+    bucket, key = file_record.bucket_name, file_record.storage_path
+    upload_id = file_record.multipart_upload_id
+
+    try:
+        if request.parts is not None:
+            parts = [
+                {"PartNumber": part.part_number, "ETag": part.etag}
+                for part in sorted(request.parts, key=lambda part: part.part_number)
+            ]
+        else:
+            parts = [
+                {"PartNumber": part["PartNumber"], "ETag": part["ETag"]}
+                for part in await minio_service.list_parts(bucket, key, upload_id)
+            ]
+        if not parts:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No parts uploaded",
+            )
+        await minio_service.complete_multipart_upload(bucket, key, upload_id, parts)
+    except ClientError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot complete multipart upload: {str(e)}",
+        ) from e
+
+    file_record.multipart_upload_id = None
+    file_size = await minio_service.get_file_size(bucket, key)
+    max_size = get_max_file_size(file_record.category)
+    if file_size is not None and file_size > max_size:
+        await minio_service.delete_file(bucket, key)
+        await file_record.save()
+        error = FileTooLargeError(max_size)
+        await minio_service.mark_upload_failed(file_id, str(error))
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(error),
+        )
+
+    if file_size is not None:
+        file_record.file_size = file_size
+    file_record.touch()
+    await file_record.save()
+
+    return await finalize_upload(file_record, request.file_hash)
+
+
+@router.delete(
+    "/upload/multipart/{file_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Abort multipart upload",
+)
+async def abort_multipart_upload(
+    file_id: UUID,
+    current_user: User = Depends(get_current_user),
+) -> None:
+    """Abort the upload; object storage discards the uploaded parts"""
+    file_record = await get_multipart_upload_or_404(file_id, current_user)
+
+    await minio_service.abort_multipart_upload(
+        file_record.bucket_name,
+        file_record.storage_path,
+        file_record.multipart_upload_id,
+    )
+    file_record.multipart_upload_id = None
+    await file_record.save()
+    await minio_service.mark_upload_failed(file_id, "Multipart upload aborted")
 
 
 # =============================================================================
@@ -263,8 +799,13 @@ async def list_files(
     sort_by: str = Query("created_at", description="Sort field"),
     sort_order: str = Query("desc", regex="^(asc|desc)$", description="Sort order"),
     current_user: User | None = Depends(get_current_user_optional),
-) -> dict[str, Any]:
-    """List files with filters and pagination"""
+) -> Response:
+    """
+    List files with filters and pagination
+
+    Sorting is limited to indexed fields (created_at, updated_at); other
+    sort fields are rejected with 400.
+    """
     # Build query filters
     query_filters = [File.is_deleted == False]
 
@@ -299,19 +840,33 @@ async def list_files(
 
     # Execute query
     skip = (page - 1) * page_size
-    sort_direction = 1 if sort_order == "asc" else -1
-
-    cursor = File.find_many(*query_filters).sort([(sort_by, sort_direction)])
 
-    total = await cursor.count()
-    items = await cursor.skip(skip).limit(page_size).to_list()
+    # Fast path: read raw Motor documents and encode with orjson
+    query = File.find_many(*query_filters).get_filter_query()
+    # Anonymous listings may read from secondaries; signed-in users read their own writes
+    collection = with_read_class(
+        File.get_motor_collection(),
+        ReadClass.LISTING if current_user is None else ReadClass.PRIMARY,
+    )
 
-    return {
-        "total": total,
-        "page": page,
-        "page_size": page_size,
-        "items": items,
-    }
+    # Sort field whitelist and index matching
+    try:
+        plan = query_planner.plan(File, query, sort_by, sort_order)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+
+    started = time.perf_counter()
+    total = await collection.count_documents(query)
+    cursor = collection.find(query).sort(plan.sort).skip(skip).limit(page_size)
+    docs = await cursor.to_list(length=page_size)
+    query_planner.observe(plan, query, (time.perf_counter() - started) * 1000)
+
+    return json_response(
+        render_page(total, page, page_size, map(file_document_to_response, docs))
+    )
 
 
 @router.get(
@@ -343,6 +898,91 @@ async def get_file(
     return file_record
 
 
+@router.get(
+    "/{file_id}/image",
+    summary="Resized image",
+    status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+    responses={307: {"description": "Redirect to the cached variant"}},
+)
+async def get_image_variant(
+    file_id: UUID,
+    w: int | None = Query(None, ge=1, description="Target width (px)"),
+    h: int | None = Query(None, ge=1, description="Target height (px)"),
+    fit: Literal["contain", "cover", "fill"] = Query("contain", description="Fit mode"),
+    format: Literal["webp", "jpeg", "png"] = Query("webp", description="Output format"),
+    quality: int = Query(80, ge=1, le=100, description="Quality for lossy formats"),
+    current_user: User | None = Depends(get_current_user_optional),
+) -> Response:
+    """
+    Resize / crop an image on the fly
+
+    - `contain` scales to fit within w x h (never enlarges), `cover` scales
+      and center-crops to exactly w x h, `fill` stretches to w x h
+    - Variants are rendered on first request and cached in the thumbnail
+      bucket; every request is answered with a redirect to a presigned URL
+      of the cached variant
+    - Concurrent requests for the same variant are rendered once
+    """
+    file_record = await get_file_or_404(file_id)
+
+    # Permission check
+    if not file_record.is_public:
+        if not current_user or (
+            file_record.owner_id != current_user.id and not current_user.is_superuser
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied: private file",
+            )
+
+    if (
+        file_record.category != FileCategory.IMAGE
+        or file_record.content_type == "image/svg+xml"
+        or file_record.status != FileStatus.COMPLETED
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File is not a completed raster image",
+        )
+
+    if w is None and h is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one of w and h is required",
+        )
+    max_dimension = settings.image_transform_max_dimension
+    if (w or 0) > max_dimension or (h or 0) > max_dimension:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"w and h must not exceed {max_dimension}",
+        )
+
+    spec = ImageTransform(
+        width=w,
+        height=h,
+        fit=fit if w and h else "contain",
+        format=format,
+        quality=quality if format != "png" else 100,
+    )
+    try:
+        path = await image_service.get_transformed(file_record, spec)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Cannot transform image: {str(e)}",
+        ) from e
+
+    urls = await download_service.get_object_urls([(settings.minio_thumbnail_bucket, path)])
+    url, expires_in = urls[(settings.minio_thumbnail_bucket, path)]
+    # The redirect must not outlive the cached presigned URL it points at
+    max_age = min(IMAGE_REDIRECT_MAX_AGE, expires_in)
+    return RedirectResponse(
+        url,
+        status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+        headers={"Cache-Control": f"private, max-age={max_age}"},
+    )
+
+
 @router.get(
     "/{file_id}/download",
     summary="Download file",
@@ -351,7 +991,13 @@ async def download_file(
     file_id: UUID,
     current_user: User | None = Depends(get_current_user_optional),
 ):
-    """Get presigned download URL"""
+    """
+    Get presigned download URL
+
+    - Only reads MongoDB: object existence is trusted from the COMPLETED status
+      (checked periodically by the storage reconcile job), presigned URLs are
+      cached per object and download counts are written in batches
+    """
     file_record = await get_file_or_404(file_id)
 
     # Permission check
@@ -364,36 +1010,194 @@ async def download_file(
                 detail="Access denied: private file",
             )
 
-    # Check if file exists
-    exists = await minio_service.file_exists(
-        file_record.bucket_name,
-        file_record.storage_path,
-    )
-
-    if not exists:
+    if file_record.status != FileStatus.COMPLETED:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="File not found in storage",
         )
 
-    # Generate presigned download URL
-    download_url = minio_service.generate_presigned_url(
-        bucket=file_record.bucket_name,
-        object_name=file_record.storage_path,
-        expiration=3600,
-        method="get_object",
-    )
-
-    # Increment download count
-    file_record.increment_download()
-    await file_record.save()
+    download_url, expires_in = await download_service.get_download_url(file_record)
+    download_service.count_download(file_record.id)
 
     return {
         "download_url": download_url,
         "filename": file_record.filename,
         "content_type": file_record.content_type,
-        "expires_in": 3600,
+        "expires_in": expires_in,
+    }
+
+
+@router.post(
+    "/download-urls",
+    response_model=DownloadUrlsResponse,
+    summary="Batch download URLs",
+)
+async def batch_download_urls(
+    request: DownloadUrlsRequest,
+    current_user: User | None = Depends(get_current_user_optional),
+) -> DownloadUrlsResponse:
+    """
+    Get presigned download URLs for many files at once (e.g. a gallery page)
+
+    - One MongoDB query for all ids; same visibility rules as `/download`
+    - Files that are missing, private to someone else or not yet completed
+      are reported in `errors` instead of failing the whole request
+    - URLs come from the shared per-object cache; download counts are not
+      incremented (issuing URLs for display is not a download)
+    """
+    file_ids = list(dict.fromkeys(request.file_ids))
+    records = {
+        file_record.id: file_record
+        for file_record in await File.find(
+            In(File.id, file_ids),
+            File.is_deleted == False,
+        ).to_list()
+    }
+
+    readable: list[File] = []
+    errors: list[DownloadUrlError] = []
+    for file_id in file_ids:
+        file_record = records.get(file_id)
+        if file_record is None:
+            errors.append(DownloadUrlError(id=file_id, error="File not found"))
+        elif not file_record.is_public and (
+            not current_user
+            or (file_record.owner_id != current_user.id and not current_user.is_superuser)
+        ):
+            errors.append(DownloadUrlError(id=file_id, error="Access denied: private file"))
+        elif file_record.status != FileStatus.COMPLETED:
+            errors.append(DownloadUrlError(id=file_id, error="File not found in storage"))
+        else:
+            readable.append(file_record)
+
+    urls = await download_service.get_download_urls(readable)
+    items = []
+    for file_record in readable:
+        download_url, expires_in = urls[(file_record.bucket_name, file_record.storage_path)]
+        items.append(
+            DownloadUrlItem(
+                id=file_record.id,
+                download_url=download_url,
+                filename=file_record.filename,
+                content_type=file_record.content_type,
+                expires_in=expires_in,
+            )
+        )
+
+    return DownloadUrlsResponse(items=items, errors=errors)
+
+
+@router.get(
+    "/{file_id}/content",
+    summary="Stream file content",
+    responses={206: {"description": "Partial content"}, 304: {"description": "Not modified"}},
+)
+async def stream_file_content(
+    file_id: UUID,
+    download: bool = Query(False, description="Send as attachment instead of inline"),
+    range_header: str | None = Header(None, alias="Range"),
+    if_range: str | None = Header(None, alias="If-Range"),
+    if_none_match: str | None = Header(None, alias="If-None-Match"),
+    current_user: User | None = Depends(get_current_user_optional),
+) -> Response:
+    """
+    Stream file content through the backend (for clients that cannot reach
+    object storage directly)
+
+    - Supports a single `Range` (206 / 416), `If-Range` and `If-None-Match`
+    - The object is read in chunks with bounded read-ahead, never buffered whole
+    """
+    file_record = await get_file_or_404(file_id)
+
+    # Permission check
+    if not file_record.is_public:
+        if not current_user or (
+            file_record.owner_id != current_user.id and not current_user.is_superuser
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied: private file",
+            )
+
+    if file_record.status != FileStatus.COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found in storage",
+        )
+
+    byte_range = parse_range_header(range_header)
+    try:
+        obj = await minio_service.open_object(
+            file_record.bucket_name,
+            file_record.storage_path,
+            byte_range=byte_range,
+            if_none_match=if_none_match,
+        )
+        # If-Range with a stale validator: the client must get the full object
+        if byte_range and if_range and if_range not in (
+            obj["ETag"],
+            format_http_date(obj["LastModified"]),
+        ):
+            obj["Body"].close()
+            byte_range = None
+            obj = await minio_service.open_object(
+                file_record.bucket_name,
+                file_record.storage_path,
+            )
+    except ClientError as e:
+        error = e.response.get("Error", {})
+        code = error.get("Code")
+        if code in ("304", "NotModified"):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": if_none_match or ""},
+            )
+        if code == "InvalidRange":
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{file_record.file_size}"},
+            )
+        if code in ("404", "NoSuchKey"):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="File not found in storage",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Storage error: {str(e)}",
+        ) from e
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(obj["ContentLength"]),
+        "ETag": obj["ETag"],
+        "Last-Modified": format_http_date(obj["LastModified"]),
+        "Content-Disposition": content_disposition(
+            file_record.filename,
+            "attachment" if download else "inline",
+        ),
+        "Cache-Control": "public, max-age=3600" if file_record.is_public else "private, max-age=0",
     }
+    status_code = status.HTTP_200_OK
+    if byte_range and obj.get("ContentRange"):
+        headers["Content-Range"] = obj["ContentRange"]
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+
+    # Count whole downloads and the first request of a range download (not every seek)
+    if not byte_range or obj.get("ContentRange", "").startswith("bytes 0-"):
+        download_service.count_download(file_record.id)
+
+    return StreamingResponse(
+        minio_service.stream_object(
+            obj["Body"],
+            settings.download_proxy_chunk_size,
+            settings.download_proxy_read_ahead,
+        ),
+        status_code=status_code,
+        media_type=file_record.content_type,
+        headers=headers,
+    )
 
 
 # =============================================================================
@@ -457,14 +1261,20 @@ async def delete_file(
             detail="Access denied: not the owner",
         )
 
-    # Soft delete
-    file_record.is_deleted = True
-    file_record.touch()
-    await file_record.save()
+    # Soft delete (conditional, so concurrent deletes release the object only once)
+    file_record.mark_deleted()
+    result = await File.find_one(File.id == file_id, File.is_deleted == False).update(
+        {
+            "$set": {
+                File.is_deleted: True,
+                File.deleted_at: file_record.deleted_at,
+                File.updated_at: file_record.updated_at,
+            }
+        }
+    )
+    if not result.modified_count:
+        return
 
-    # Delete from storage
-    if delete_from_storage:
-        await minio_service.delete_file(
-            file_record.bucket_name,
-            file_record.storage_path,
-        )
+    # Release the stored object; shared (deduplicated) objects are removed
+    # from storage only when the last referencing file is deleted
+    await minio_service.release_file(file_record, delete_from_storage)
@@ -0,0 +1,135 @@
+"""
+Unified Backend Platform - Payload Schema Endpoints
+
+按 (app_identifier, collection_type) 注册 payload JSON Schema
+"""
+from fastapi import APIRouter, HTTPException, Query, status
+
+from app.api.v1.schemas.payload_schema import (
+    PayloadSchemaMetrics,
+    PayloadSchemaPut,
+    PayloadSchemaResponse,
+)
+from app.core.permissions import RequireAuth, RequireSuperuser
+from app.models.collection_schema import CollectionSchema
+from app.services.schema_registry_service import schema_registry
+
+router = APIRouter(prefix="/payload-schemas", tags=["Payload Schemas"])
+
+
+@router.get(
+    "",
+    response_model=list[PayloadSchemaResponse],
+    summary="查询已注册的 payload Schema",
+)
+async def list_payload_schemas(
+    current_user: RequireAuth,
+    app_identifier: str | None = Query(None, description="应用标识符"),
+) -> list[CollectionSchema]:
+    """
+    列出已注册的 payload Schema
+
+    需要认证
+    """
+    return await schema_registry.list_schemas(app_identifier)
+
+
+@router.get(
+    "/metrics",
+    response_model=list[PayloadSchemaMetrics],
+    summary="校验器编译与校验耗时",
+)
+async def get_payload_schema_metrics(current_user: RequireSuperuser) -> list[PayloadSchemaMetrics]:
+    """
+    返回当前 worker 的校验器编译次数/耗时与单文档校验耗时 (按校验总耗时倒序)
+
+    需要超级管理员权限
+    """
+    return [
+        PayloadSchemaMetrics(
+            **metrics.model_dump(exclude={"validation_ms_total"}),
+            validation_ms_avg=round(metrics.validation_ms_avg, 4),
+        )
+        for metrics in schema_registry.get_metrics()
+    ]
+
+
+@router.get(
+    "/{app_identifier}/{collection_type}",
+    response_model=PayloadSchemaResponse,
+    summary="获取 payload Schema",
+)
+async def get_payload_schema(
+    app_identifier: str,
+    collection_type: str,
+    current_user: RequireAuth,
+) -> CollectionSchema:
+    """
+    获取指定应用/数据类型的 payload Schema
+
+    需要认证
+    """
+    schema = await schema_registry.get_schema(app_identifier, collection_type)
+    if not schema:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Schema not found: {app_identifier}/{collection_type}",
+        )
+    return schema
+
+
+@router.put(
+    "/{app_identifier}/{collection_type}",
+    response_model=PayloadSchemaResponse,
+    summary="注册或替换 payload Schema",
+)
+async def put_payload_schema(
+    app_identifier: str,
+    collection_type: str,
+    data: PayloadSchemaPut,
+    current_user: RequireSuperuser,
+) -> CollectionSchema:
+    """
+    注册或替换 payload Schema
+
+    - Schema 会先编译，无效时返回 400
+    - 只对之后的写入生效，已有记录不会被重新校验
+    - 其他 worker 最迟 SCHEMA_CACHE_TTL 秒后生效
+
+    需要超级管理员权限
+    """
+    try:
+        return await schema_registry.put_schema(
+            app_identifier,
+            collection_type,
+            data.json_schema,
+            is_enabled=data.is_enabled,
+            user_id=current_user.id,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+
+
+@router.delete(
+    "/{app_identifier}/{collection_type}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="删除 payload Schema",
+)
+async def delete_payload_schema(
+    app_identifier: str,
+    collection_type: str,
+    current_user: RequireSuperuser,
+) -> None:
+    """
+    删除 payload Schema，之后该应用/数据类型的 payload 不再校验
+
+    需要超级管理员权限
+    """
+    if not await schema_registry.delete_schema(app_identifier, collection_type):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Schema not found: {app_identifier}/{collection_type}",
+        )
@@ -3,34 +3,68 @@ Unified Backend Platform - UnifiedRecord CRUD Endpoints
 
 通用业务数据 API - 核心功能
 """
+import time
 from datetime import datetime
 from typing import Any
 from uuid import UUID
 
 from beanie import PydanticObjectId
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from pydantic import ValidationError
+from pymongo.errors import DuplicateKeyError
 
 from app.api.v1.schemas.record import (
     BatchCreateRequest,
     BatchCreateResponse,
     BatchDeleteRequest,
     BatchDeleteResponse,
+    BatchGetRequest,
+    BatchGetResponse,
     BatchOperationResult,
     BatchUpdateRequest,
     BatchUpdateResponse,
+    BatchUpsertRequest,
+    BatchUpsertResponse,
+    BatchUpsertResult,
+    RecordRevisionListResponse,
+    RecordRevisionResponse,
+    RecordVersionResponse,
     UnifiedRecordCreate,
     UnifiedRecordListResponse,
     UnifiedRecordPatch,
     UnifiedRecordResponse,
     UnifiedRecordUpdate,
 )
+from app.api.v1.serializers import (
+    dumps,
+    json_response,
+    record_document_to_response,
+    render_page,
+)
+from app.core.config import get_settings
 from app.core.permissions import require_permission
 from app.core.security import get_current_user, get_current_user_optional
+from app.db.read_preference import ReadClass
 from app.models.unified_record import UnifiedRecord
 from app.models.user import User
+from app.services.query_planner_service import query_planner
+from app.services.record_batch_service import RecordConflictError, record_batches
+from app.services.record_cache_service import record_cache
+from app.services.record_expansion_service import is_visible, parse_expand, record_expander
+from app.services.record_partition_service import record_partitions
+from app.services.record_stats_service import record_stats
+from app.services.record_upsert_service import record_upserter
+from app.services.revision_service import revision_service
+from app.services.schema_registry_service import schema_registry
 
 router = APIRouter(prefix="/records", tags=["Unified Records"])
+settings = get_settings()
+
+# 只允许有索引支撑的排序字段 (见 app.db.indexes)
+query_planner.register(
+    UnifiedRecord,
+    sortable_fields=["created_at", "updated_at"],
+)
 
 
 # =============================================================================
@@ -40,23 +74,23 @@ async def get_record_or_404(record_id: UUID | str) -> UnifiedRecord:
     """
     获取记录，不存在则返回 404
 
-    支持 UUID 或字符串 ID
+    支持 UUID 或字符串 ID；UUID 按分区路由查找
     """
     try:
         # 尝试作为 UUID 查询
         if isinstance(record_id, str):
             try:
                 record_uuid = UUID(record_id)
-                record = await UnifiedRecord.find_one(
-                    UnifiedRecord.id == record_uuid,
+                record = await record_partitions.find_record(
+                    record_uuid,
                     UnifiedRecord.is_deleted == False,
                 )
             except ValueError:
                 # 如果不是 UUID 格式，尝试作为 ObjectId 查询
                 record = await UnifiedRecord.get(record_id)
         else:
-            record = await UnifiedRecord.find_one(
-                UnifiedRecord.id == record_id,
+            record = await record_partitions.find_record(
+                record_id,
                 UnifiedRecord.is_deleted == False,
             )
 
@@ -76,6 +110,115 @@ async def get_record_or_404(record_id: UUID | str) -> UnifiedRecord:
         ) from e
 
 
+async def get_cached_record_or_404(record_id: str) -> UnifiedRecord:
+    """
+    通过读穿透缓存获取记录，不存在则返回 404
+
+    非 UUID 格式的 ID 不走缓存
+    """
+    if not settings.record_cache_enabled:
+        return await get_record_or_404(record_id)
+
+    try:
+        record_uuid = UUID(record_id)
+    except ValueError:
+        return await get_record_or_404(record_id)
+
+    async def load() -> str:
+        record = await get_record_or_404(record_uuid)
+        return record.model_dump_json()
+
+    raw = await record_cache.get_or_load(
+        await record_cache.make_item_key(record_uuid),
+        load,
+        settings.record_cache_ttl,
+    )
+    return UnifiedRecord.model_validate_json(raw)
+
+
+async def validate_payload_or_422(record: UnifiedRecord) -> None:
+    """按已注册的 Schema 校验记录 payload，不符合则返回 422"""
+    try:
+        await schema_registry.validate(
+            record.app_identifier, record.collection_type, record.payload
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        ) from e
+
+
+async def save_or_409(record: UnifiedRecord, before: dict[str, Any], changed_by: UUID) -> None:
+    """以读取时的 version 为条件保存记录 (同时写入历史版本)，期间被并发修改则返回 409"""
+    try:
+        await record_batches.save(record, before, changed_by)
+    except RecordConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+        ) from e
+
+
+def parse_expand_or_400(expand: str | None) -> list[list[str]]:
+    """解析 expand 参数，格式无效返回 400"""
+    try:
+        return parse_expand(expand)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+
+
+async def expand_or_400(
+    items: list[dict[str, Any]],
+    expand_paths: list[list[str]],
+    current_user: User | None,
+) -> None:
+    """展开响应条目中的引用，引用过多返回 400"""
+    try:
+        await record_expander.expand(
+            items, expand_paths, current_user, record_document_to_response
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+
+
+def abort_atomic_batch(
+    results: list[BatchOperationResult],
+    error: str,
+    clear_ids: bool = False,
+) -> int:
+    """
+    原子批量操作未提交：将已通过检查的条目也标记为失败
+
+    Returns:
+        失败数量 (即全部条目)
+    """
+    for result in results:
+        if result.success:
+            result.success = False
+            result.error = error
+            if clear_ids:
+                result.id = None
+    return len(results)
+
+
+async def invalidate_record_cache(*records: UnifiedRecord) -> None:
+    """写操作后使相关记录和列表缓存失效"""
+    if not settings.record_cache_enabled or not records:
+        return
+
+    await record_cache.invalidate(
+        record_ids=[record.id for record in records],
+        app_identifiers={record.app_identifier for record in records},
+    )
+
+
 # =============================================================================
 # CRUD 端点
 # =============================================================================
@@ -94,19 +237,32 @@ async def create_record(
 
     - 需要认证
     - 自动关联当前用户为所有者
-    - payload 可存储任意 JSON 数据
+    - payload 可存储任意 JSON 数据；已注册 Schema 时按 Schema 校验
+    - 已分区的应用写入其独立集合
+    - external_id 在同一应用/数据类型内已存在时返回 409
     """
-    record = UnifiedRecord(
+    model = await record_partitions.model_for_write(data.app_identifier)
+    record = model(
         app_identifier=data.app_identifier,
         collection_type=data.collection_type,
         owner_id=current_user.id,
+        external_id=data.external_id,
         title=data.title,
         description=data.description,
         payload=data.payload,
         is_published=data.is_published,
         published_at=datetime.utcnow() if data.is_published else None,
     )
-    await record.insert()
+    await validate_payload_or_422(record)
+    try:
+        await record.insert()
+    except DuplicateKeyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Record with external_id {data.external_id!r} already exists",
+        ) from e
+    await record_stats.record_changed(record)
+    await invalidate_record_cache(record)
     return record
 
 
@@ -125,17 +281,25 @@ async def list_records(
     page_size: int = Query(20, ge=1, le=100, description="每页大小"),
     sort_by: str = Query("created_at", description="排序字段"),
     sort_order: str = Query("desc", regex="^(asc|desc)$", description="排序方向"),
+    expand: str | None = Query(
+        None,
+        description="展开引用，如 payload.author_id,payload.item_ids,owner",
+    ),
     current_user: User | None = Depends(get_current_user_optional),
-) -> dict[str, Any]:
+) -> Response:
     """
     查询 UnifiedRecord 列表
 
     - 支持多维度筛选
     - 支持分页
-    - 支持排序
+    - 支持排序 (仅有索引支撑的字段: created_at / updated_at，其他字段返回 400)
     - 支持全文搜索 (标题/描述)
     - 未认证用户只能看到已发布的内容
+    - 支持 expand 展开 payload 中引用的记录和所有者
+    - 未认证且不带搜索/展开的查询走读穿透缓存
     """
+    expand_paths = parse_expand_or_400(expand)
+
     # 构建查询条件
     query_filters = [UnifiedRecord.is_deleted == False]
 
@@ -170,21 +334,82 @@ async def list_records(
 
     # 执行查询
     skip = (page - 1) * page_size
-    sort_direction = 1 if sort_order == "asc" else -1
 
-    cursor = UnifiedRecord.find_many(*query_filters).sort(
-        [(sort_by, sort_direction)]
+    # 快速路径：直接读取 Motor 原始文档并用 orjson 编码，不构造 Beanie 文档
+    query = UnifiedRecord.find_many(*query_filters).get_filter_query()
+
+    # 排序字段白名单与索引匹配
+    try:
+        plan = query_planner.plan(UnifiedRecord, query, sort_by, sort_order)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+
+    use_cache = (
+        current_user is None
+        and not search
+        and not expand_paths
+        and settings.record_cache_enabled
+    )
+    # 登录用户需要读到自己刚写入的记录，走主节点；
+    # 写入缓存的结果也走主节点：从节点最多落后 maxStalenessSeconds，
+    # 失效 (代数递增) 后从从节点读到的旧页会以新代数写入缓存并保留整个 TTL。
+    # 只有不进缓存的匿名查询 (搜索 / 展开) 读从节点
+    read_class = (
+        ReadClass.PRIMARY
+        if current_user is not None or use_cache
+        else ReadClass.LISTING
+    )
+
+    # 只按应用/数据类型/发布状态筛选时 total 读取记录统计 (按所有者或搜索筛选时执行 count_documents)
+    count_from_stats = (
+        app_identifier
+        and not owner_id
+        and not search
+        and (current_user is not None or is_published is not False)
     )
 
-    total = await cursor.count()
-    items = await cursor.skip(skip).limit(page_size).to_list()
+    async def execute() -> str:
+        started = time.perf_counter()
+        total = None
+        if count_from_stats:
+            total = await record_stats.count_records(
+                app_identifier,
+                collection_type,
+                True if current_user is None else is_published,
+            )
+        if total is None:
+            # 按分区路由选择集合 (分区集合与共享集合索引声明相同)
+            total = await record_partitions.count_documents(app_identifier, query, read_class)
+        docs = await record_partitions.find_documents(
+            app_identifier, query, plan.sort, skip, page_size, read_class
+        )
+        query_planner.observe(plan, query, (time.perf_counter() - started) * 1000)
+        items = [record_document_to_response(doc) for doc in docs]
+        if expand_paths:
+            await expand_or_400(items, expand_paths, current_user)
+        return render_page(total, page, page_size, items).decode("utf-8")
+
+    if use_cache:
+        cache_key = await record_cache.make_list_key(
+            app_identifier,
+            collection_type=collection_type,
+            is_published=is_published,
+            owner_id=owner_id,
+            page=page,
+            page_size=page_size,
+            sort_by=sort_by,
+            sort_order=sort_order,
+        )
+        body = await record_cache.get_or_load(
+            cache_key, execute, settings.record_list_cache_ttl
+        )
+    else:
+        body = await execute()
 
-    return {
-        "total": total,
-        "page": page,
-        "page_size": page_size,
-        "items": items,
-    }
+    return json_response(body)
 
 
 # =============================================================================
@@ -205,29 +430,39 @@ async def batch_create_records(
 
     - 最多支持 100 条记录
     - 每条记录都会关联当前用户
+    - payload 按已注册的 Schema 校验，不符合的条目记为失败
     - 可选择遇到错误时是否停止
+    - atomic=true 时全部成功或全部不写入 (一个事务、每个集合一次 bulk_write)
 
     返回创建结果统计，包含成功和失败的详细信息
     """
     results = []
     succeeded = 0
     failed = 0
+    created: list[UnifiedRecord] = []
 
     for index, item_data in enumerate(request.items):
         result = BatchOperationResult(index=index, success=False)
 
         try:
-            record = UnifiedRecord(
+            model = await record_partitions.model_for_write(item_data.app_identifier)
+            record = model(
                 app_identifier=item_data.app_identifier,
                 collection_type=item_data.collection_type,
                 owner_id=current_user.id,
+                external_id=item_data.external_id,
                 title=item_data.title,
                 description=item_data.description,
                 payload=item_data.payload,
                 is_published=item_data.is_published,
                 published_at=datetime.utcnow() if item_data.is_published else None,
             )
-            await record.insert()
+            await schema_registry.validate(
+                record.app_identifier, record.collection_type, record.payload
+            )
+            if not request.atomic:
+                await record.insert()
+            created.append(record)
 
             result.id = record.id
             result.success = True
@@ -237,12 +472,27 @@ async def batch_create_records(
             result.success = False
             result.error = str(e)
             failed += 1
+            results.append(result)
 
-            if request.stop_on_error:
+            if request.stop_on_error or request.atomic:
                 break
+            continue
 
         results.append(result)
 
+    if request.atomic:
+        try:
+            if failed:
+                raise ValueError("Batch aborted: another item failed")
+            await record_batches.insert(created)
+        except ValueError as e:
+            failed = abort_atomic_batch(results, str(e), clear_ids=True)
+            succeeded = 0
+            created = []
+    else:
+        await record_stats.records_changed([(record, None) for record in created])
+    await invalidate_record_cache(*created)
+
     return BatchCreateResponse(
         total=len(request.items),
         succeeded=succeeded,
@@ -251,6 +501,95 @@ async def batch_create_records(
     )
 
 
+@router.post(
+    "/batch/get",
+    response_model=BatchGetResponse,
+    summary="批量获取记录",
+)
+async def batch_get_records(
+    request: BatchGetRequest,
+    current_user: User | None = Depends(get_current_user_optional),
+) -> Response:
+    """
+    按 ID 批量获取 UnifiedRecord
+
+    - 每个集合一次 $in 查询，替代循环调用 GET /records/{id}
+    - 可见性规则与获取单条记录相同：未发布内容只有所有者或管理员可见
+    - 结果与请求 ids 顺序一致，不存在的记录标记为 not_found，无权访问的标记为 forbidden
+    - 不增加查看次数
+    """
+    docs = await record_partitions.find_documents_by_ids(
+        request.ids,
+        UnifiedRecord.is_deleted == False,
+    )
+
+    items = []
+    found = 0
+    for record_id in request.ids:
+        doc = docs.get(record_id)
+        if doc is None:
+            items.append({"id": record_id, "status": "not_found", "record": None})
+            continue
+
+        item = record_document_to_response(doc)
+        if not is_visible(item, current_user):
+            items.append({"id": record_id, "status": "forbidden", "record": None})
+            continue
+
+        items.append({"id": record_id, "status": "ok", "record": item})
+        found += 1
+
+    return json_response(
+        dumps({"total": len(request.ids), "found": found, "items": items})
+    )
+
+
+@router.post(
+    "/batch/upsert",
+    response_model=BatchUpsertResponse,
+    summary="按外部键批量创建或更新记录",
+)
+async def batch_upsert_records(
+    request: BatchUpsertRequest,
+    current_user: User = Depends(get_current_user),
+) -> BatchUpsertResponse:
+    """
+    按 (app_identifier, collection_type, external_id) 批量 upsert UnifiedRecord
+
+    - 供外部系统同步数据：不存在则新建 (当前用户为所有者)，存在则更新
+    - 每个集合一次 bulk_write，无需先查询再创建/更新，并发同步不会产生重复记录
+    - 未提供的字段在更新时保持不变；命中已删除的记录时将其恢复
+    - 已存在的记录只有所有者或管理员可以更新
+    - payload 按已注册的 Schema 校验，不符合的条目记为失败
+    """
+    outcomes = await record_upserter.bulk_upsert(
+        [item.model_dump(exclude_unset=True) for item in request.items],
+        current_user,
+    )
+
+    results = [
+        BatchUpsertResult(
+            id=outcome.id,
+            index=outcome.index,
+            success=outcome.error is None,
+            error=outcome.error,
+            external_id=outcome.external_id,
+            created=outcome.created,
+        )
+        for outcome in outcomes
+    ]
+    created = sum(1 for result in results if result.success and result.created)
+    failed = sum(1 for result in results if not result.success)
+
+    return BatchUpsertResponse(
+        total=len(request.items),
+        created=created,
+        updated=len(results) - created - failed,
+        failed=failed,
+        results=results,
+    )
+
+
 @router.put(
     "/batch",
     response_model=BatchUpdateResponse,
@@ -266,12 +605,15 @@ async def batch_update_records(
     - 通过 ID 列表指定要更新的记录
     - 对所有记录应用相同的更新
     - 只有所有者或管理员可以更新
+    - atomic=true 时全部成功或全部不写入 (一个事务、每个集合一次 bulk_write)
 
     返回更新结果统计
     """
     results = []
     succeeded = 0
     failed = 0
+    modified: list[UnifiedRecord] = []
+    changes: list[tuple[UnifiedRecord, dict[str, Any] | None]] = []
 
     for index, record_id in enumerate(request.ids):
         result = BatchOperationResult(
@@ -279,8 +621,8 @@ async def batch_update_records(
         )
 
         try:
-            record = await UnifiedRecord.find_one(
-                UnifiedRecord.id == record_id,
+            record = await record_partitions.find_record(
+                record_id,
                 UnifiedRecord.is_deleted == False,
             )
 
@@ -288,9 +630,9 @@ async def batch_update_records(
                 result.success = False
                 result.error = "Record not found"
                 failed += 1
-                if request.stop_on_error:
-                    break
                 results.append(result)
+                if request.stop_on_error or request.atomic:
+                    break
                 continue
 
             # 权限检查
@@ -298,9 +640,9 @@ async def batch_update_records(
                 result.success = False
                 result.error = "Access denied: not the owner"
                 failed += 1
-                if request.stop_on_error:
-                    break
                 results.append(result)
+                if request.stop_on_error or request.atomic:
+                    break
                 continue
 
             # 更新字段
@@ -310,6 +652,9 @@ async def batch_update_records(
                 record.description = request.updates.description
             if request.updates.payload is not None:
                 record.payload = request.updates.payload
+                await schema_registry.validate(
+                    record.app_identifier, record.collection_type, record.payload
+                )
             if request.updates.is_published is not None:
                 record.is_published = request.updates.is_published
                 if request.updates.is_published and not record.published_at:
@@ -317,7 +662,11 @@ async def batch_update_records(
 
             record.touch()
             record.version += 1
-            await record.save()
+            before = record.get_saved_state()
+            if not request.atomic:
+                await record_batches.save(record, before, current_user.id)
+            modified.append(record)
+            changes.append((record, before))
 
             result.success = True
             succeeded += 1
@@ -327,11 +676,22 @@ async def batch_update_records(
             result.error = str(e)
             failed += 1
 
-            if request.stop_on_error:
+            if request.stop_on_error or request.atomic:
                 break
 
         results.append(result)
 
+    if request.atomic:
+        try:
+            if failed:
+                raise ValueError("Batch aborted: another item failed")
+            await record_batches.update(changes, current_user.id)
+        except ValueError as e:
+            failed = abort_atomic_batch(results, str(e))
+            succeeded = 0
+            modified = []
+    await invalidate_record_cache(*modified)
+
     return BatchUpdateResponse(
         total=len(request.ids),
         succeeded=succeeded,
@@ -355,10 +715,13 @@ async def batch_delete_records(
     - 通过 ID 列表指定要删除的记录
     - 实际数据不删除，只标记 is_deleted=True
     - 只有所有者或管理员可以删除
+    - atomic=true 时全部成功或全部不写入 (一个事务、每个集合一次 bulk_write)
     """
     results = []
     succeeded = 0
     failed = 0
+    modified: list[UnifiedRecord] = []
+    changes: list[tuple[UnifiedRecord, dict[str, Any] | None]] = []
 
     for index, record_id in enumerate(request.ids):
         result = BatchOperationResult(
@@ -366,8 +729,8 @@ async def batch_delete_records(
         )
 
         try:
-            record = await UnifiedRecord.find_one(
-                UnifiedRecord.id == record_id,
+            record = await record_partitions.find_record(
+                record_id,
                 UnifiedRecord.is_deleted == False,
             )
 
@@ -375,9 +738,9 @@ async def batch_delete_records(
                 result.success = False
                 result.error = "Record not found"
                 failed += 1
-                if request.stop_on_error:
-                    break
                 results.append(result)
+                if request.stop_on_error or request.atomic:
+                    break
                 continue
 
             # 权限检查
@@ -385,15 +748,18 @@ async def batch_delete_records(
                 result.success = False
                 result.error = "Access denied: not the owner"
                 failed += 1
-                if request.stop_on_error:
-                    break
                 results.append(result)
+                if request.stop_on_error or request.atomic:
+                    break
                 continue
 
             # 软删除
-            record.is_deleted = True
-            record.touch()
-            await record.save()
+            before = record.get_saved_state()
+            record.mark_deleted()
+            if not request.atomic:
+                await record.save()
+            modified.append(record)
+            changes.append((record, before))
 
             result.success = True
             succeeded += 1
@@ -403,11 +769,24 @@ async def batch_delete_records(
             result.error = str(e)
             failed += 1
 
-            if request.stop_on_error:
+            if request.stop_on_error or request.atomic:
                 break
 
         results.append(result)
 
+    if request.atomic:
+        try:
+            if failed:
+                raise ValueError("Batch aborted: another item failed")
+            await record_batches.update(changes, record_revisions=False)
+        except ValueError as e:
+            failed = abort_atomic_batch(results, str(e))
+            succeeded = 0
+            modified = []
+    else:
+        await record_stats.records_changed(changes)
+    await invalidate_record_cache(*modified)
+
     return BatchDeleteResponse(
         total=len(request.ids),
         succeeded=succeeded,
@@ -426,15 +805,22 @@ async def batch_delete_records(
 )
 async def get_record(
     record_id: str,
+    expand: str | None = Query(
+        None,
+        description="展开引用，如 payload.author_id,payload.item_ids,owner",
+    ),
     current_user: User | None = Depends(get_current_user_optional),
-) -> UnifiedRecord:
+) -> UnifiedRecord | Response:
     """
     获取单条 UnifiedRecord 详情
 
     - 未认证用户只能访问已发布内容
     - 自动增加查看次数
+    - 记录通过读穿透缓存读取
+    - 支持 expand 展开 payload 中引用的记录和所有者
     """
-    record = await get_record_or_404(record_id)
+    expand_paths = parse_expand_or_400(expand)
+    record = await get_cached_record_or_404(record_id)
 
     # 权限检查：未发布内容需要所有者或管理员
     if not record.is_published:
@@ -446,9 +832,14 @@ async def get_record(
                 detail="Access denied: unpublished content",
             )
 
-    # 增加查看次数
+    # 增加查看次数 (原子 $inc，不回写整个文档，也不使缓存失效)
+    await record_partitions.increment_view_count(record)
     record.increment_view()
-    await record.save()
+
+    if expand_paths:
+        item = UnifiedRecordResponse.model_validate(record).model_dump()
+        await expand_or_400([item], expand_paths, current_user)
+        return json_response(dumps(item))
 
     return record
 
@@ -467,7 +858,8 @@ async def update_record(
     完整更新 UnifiedRecord
 
     - 只有所有者或管理员可以更新
-    - 更新后 version 自动递增
+    - 更新后 version 自动递增，被替换版本的 payload 写入历史版本
+    - 读取后记录被并发修改时返回 409，需重新读取后再更新
     """
     record = await get_record_or_404(record_id)
 
@@ -485,6 +877,7 @@ async def update_record(
         record.description = data.description
     if data.payload is not None:
         record.payload = data.payload
+        await validate_payload_or_422(record)
     if data.is_published is not None:
         record.is_published = data.is_published
         if data.is_published and not record.published_at:
@@ -494,7 +887,9 @@ async def update_record(
     record.touch()
     record.version += 1
 
-    await record.save()
+    before = record.get_saved_state()
+    await save_or_409(record, before, current_user.id)
+    await invalidate_record_cache(record)
     return record
 
 
@@ -513,6 +908,7 @@ async def patch_record(
 
     - 只更新 payload 中的指定字段
     - 其他字段保持不变
+    - 读取后记录被并发修改时返回 409
     """
     record = await get_record_or_404(record_id)
 
@@ -525,10 +921,13 @@ async def patch_record(
 
     # 合并 payload
     record.payload.update(data.payload)
+    await validate_payload_or_422(record)
     record.touch()
     record.version += 1
 
-    await record.save()
+    before = record.get_saved_state()
+    await save_or_409(record, before, current_user.id)
+    await invalidate_record_cache(record)
     return record
 
 
@@ -556,6 +955,82 @@ async def delete_record(
             detail="Access denied: not the owner",
         )
 
-    record.is_deleted = True
-    record.touch()
+    record.mark_deleted()
+    before = record.get_saved_state()
     await record.save()
+    await record_stats.record_changed(record, before)
+    await invalidate_record_cache(record)
+
+
+# =============================================================================
+# 历史版本端点
+# =============================================================================
+@router.get(
+    "/{record_id}/revisions",
+    response_model=RecordRevisionListResponse,
+    summary="列出记录历史版本",
+)
+async def list_record_revisions(
+    record_id: str,
+    limit: int = Query(50, ge=1, le=200, description="返回条数"),
+    current_user: User = Depends(get_current_user),
+) -> RecordRevisionListResponse:
+    """
+    列出 UnifiedRecord 的历史版本 (按版本号倒序)
+
+    - 只有所有者或管理员可以查看
+    """
+    record = await get_record_or_404(record_id)
+
+    if record.owner_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied: not the owner",
+        )
+
+    revisions = await revision_service.list_revisions(record, limit=limit)
+    return RecordRevisionListResponse(
+        record_id=record.id,
+        current_version=record.version,
+        items=[RecordRevisionResponse.model_validate(r) for r in revisions],
+    )
+
+
+@router.get(
+    "/{record_id}/revisions/{version}",
+    response_model=RecordVersionResponse,
+    summary="获取记录指定版本",
+)
+async def get_record_revision(
+    record_id: str,
+    version: int,
+    current_user: User = Depends(get_current_user),
+) -> RecordVersionResponse:
+    """
+    还原 UnifiedRecord 指定版本的 payload
+
+    - 从最近的快照 (或当前版本) 开始逆向应用增量
+    - 只有所有者或管理员可以查看
+    """
+    record = await get_record_or_404(record_id)
+
+    if record.owner_id != current_user.id and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied: not the owner",
+        )
+
+    try:
+        payload = await revision_service.get_payload_at(record, version)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        ) from e
+
+    return RecordVersionResponse(
+        record_id=record.id,
+        version=version,
+        current_version=record.version,
+        payload=payload,
+    )
@@ -0,0 +1,105 @@
+"""
+Unified Backend Platform - Admin Schemas
+
+运维管理相关的 Pydantic 模型
+"""
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+# =============================================================================
+# 查询规划 Schemas
+# =============================================================================
+
+class QueryExplainResult(BaseModel):
+    """explain() 摘要"""
+    stages: list[str] = Field(default_factory=list, description="执行计划 stage 列表")
+    index_name: str | None = Field(default=None, description="使用的索引")
+    blocking_sort: bool = Field(..., description="是否存在内存排序 (SORT stage)")
+    collection_scan: bool = Field(..., description="是否全集合扫描")
+    n_returned: int | None = Field(default=None, description="返回文档数")
+    keys_examined: int | None = Field(default=None, description="扫描索引键数")
+    docs_examined: int | None = Field(default=None, description="扫描文档数")
+    execution_time_ms: int | None = Field(default=None, description="执行耗时 (毫秒)")
+
+
+class QueryShapeReport(BaseModel):
+    """查询形态统计"""
+    collection: str = Field(..., description="集合名称")
+    filter_fields: list[str] = Field(..., description="等值筛选字段")
+    has_search: bool = Field(..., description="是否包含搜索条件")
+    sort: list[tuple[str, int]] = Field(..., description="排序")
+    supporting_index: list[str] | None = Field(default=None, description="支撑排序的已声明索引")
+    count: int = Field(..., description="观测次数")
+    avg_ms: float = Field(..., description="平均耗时 (毫秒)")
+    max_ms: float = Field(..., description="最大耗时 (毫秒)")
+    explain: QueryExplainResult | None = Field(default=None, description="explain() 摘要")
+    explain_error: str | None = Field(default=None, description="explain() 失败原因")
+    suggested_index: list[tuple[str, int]] | None = Field(
+        default=None,
+        description="建议索引 (ESR 规则)，无需新增索引时为空",
+    )
+
+
+# =============================================================================
+# 索引对账 Schemas
+# =============================================================================
+
+class ExtraIndex(BaseModel):
+    """未声明的索引"""
+    name: str = Field(..., description="索引名称")
+    key: list[tuple[str, Any]] = Field(..., description="索引键")
+    redundant: bool = Field(..., description="是否为已声明索引的前缀 (可安全删除)")
+    retired: bool = Field(default=False, description="是否为已被新声明取代的旧索引 (对账时自动删除)")
+
+
+class IndexDriftReport(BaseModel):
+    """单个集合的索引漂移"""
+    collection: str = Field(..., description="集合名称")
+    ok: list[str] = Field(default_factory=list, description="与声明一致的索引")
+    missing: list[str] = Field(default_factory=list, description="缺失的索引")
+    mismatched: list[str] = Field(default_factory=list, description="同名但定义不一致的索引")
+    extra: list[ExtraIndex] = Field(default_factory=list, description="未声明的索引")
+
+
+# =============================================================================
+# 记录分区 Schemas
+# =============================================================================
+
+class RecordPartitionRoute(BaseModel):
+    """记录分区路由"""
+    app_identifier: str = Field(..., description="应用标识符")
+    collection_name: str = Field(..., description="分区集合名称")
+    status: str = Field(..., description="分区状态 (migrating / active)")
+    migrated_count: int = Field(..., description="已从共享集合迁移的文档数")
+    created_at: datetime = Field(..., description="创建时间")
+    activated_at: datetime | None = Field(default=None, description="迁移完成时间")
+
+
+# =============================================================================
+# 记录统计 Schemas
+# =============================================================================
+
+class CollectionRecordStats(BaseModel):
+    """单个数据类型的记录统计"""
+    collection_type: str = Field(..., description="数据类型")
+    record_count: int = Field(..., description="记录数 (不含已删除)")
+    published_count: int = Field(..., description="已发布记录数")
+    storage_bytes: int = Field(..., description="记录文档的 BSON 大小合计 (字节)")
+    last_activity_at: datetime | None = Field(default=None, description="最后一次写入时间")
+
+
+class AppRecordStats(BaseModel):
+    """单个应用的记录统计"""
+    app_identifier: str = Field(..., description="应用标识符")
+    record_count: int = Field(..., description="记录数 (不含已删除)")
+    published_count: int = Field(..., description="已发布记录数")
+    storage_bytes: int = Field(..., description="记录文档的 BSON 大小合计 (字节)")
+    last_activity_at: datetime | None = Field(default=None, description="最后一次写入时间")
+    reconciled_at: datetime | None = Field(default=None, description="最后一次对账时间")
+    collections: list[CollectionRecordStats] = Field(
+        default_factory=list,
+        description="按数据类型的明细",
+    )
@@ -63,6 +63,7 @@ class FileResponse(BaseModel):
     thumbnail_path: str | None = Field(None, description="缩略图路径")
     width: int | None = Field(None, description="图片宽度")
     height: int | None = Field(None, description="图片高度")
+    image_variants: dict[str, str] = Field(default_factory=dict, description="WebP 尺寸变体路径")
 
     # 视频/音频信息
     duration: int | None = Field(None, description="时长 (秒)")
@@ -119,8 +120,154 @@ class PresignedUploadResponse(BaseModel):
     headers: dict[str, str] = Field(..., description="上传请求头")
 
 
+class InstantUploadRequest(PresignedUploadRequest):
+    """秒传检查请求 (内容已存在时直接创建文件记录)"""
+
+    file_hash: str = Field(
+        ...,
+        pattern="^[0-9a-fA-F]{64}$",
+        description="文件 SHA256 哈希 (十六进制)",
+    )
+
+
+class InstantUploadChallenge(BaseModel):
+    """秒传持有证明挑战：提交 SHA-256(bytes.fromhex(nonce) + 文件[offset:offset+length])"""
+
+    challenge_id: str = Field(..., description="挑战 ID")
+    offset: int = Field(..., description="字节范围起点")
+    length: int = Field(..., description="字节数")
+    nonce: str = Field(..., description="随机数 (十六进制)")
+    expires_in: int = Field(..., description="有效期 (秒)")
+
+
+class InstantUploadVerifyRequest(BaseModel):
+    """秒传持有证明"""
+
+    challenge_id: str = Field(..., description="挑战 ID")
+    proof: str = Field(
+        ...,
+        pattern="^[0-9a-fA-F]{64}$",
+        description="SHA-256(随机数 + 指定字节范围) (十六进制)",
+    )
+
+
+class InstantUploadResponse(BaseModel):
+    """秒传检查响应"""
+
+    instant: bool = Field(..., description="是否秒传成功 (无需上传)")
+    file: FileResponse | None = Field(None, description="秒传成功时创建的文件记录")
+    upload: PresignedUploadResponse | None = Field(
+        None,
+        description="未命中时的预签名上传信息 (与 /upload/presigned 相同)",
+    )
+    challenge: InstantUploadChallenge | None = Field(
+        None,
+        description="内容已存在但没有可见的引用时的持有证明挑战 (提交到 /upload/instant/verify)",
+    )
+
+
+class MultipartUploadResponse(BaseModel):
+    """分片上传初始化响应"""
+
+    file_id: UUID = Field(..., description="文件 ID")
+    upload_id: str = Field(..., description="S3 分片上传 ID")
+    part_size: int = Field(..., description="建议分片大小 (字节，最后一片可以更小)")
+    part_count: int = Field(..., description="按建议分片大小计算的分片数")
+    storage_path: str = Field(..., description="存储路径")
+    bucket: str = Field(..., description="存储桶名称")
+
+
+class MultipartPartUrlsRequest(BaseModel):
+    """批量获取分片上传 URL 请求"""
+
+    part_numbers: list[int] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="分片编号 (1-10000)",
+    )
+    expires_in: int = Field(3600, ge=60, le=86400, description="URL 有效期 (秒)")
+
+
+class MultipartPartUrlsResponse(BaseModel):
+    """分片上传 URL 响应"""
+
+    upload_id: str = Field(..., description="S3 分片上传 ID")
+    urls: dict[int, str] = Field(..., description="分片编号 -> 预签名 PUT URL")
+    expires_in: int = Field(..., description="URL 有效期 (秒)")
+
+
+class UploadedPart(BaseModel):
+    """已上传的分片"""
+
+    part_number: int = Field(..., ge=1, le=10000, description="分片编号")
+    etag: str = Field(..., description="分片 ETag")
+    size: int | None = Field(None, description="分片大小 (字节)")
+
+
+class MultipartPartsResponse(BaseModel):
+    """已上传分片列表 (用于断点续传)"""
+
+    upload_id: str = Field(..., description="S3 分片上传 ID")
+    parts: list[UploadedPart] = Field(..., description="已上传的分片 (按编号排序)")
+    uploaded_bytes: int = Field(..., description="已上传字节数")
+
+
+class CompleteMultipartRequest(BaseModel):
+    """完成分片上传请求"""
+
+    parts: list[UploadedPart] | None = Field(
+        None,
+        description="分片列表 (省略时使用服务端查询到的全部已上传分片)",
+    )
+    file_hash: str | None = Field(
+        None,
+        pattern="^[0-9a-fA-F]{64}$",
+        description="文件 SHA256 哈希 (可选，提供时服务端校验并参与内容去重)",
+    )
+
+
 class ConfirmUploadRequest(BaseModel):
     """确认上传完成请求"""
 
     file_id: UUID = Field(..., description="文件 ID")
-    file_hash: str | None = Field(None, description="文件 SHA256 哈希 (可选)")
+    file_hash: str | None = Field(
+        None,
+        pattern="^[0-9a-fA-F]{64}$",
+        description="文件 SHA256 哈希 (可选，提供时服务端校验并参与内容去重)",
+    )
+
+
+class DownloadUrlsRequest(BaseModel):
+    """批量获取下载 URL 请求"""
+
+    file_ids: list[UUID] = Field(
+        ...,
+        min_length=1,
+        max_length=200,
+        description="文件 ID (重复的 ID 只返回一次)",
+    )
+
+
+class DownloadUrlItem(BaseModel):
+    """单个文件的下载 URL"""
+
+    id: UUID = Field(..., description="文件 ID")
+    download_url: str = Field(..., description="预签名下载 URL")
+    filename: str = Field(..., description="文件名")
+    content_type: str = Field(..., description="MIME 类型")
+    expires_in: int = Field(..., description="剩余有效期 (秒)")
+
+
+class DownloadUrlError(BaseModel):
+    """无法返回下载 URL 的文件"""
+
+    id: UUID = Field(..., description="文件 ID")
+    error: str = Field(..., description="原因")
+
+
+class DownloadUrlsResponse(BaseModel):
+    """批量下载 URL 响应"""
+
+    items: list[DownloadUrlItem] = Field(..., description="成功的文件 (按请求顺序)")
+    errors: list[DownloadUrlError] = Field(..., description="不存在、无权访问或未完成上传的文件")
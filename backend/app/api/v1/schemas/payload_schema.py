@@ -0,0 +1,57 @@
+"""
+Unified Backend Platform - Payload Schema Schemas
+
+payload JSON Schema 注册表相关的 Pydantic 模型
+"""
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+# =============================================================================
+# 请求 Schemas
+# =============================================================================
+class PayloadSchemaPut(BaseModel):
+    """注册或替换 payload Schema"""
+
+    json_schema: dict[str, Any] = Field(
+        ...,
+        description="JSON Schema (Draft 4/6/7)，如 {\"type\": \"object\", \"required\": [\"content\"]}",
+    )
+    is_enabled: bool = Field(default=True, description="是否启用校验")
+
+
+# =============================================================================
+# 响应 Schemas
+# =============================================================================
+class PayloadSchemaResponse(BaseModel):
+    """payload Schema 响应"""
+
+    app_identifier: str = Field(..., description="应用标识符")
+    collection_type: str = Field(..., description="数据类型")
+    json_schema: dict[str, Any] = Field(..., description="JSON Schema")
+    version: int = Field(..., description="Schema 版本号")
+    is_enabled: bool = Field(..., description="是否启用校验")
+    created_by: UUID | None = Field(None, description="创建者 ID")
+    created_at: datetime = Field(..., description="创建时间")
+    updated_at: datetime = Field(..., description="更新时间")
+
+    class Config:
+        from_attributes = True
+
+
+class PayloadSchemaMetrics(BaseModel):
+    """校验器编译与校验耗时统计 (当前 worker)"""
+
+    app_identifier: str = Field(..., description="应用标识符")
+    collection_type: str = Field(..., description="数据类型")
+    schema_version: int | None = Field(None, description="已编译的 Schema 版本")
+    compile_count: int = Field(..., description="编译次数")
+    compile_ms_total: float = Field(..., description="编译总耗时 (毫秒)")
+    last_compile_ms: float = Field(..., description="最近一次编译耗时 (毫秒)")
+    validation_count: int = Field(..., description="校验文档数")
+    validation_failures: int = Field(..., description="校验失败数")
+    validation_ms_avg: float = Field(..., description="单文档平均校验耗时 (毫秒)")
+    validation_ms_max: float = Field(..., description="单文档最大校验耗时 (毫秒)")
@@ -41,6 +41,13 @@ class UnifiedRecordCreate(BaseModel):
 
     is_published: bool = Field(default=True, description="是否发布")
 
+    external_id: str | None = Field(
+        None,
+        min_length=1,
+        max_length=200,
+        description="外部系统中的键 (同一应用/数据类型内唯一)",
+    )
+
 
 class UnifiedRecordUpdate(BaseModel):
     """更新 UnifiedRecord 请求"""
@@ -73,6 +80,7 @@ class UnifiedRecordResponse(BaseModel):
     app_identifier: str = Field(..., description="应用标识符")
     collection_type: str = Field(..., description="数据类型")
     owner_id: UUID | None = Field(None, description="所有者 ID")
+    external_id: str | None = Field(None, description="外部系统中的键")
     title: str | None = Field(None, description="标题")
     description: str | None = Field(None, description="描述")
     payload: dict[str, Any] = Field(..., description="业务数据")
@@ -83,6 +91,10 @@ class UnifiedRecordResponse(BaseModel):
     published_at: datetime | None = Field(None, description="发布时间")
     version: int = Field(..., description="版本号")
     view_count: int = Field(..., description="查看次数")
+    expanded: dict[str, Any] | None = Field(
+        None,
+        description="expand 参数展开的引用 (键为引用路径，值为记录/记录列表/所有者，不可见时为 null)",
+    )
 
     class Config:
         from_attributes = True
@@ -97,6 +109,35 @@ class UnifiedRecordListResponse(BaseModel):
     items: list[UnifiedRecordResponse] = Field(..., description="记录列表")
 
 
+class RecordRevisionResponse(BaseModel):
+    """记录历史版本条目"""
+
+    version: int = Field(..., description="版本号")
+    is_snapshot: bool = Field(..., description="是否为完整快照")
+    changed_by: UUID | None = Field(None, description="产生下一版本的用户 ID")
+    created_at: datetime = Field(..., description="被替换时间")
+
+    class Config:
+        from_attributes = True
+
+
+class RecordRevisionListResponse(BaseModel):
+    """记录历史版本列表响应"""
+
+    record_id: UUID = Field(..., description="记录 ID")
+    current_version: int = Field(..., description="当前版本号")
+    items: list[RecordRevisionResponse] = Field(..., description="历史版本 (按版本号倒序)")
+
+
+class RecordVersionResponse(BaseModel):
+    """指定版本的 payload"""
+
+    record_id: UUID = Field(..., description="记录 ID")
+    version: int = Field(..., description="版本号")
+    current_version: int = Field(..., description="当前版本号")
+    payload: dict[str, Any] = Field(..., description="该版本的业务数据")
+
+
 # =============================================================================
 # 查询参数 Schemas
 # =============================================================================
@@ -141,6 +182,11 @@ class BatchCreateRequest(BaseModel):
         description="遇到错误时是否停止 (默认继续处理剩余项目)",
     )
 
+    atomic: bool = Field(
+        default=False,
+        description="全部成功或全部不写入 (在一个事务中执行，需要 MongoDB 副本集)",
+    )
+
 
 class BatchCreateResponse(BaseModel):
     """批量创建响应"""
@@ -171,6 +217,11 @@ class BatchUpdateRequest(BaseModel):
         description="遇到错误时是否停止",
     )
 
+    atomic: bool = Field(
+        default=False,
+        description="全部成功或全部不写入 (在一个事务中执行，需要 MongoDB 副本集)",
+    )
+
 
 class BatchUpdateResponse(BaseModel):
     """批量更新响应"""
@@ -181,6 +232,72 @@ class BatchUpdateResponse(BaseModel):
     results: list[BatchOperationResult] = Field(..., description="详细结果")
 
 
+class BatchGetRequest(BaseModel):
+    """批量获取请求"""
+
+    ids: list[UUID] = Field(
+        ...,
+        min_length=1,
+        max_length=5000,
+        description="要获取的记录 ID 列表 (最多 5000 个，可重复)",
+    )
+
+
+class BatchGetItem(BaseModel):
+    """批量获取的单个结果"""
+
+    id: UUID = Field(..., description="请求的记录 ID")
+    status: str = Field(..., description="ok / not_found / forbidden")
+    record: UnifiedRecordResponse | None = Field(None, description="记录 (status=ok 时)")
+
+
+class BatchGetResponse(BaseModel):
+    """批量获取响应 (items 与请求 ids 顺序一致)"""
+
+    total: int = Field(..., description="请求数量")
+    found: int = Field(..., description="可访问的记录数量")
+    items: list[BatchGetItem] = Field(..., description="按请求顺序排列的结果")
+
+
+class BatchUpsertItem(UnifiedRecordCreate):
+    """按外部键 upsert 的单条记录 (未提供的字段在更新时保持不变，新建时取默认值)"""
+
+    external_id: str = Field(
+        ...,
+        min_length=1,
+        max_length=200,
+        description="外部系统中的键 (同一应用/数据类型内唯一)",
+    )
+
+
+class BatchUpsertRequest(BaseModel):
+    """按外部键批量 upsert 请求"""
+
+    items: list[BatchUpsertItem] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="要写入的记录列表 (最多 1000 条)",
+    )
+
+
+class BatchUpsertResult(BatchOperationResult):
+    """单条 upsert 结果"""
+
+    external_id: str = Field(..., description="外部键")
+    created: bool = Field(default=False, description="是否新建 (false 表示更新了已有记录)")
+
+
+class BatchUpsertResponse(BaseModel):
+    """批量 upsert 响应"""
+
+    total: int = Field(..., description="请求数量")
+    created: int = Field(..., description="新建数量")
+    updated: int = Field(..., description="更新数量")
+    failed: int = Field(..., description="失败数量")
+    results: list[BatchUpsertResult] = Field(..., description="详细结果")
+
+
 class BatchDeleteRequest(BaseModel):
     """批量删除请求"""
 
@@ -196,6 +313,11 @@ class BatchDeleteRequest(BaseModel):
         description="遇到错误时是否停止",
     )
 
+    atomic: bool = Field(
+        default=False,
+        description="全部成功或全部不写入 (在一个事务中执行，需要 MongoDB 副本集)",
+    )
+
 
 class BatchDeleteResponse(BaseModel):
     """批量删除响应"""
@@ -0,0 +1,133 @@
+"""
+Unified Backend Platform - Fast Response Serializers
+
+列表端点的快速序列化路径：
+直接将 Motor 原始文档映射为响应 Schema 的结构，并使用 orjson 编码，
+跳过 Beanie 文档构造和 FastAPI 的 response_model 二次校验。
+
+输出结构与 UnifiedRecordResponse / FileResponse 保持一致。
+"""
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+import orjson
+from bson import Binary, ObjectId
+from bson.binary import UUID_SUBTYPE
+from fastapi import Response
+
+from app.core.payload_compression import decode_stored_payload
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+# =============================================================================
+# 基础类型转换
+# =============================================================================
+def _as_uuid(value: Any) -> Any:
+    """BSON UUID (Binary subtype 4) 转为 UUID"""
+    if isinstance(value, Binary) and value.subtype == UUID_SUBTYPE:
+        return value.as_uuid()
+    return value
+
+
+def _default(value: Any) -> Any:
+    """orjson 无法直接编码的类型 (payload/metadata 中可能出现)"""
+    if isinstance(value, Binary):
+        if value.subtype == UUID_SUBTYPE:
+            return str(value.as_uuid())
+        return value.hex()
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """使用 orjson 编码 (UUID / datetime 原生支持)"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_response(content: bytes | str, status_code: int = 200) -> Response:
+    """返回已编码的 JSON 响应"""
+    return Response(content=content, status_code=status_code, media_type=JSON_MEDIA_TYPE)
+
+
+# =============================================================================
+# 文档映射
+# =============================================================================
+def record_document_to_response(doc: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    Motor 原始 unified_records 文档 -> UnifiedRecordResponse 结构
+
+    压缩存储的 payload 在此处 (即真正输出到响应时) 才解压
+    """
+    return {
+        "id": _as_uuid(doc["_id"]),
+        "app_identifier": doc["app_identifier"],
+        "collection_type": doc["collection_type"],
+        "owner_id": _as_uuid(doc.get("owner_id")),
+        "external_id": doc.get("external_id"),
+        "title": doc.get("title"),
+        "description": doc.get("description"),
+        "payload": decode_stored_payload(doc),
+        "is_deleted": doc.get("is_deleted", False),
+        "is_published": doc.get("is_published", True),
+        "created_at": doc["created_at"],
+        "updated_at": doc["updated_at"],
+        "published_at": doc.get("published_at"),
+        "version": doc.get("version", 1),
+        "view_count": doc.get("view_count", 0),
+    }
+
+
+def file_document_to_response(doc: Mapping[str, Any]) -> dict[str, Any]:
+    """Motor 原始 files 文档 -> FileResponse 结构"""
+    return {
+        "id": _as_uuid(doc["_id"]),
+        "owner_id": _as_uuid(doc.get("owner_id")),
+        "app_identifier": doc["app_identifier"],
+        "filename": doc["filename"],
+        "file_size": doc["file_size"],
+        "content_type": doc["content_type"],
+        "file_extension": doc["file_extension"],
+        "category": doc.get("category", "other"),
+        "storage_path": doc["storage_path"],
+        "bucket_name": doc.get("bucket_name", "unified-files"),
+        "public_url": doc.get("public_url"),
+        "thumbnail_id": _as_uuid(doc.get("thumbnail_id")),
+        "thumbnail_path": doc.get("thumbnail_path"),
+        "width": doc.get("width"),
+        "height": doc.get("height"),
+        "image_variants": doc.get("image_variants") or {},
+        "duration": doc.get("duration"),
+        "title": doc.get("title"),
+        "description": doc.get("description"),
+        "alt_text": doc.get("alt_text"),
+        "status": doc.get("status", "uploading"),
+        "is_public": doc.get("is_public", False),
+        "is_deleted": doc.get("is_deleted", False),
+        "download_count": doc.get("download_count", 0),
+        "view_count": doc.get("view_count", 0),
+        "created_at": doc["created_at"],
+        "updated_at": doc["updated_at"],
+        "expires_at": doc.get("expires_at"),
+        "metadata": doc.get("metadata") or {},
+    }
+
+
+def render_page(
+    total: int,
+    page: int,
+    page_size: int,
+    items: Iterable[Mapping[str, Any]],
+) -> bytes:
+    """编码分页列表响应 (UnifiedRecordListResponse / FileListResponse 结构)"""
+    return dumps(
+        {
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "items": list(items),
+        }
+    )
@@ -33,12 +33,160 @@ class Settings(BaseSettings):
     # ==========================================================================
     mongodb_url: str = Field(..., description="MongoDB 连接 URL")
     mongodb_database: str = Field(default="unified_backend", description="数据库名称")
+    index_reconcile_on_startup: bool = Field(
+        default=True,
+        description="启动后在后台创建缺失索引 (不阻塞启动，不删除索引)",
+    )
+    mongodb_read_preferences: dict[str, str] = Field(
+        default_factory=lambda: {
+            "listing": "secondaryPreferred",
+            "export": "secondaryPreferred",
+            "aggregation": "secondaryPreferred",
+        },
+        description=(
+            "按操作类别 (listing / export / aggregation) 配置读偏好 (JSON)；"
+            "写入和所有者读取始终使用 primary。单节点部署时从节点模式自动回退到主节点"
+        ),
+    )
+    mongodb_max_staleness_seconds: int = Field(
+        default=90,
+        description="非 primary 读偏好允许的最大复制延迟 (秒，最小 90；-1 表示不限制)",
+    )
+
+    @field_validator("mongodb_read_preferences")
+    @classmethod
+    def validate_read_preferences(cls, value: dict[str, str]) -> dict[str, str]:
+        """检查操作类别和读偏好模式"""
+        classes = {"listing", "export", "aggregation"}
+        modes = {"primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"}
+        for read_class, mode in value.items():
+            if read_class not in classes:
+                raise ValueError(f"Unknown read class: {read_class}")
+            if mode not in modes:
+                raise ValueError(f"Unknown read preference for {read_class}: {mode}")
+        return value
+
+    @field_validator("mongodb_max_staleness_seconds")
+    @classmethod
+    def validate_max_staleness(cls, value: int) -> int:
+        """MongoDB 要求 maxStalenessSeconds 为 -1 或不小于 90"""
+        if value != -1 and value < 90:
+            raise ValueError("mongodb_max_staleness_seconds must be -1 or at least 90")
+        return value
+
+    # ==========================================================================
+    # 记录历史版本配置
+    # ==========================================================================
+    record_revisions_enabled: bool = Field(default=True, description="是否记录 payload 历史版本")
+    record_revision_snapshot_interval: int = Field(
+        default=10,
+        ge=1,
+        description="每隔多少个版本保存一次完整快照 (还原任意版本最多读取该数量的修订)",
+    )
+
+    # ==========================================================================
+    # payload Schema 校验配置
+    # ==========================================================================
+    schema_validation_enabled: bool = Field(
+        default=True,
+        description="是否按已注册的 JSON Schema 校验 payload",
+    )
+    schema_cache_ttl: int = Field(
+        default=30,
+        ge=1,
+        description="已编译校验器的复检间隔 (秒)，过期后检查 Schema 版本，未变化则不重新编译",
+    )
+
+    # ==========================================================================
+    # payload 压缩配置
+    # ==========================================================================
+    payload_compression_enabled: bool = Field(
+        default=False,
+        description="是否启用大 payload 的 zstd 压缩存储",
+    )
+    payload_compression_collections: dict[str, list[str]] = Field(
+        default_factory=dict,
+        description=(
+            '开启压缩的 "应用:数据类型" (或 "应用:*") 及需保持不压缩的 payload 顶层键 '
+            '(JSON，如 {"docs-app:page": ["status", "slug"]})'
+        ),
+    )
+    payload_compression_threshold: int = Field(
+        default=65536,
+        description="payload 编码后超过该字节数才压缩",
+    )
+    payload_compression_level: int = Field(default=3, ge=1, le=22, description="zstd 压缩级别")
+
+    # ==========================================================================
+    # 引用展开配置 (expand 参数)
+    # ==========================================================================
+    record_expand_max_depth: int = Field(default=3, ge=1, description="引用展开的最大层数")
+    record_expand_max_paths: int = Field(default=10, ge=1, description="单次请求最多的展开路径数")
+    record_expand_max_ids: int = Field(
+        default=1000,
+        ge=1,
+        description="每层最多展开的引用数量 (超过返回 400)",
+    )
+
+    # ==========================================================================
+    # 记录分区配置
+    # ==========================================================================
+    record_partitioning_enabled: bool = Field(
+        default=True,
+        description="是否按路由表将应用的记录路由到独立集合",
+    )
+    record_partition_prefix: str = Field(
+        default="unified_records__",
+        description="分区集合名称前缀",
+    )
+    record_partition_refresh_seconds: int = Field(
+        default=30,
+        ge=1,
+        description="路由表刷新间隔 (秒)；迁移开始前会等待该时长，确保所有 worker 已看到新路由",
+    )
+    record_partition_batch_size: int = Field(default=500, description="迁移每批移动的文档数")
+
+    # ==========================================================================
+    # 记录统计配置
+    # ==========================================================================
+    record_stats_enabled: bool = Field(
+        default=True,
+        description="是否在写入时增量维护按应用/数据类型的记录统计",
+    )
+    record_stats_reconcile_seconds: int = Field(
+        default=3600,
+        ge=60,
+        description="记录统计对账间隔 (秒)，按实际数据重新计算统计",
+    )
+    record_stats_list_totals: bool = Field(
+        default=True,
+        description="只按应用/数据类型/发布状态筛选的记录列表 total 读取统计计数，不执行 count_documents "
+        "(两次对账之间计数可能有少量偏差)",
+    )
+
+    # ==========================================================================
+    # 软删除数据保留 / 归档配置
+    # ==========================================================================
+    retention_enabled: bool = Field(default=True, description="是否启用软删除数据归档任务")
+    retention_interval_seconds: int = Field(default=3600, description="归档任务执行间隔 (秒)")
+    retention_default_days: int = Field(
+        default=30,
+        description="软删除数据默认保留天数，超过后移入归档集合 (<=0 表示不归档)",
+    )
+    retention_app_days: dict[str, int] = Field(
+        default_factory=dict,
+        description='按应用覆盖保留天数 (JSON，如 {"blog-app": 7})，<=0 表示该应用不归档',
+    )
+    retention_batch_size: int = Field(default=500, description="归档任务每批移动的文档数")
 
     # ==========================================================================
     # Redis 配置
     # ==========================================================================
     redis_url: str = Field(..., description="Redis 连接 URL")
     redis_cache_ttl: int = Field(default=3600, description="缓存默认 TTL (秒)")
+    record_cache_enabled: bool = Field(default=True, description="是否启用记录读穿透缓存")
+    record_cache_ttl: int = Field(default=300, description="单条记录缓存 TTL (秒)")
+    record_list_cache_ttl: int = Field(default=30, description="匿名列表查询缓存 TTL (秒)")
 
     # ==========================================================================
     # Casdoor / JWT 配置
@@ -93,11 +241,106 @@ class Settings(BaseSettings):
     minio_thumbnail_bucket: str = Field(default="unified-thumbnails", description="缩略图存储桶名称")
     minio_public_url: str = Field(default="http://localhost:9100", description="MinIO 公共访问 URL")
     minio_secure: bool = Field(default=False, description="是否使用 HTTPS")
+    minio_max_workers: int = Field(
+        default=16,
+        ge=1,
+        description="S3 调用线程池大小 (同时也是 botocore 连接池大小)",
+    )
 
     # 文件上传限制
     max_file_size: int = Field(default=524288000, description="最大文件大小 (500MB)")
     max_image_size: int = Field(default=52428800, description="最大图片大小 (50MB)")
     max_video_size: int = Field(default=524288000, description="最大视频大小 (500MB)")
+    upload_part_size: int = Field(
+        default=8388608,
+        ge=5242880,
+        description="直接上传时流式写入 S3 分片上传的分片大小 (字节，S3 要求至少 5MB)",
+    )
+
+    instant_upload_challenge_ttl: int = Field(
+        default=300,
+        ge=30,
+        description="秒传持有证明挑战的有效期 (秒)",
+    )
+    instant_upload_proof_length: int = Field(
+        default=65536,
+        ge=1,
+        description="秒传持有证明随机抽取的字节数 (文件更小时为整个文件)",
+    )
+
+    # 图片处理 (缩略图 / 尺寸变体)
+    image_processing_enabled: bool = Field(
+        default=True,
+        description="上传确认后是否在后台为图片生成 WebP 缩略图和尺寸变体",
+    )
+    image_workers: int = Field(default=2, ge=1, description="图片处理进程池大小")
+    image_thumbnail_size: int = Field(default=320, ge=16, description="缩略图最长边 (像素)")
+    image_variant_sizes: List[int] = Field(
+        default=[640, 1280],
+        description="额外生成的尺寸变体最长边 (像素)",
+    )
+    image_webp_quality: int = Field(default=80, ge=1, le=100, description="WebP 质量")
+    image_transform_max_dimension: int = Field(
+        default=4096,
+        ge=16,
+        description="按需缩放接口允许的最大宽/高 (像素)",
+    )
+    image_transform_known_cache_size: int = Field(
+        default=10000,
+        ge=0,
+        description="每个 worker 记录的已存在按需变体数量上限 (命中时跳过 HEAD，0 表示不记录)",
+    )
+    image_sweep_seconds: int = Field(
+        default=300,
+        ge=30,
+        description="补处理间隔 (秒)：扫描未处理的图片 (如处理时 worker 重启)",
+    )
+
+    # 文件下载
+    download_url_expires: int = Field(
+        default=3600,
+        ge=300,
+        description="下载预签名 URL 有效期 (秒)",
+    )
+    download_url_refresh_margin: int = Field(
+        default=300,
+        ge=0,
+        description="缓存的下载 URL 剩余有效期低于此值 (秒) 时重新签名",
+    )
+    download_url_cache_size: int = Field(
+        default=10000,
+        ge=0,
+        description="每个 worker 缓存的下载 URL 数量上限 (0 表示不缓存)",
+    )
+    download_count_flush_seconds: float = Field(
+        default=5.0,
+        gt=0,
+        description="下载计数批量写入间隔 (秒)",
+    )
+    download_proxy_chunk_size: int = Field(
+        default=1048576,
+        ge=65536,
+        description="代理下载每次从对象存储读取的块大小 (字节)",
+    )
+    download_proxy_read_ahead: int = Field(
+        default=2,
+        ge=1,
+        description="代理下载预读的块数 (慢速客户端时限制每个请求的内存占用)",
+    )
+    storage_reconcile_enabled: bool = Field(
+        default=True,
+        description="是否定时核对已完成文件在对象存储中是否存在",
+    )
+    storage_reconcile_interval_seconds: int = Field(
+        default=600,
+        ge=60,
+        description="存储核对间隔 (秒)",
+    )
+    storage_reconcile_batch_size: int = Field(
+        default=500,
+        ge=1,
+        description="存储核对每周期检查的文件数",
+    )
 
     # 允许的文件类型
     allowed_image_types: List[str] = Field(
@@ -153,6 +396,17 @@ class Settings(BaseSettings):
         description="允许的音频 MIME 类型",
     )
 
+    # ==========================================================================
+    # 事件循环延迟监控
+    # ==========================================================================
+    loop_lag_monitor_enabled: bool = Field(default=True, description="是否采样事件循环延迟")
+    loop_lag_sample_interval: float = Field(
+        default=0.5,
+        gt=0,
+        description="事件循环延迟采样间隔 (秒)",
+    )
+    loop_lag_window: int = Field(default=1200, ge=10, description="保留的最近采样数")
+
     # ==========================================================================
     # 其他配置
     # ==========================================================================
@@ -0,0 +1,112 @@
+"""
+Unified Backend Platform - Image Processing
+
+图片解码、缩放与编码 (纯 CPU 函数，在进程池中执行)
+
+本模块不读取配置、不访问数据库，参数全部由调用方传入，
+以便在 spawn 方式启动的子进程中以最小代价导入。
+"""
+import io
+
+from PIL import Image, ImageOps
+
+# 输出格式 -> (Pillow 格式名, MIME 类型)
+OUTPUT_FORMATS: dict[str, tuple[str, str]] = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+    "png": ("PNG", "image/png"),
+}
+
+
+def _open(data: bytes) -> Image.Image:
+    """解码图片 (多帧图片取第一帧)，按 EXIF 方向旋转"""
+    image = Image.open(io.BytesIO(data))
+    image.seek(0)
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = "A" in image.mode or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    return image
+
+
+def _encode(image: Image.Image, fmt: str, quality: int) -> bytes:
+    """编码为指定格式"""
+    pil_format, _ = OUTPUT_FORMATS[fmt]
+    options: dict[str, object] = {"format": pil_format}
+    if pil_format == "WEBP":
+        options.update(quality=quality, method=4)
+    elif pil_format == "JPEG":
+        image = image.convert("RGB")
+        options.update(quality=quality, optimize=True, progressive=True)
+    else:
+        options.update(optimize=True)
+
+    buffer = io.BytesIO()
+    image.save(buffer, **options)
+    return buffer.getvalue()
+
+
+def _fit_within(image: Image.Image, max_edge: int) -> Image.Image:
+    """等比缩放到最长边不超过 max_edge (不放大)"""
+    resized = image.copy()
+    resized.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+    return resized
+
+
+def render_variants(
+    data: bytes,
+    sizes: list[int],
+    quality: int,
+) -> tuple[int, int, dict[int, bytes]]:
+    """
+    生成 WebP 尺寸变体
+
+    Args:
+        data: 原图字节
+        sizes: 变体最长边 (像素)；原图更小时不放大
+        quality: WebP 质量 (1-100)
+
+    Returns:
+        (原图宽, 原图高, {最长边: WebP 字节})
+    """
+    image = _open(data)
+    width, height = image.size
+    return width, height, {
+        size: _encode(_fit_within(image, size), "webp", quality) for size in sizes
+    }
+
+
+def transform(
+    data: bytes,
+    width: int | None,
+    height: int | None,
+    fit: str,
+    fmt: str,
+    quality: int,
+) -> bytes:
+    """
+    按请求参数缩放/裁剪并编码
+
+    Args:
+        data: 源图字节
+        width / height: 目标尺寸 (至少提供一个；只提供一个时按比例计算另一个)
+        fit: contain (等比缩放到框内，不放大) / cover (等比缩放并居中裁剪到框)
+             / fill (拉伸到框)
+        fmt: 输出格式 (OUTPUT_FORMATS 的键)
+        quality: 有损格式质量 (1-100)
+    """
+    image = _open(data)
+    source_width, source_height = image.size
+    if width is None:
+        width = max(round(source_width * height / source_height), 1)
+    if height is None:
+        height = max(round(source_height * width / source_width), 1)
+
+    if fit == "cover":
+        image = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+    elif fit == "fill":
+        image = image.resize((width, height), Image.Resampling.LANCZOS)
+    else:
+        image = image.copy()
+        image.thumbnail((width, height), Image.Resampling.LANCZOS)
+    return _encode(image, fmt, quality)
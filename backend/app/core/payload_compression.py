@@ -0,0 +1,96 @@
+"""
+Unified Backend Platform - Payload Compression
+
+大 payload 的透明 zstd 压缩 (按应用/数据类型显式开启)
+
+存储格式:
+    payload             仅保留需要筛选/索引的顶层键 (不压缩)
+    payload_compressed  zstd(orjson(完整 payload))
+
+未开启或未超过阈值的记录保持原样，payload_compressed 为 None。
+"""
+from collections.abc import Mapping
+from typing import Any
+
+import orjson
+import zstandard
+
+from app.core.config import get_settings
+from app.db.indexes import get_index_keys
+
+settings = get_settings()
+
+_compressor: zstandard.ZstdCompressor | None = None
+_decompressor = zstandard.ZstdDecompressor()
+
+
+def _get_compressor() -> zstandard.ZstdCompressor:
+    """按配置的压缩级别创建压缩器 (进程内复用)"""
+    global _compressor
+    if _compressor is None:
+        _compressor = zstandard.ZstdCompressor(level=settings.payload_compression_level)
+    return _compressor
+
+
+def get_uncompressed_keys(app_identifier: str, collection_type: str) -> set[str] | None:
+    """
+    获取需要保持不压缩的 payload 顶层键
+
+    包括配置中声明的键，以及 unified_records 索引中引用的 payload.* 字段。
+
+    Returns:
+        该应用/数据类型未开启压缩时返回 None
+    """
+    if not settings.payload_compression_enabled:
+        return None
+
+    collections = settings.payload_compression_collections
+    keys = collections.get(f"{app_identifier}:{collection_type}")
+    if keys is None:
+        keys = collections.get(f"{app_identifier}:*")
+    if keys is None:
+        return None
+
+    indexed = {
+        field.split(".")[1]
+        for index in get_index_keys("unified_records")
+        for field in index
+        if field.startswith("payload.")
+    }
+    return set(keys) | indexed
+
+
+def compress_payload(
+    app_identifier: str,
+    collection_type: str,
+    payload: dict[str, Any],
+) -> tuple[dict[str, Any], bytes | None]:
+    """
+    按配置压缩 payload
+
+    Returns:
+        (存储的 payload, 压缩数据)；不压缩时返回 (payload, None)
+    """
+    keep = get_uncompressed_keys(app_identifier, collection_type)
+    if keep is None:
+        return payload, None
+
+    encoded = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    if len(encoded) < settings.payload_compression_threshold:
+        return payload, None
+
+    stored = {key: value for key, value in payload.items() if key in keep}
+    return stored, _get_compressor().compress(encoded)
+
+
+def decompress_payload(data: bytes) -> dict[str, Any]:
+    """解压完整 payload"""
+    return orjson.loads(_decompressor.decompress(data))
+
+
+def decode_stored_payload(doc: Mapping[str, Any]) -> dict[str, Any]:
+    """从原始文档 (Motor 文档或 Beanie 保存状态) 中读取完整 payload"""
+    compressed = doc.get("payload_compressed")
+    if compressed is not None:
+        return decompress_payload(compressed)
+    return doc.get("payload") or {}
@@ -0,0 +1,209 @@
+"""
+Unified Backend Platform - Index Manager
+
+将数据库中的实际索引与 app.db.indexes 中的声明对账
+"""
+from __future__ import annotations
+
+from typing import Any
+
+import motor.motor_asyncio
+from pymongo import IndexModel
+
+from app.db.indexes import CANONICAL_INDEXES, RETIRED_INDEXES
+
+# 参与比较的索引选项 (其余如 v / background / ns 忽略)
+COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+
+class IndexManager:
+    """
+    索引管理器
+
+    职责:
+    1. diff: 报告缺失 / 不一致 / 多余的索引 (多余索引若为声明索引的前缀则标记 redundant，
+       若在 RETIRED_INDEXES 中则标记 retired)
+    2. reconcile: 后台创建缺失索引；drop=True 时删除冗余前缀索引并重建不一致的索引；
+       drop_unknown=True 时另外删除其余未声明的索引 (可能是手动创建的临时索引，需显式指定)；
+       已停用 (retired) 的旧索引在创建新索引后总是删除
+    """
+
+    def __init__(
+        self,
+        indexes: dict[str, list[IndexModel]] | None = None,
+        retired: dict[str, list[str]] | None = None,
+    ) -> None:
+        self.indexes = indexes if indexes is not None else CANONICAL_INDEXES
+        self.retired = retired if retired is not None else RETIRED_INDEXES
+
+    # ==============================================================================
+    # 比较
+    # ==============================================================================
+
+    @staticmethod
+    def _spec(key: list[tuple[str, Any]], options: dict[str, Any]) -> tuple[Any, ...]:
+        """生成可比较的索引描述"""
+        return (
+            tuple((field, direction) for field, direction in key),
+            tuple(
+                (option, repr(options.get(option)))
+                for option in COMPARED_OPTIONS
+                if options.get(option) not in (None, False)
+            ),
+        )
+
+    @staticmethod
+    def _is_prefix(key: list[tuple[str, Any]], declared: list[IndexModel]) -> bool:
+        """索引键是否为某个声明索引的前缀 (可被其替代)"""
+        for index in declared:
+            declared_key = list(index.document["key"].items())
+            if len(key) <= len(declared_key) and declared_key[: len(key)] == list(key):
+                return True
+        return False
+
+    async def diff(
+        self,
+        database: motor.motor_asyncio.AsyncIOMotorDatabase,
+    ) -> dict[str, dict[str, list[Any]]]:
+        """
+        报告索引漂移
+
+        Returns:
+            {
+                "unified_records": {
+                    "ok": ["idx_records_owner"],
+                    "missing": ["idx_records_app_collection_list"],
+                    "mismatched": ["idx_records_deleted_created"],
+                    "extra": [
+                        {
+                            "name": "is_deleted_1",
+                            "key": [["is_deleted", 1]],
+                            "redundant": True,
+                            "retired": False,
+                        }
+                    ],
+                },
+                ...
+            }
+        """
+        report: dict[str, dict[str, list[Any]]] = {}
+
+        for collection_name, declared in self.indexes.items():
+            retired = set(self.retired.get(collection_name, []))
+            info = await database[collection_name].index_information()
+            existing = {
+                name: self._spec(spec["key"], spec)
+                for name, spec in info.items()
+                if name != "_id_"
+            }
+            matched: set[str] = set()
+            result: dict[str, list[Any]] = {
+                "ok": [],
+                "missing": [],
+                "mismatched": [],
+                "extra": [],
+            }
+
+            for index in declared:
+                document = index.document
+                name = document["name"]
+                spec = self._spec(list(document["key"].items()), document)
+                equivalent = [n for n, s in existing.items() if s == spec]
+
+                if equivalent:
+                    # 同名优先；不同名但定义一致也视为满足
+                    matched.add(name if name in equivalent else equivalent[0])
+                    result["ok"].append(name)
+                elif name in existing:
+                    matched.add(name)
+                    result["mismatched"].append(name)
+                else:
+                    result["missing"].append(name)
+
+            for name, spec in existing.items():
+                if name in matched:
+                    continue
+                key = list(spec[0])
+                result["extra"].append(
+                    {
+                        "name": name,
+                        "key": key,
+                        "redundant": not spec[1] and self._is_prefix(key, declared),
+                        "retired": name in retired,
+                    }
+                )
+
+            report[collection_name] = result
+
+        return report
+
+    # ==============================================================================
+    # 对账
+    # ==============================================================================
+
+    async def reconcile(
+        self,
+        database: motor.motor_asyncio.AsyncIOMotorDatabase,
+        drop: bool = False,
+        dry_run: bool = False,
+        drop_unknown: bool = False,
+    ) -> dict[str, dict[str, list[Any]]]:
+        """
+        对账并修复索引
+
+        Args:
+            database: 数据库实例
+            drop: 是否删除冗余前缀索引并重建不一致的索引
+            dry_run: 只报告不修改
+            drop_unknown: 是否同时删除其余未声明的索引
+
+        Returns:
+            diff() 的报告，额外包含 created / dropped 列表
+        """
+        report = await self.diff(database)
+
+        for collection_name, result in report.items():
+            result["created"] = []
+            result["dropped"] = []
+            if dry_run:
+                continue
+
+            collection = database[collection_name]
+            declared = {index.document["name"]: index for index in self.indexes[collection_name]}
+
+            for extra in result["extra"]:
+                if extra["retired"]:
+                    continue
+                if (drop and extra["redundant"]) or drop_unknown:
+                    await collection.drop_index(extra["name"])
+                    result["dropped"].append(extra["name"])
+            if drop:
+                for name in result["mismatched"]:
+                    await collection.drop_index(name)
+                    result["dropped"].append(name)
+
+            to_create = result["missing"] + (result["mismatched"] if drop else [])
+            if to_create:
+                await collection.create_indexes(
+                    [self._background(declared[name]) for name in to_create]
+                )
+                result["created"].extend(to_create)
+
+            # 替代索引创建后再删除旧索引，期间查询不会失去索引
+            for extra in result["extra"]:
+                if extra["retired"]:
+                    await collection.drop_index(extra["name"])
+                    result["dropped"].append(extra["name"])
+
+        return report
+
+    @staticmethod
+    def _background(index: IndexModel) -> IndexModel:
+        """以后台方式创建 (MongoDB 4.2+ 忽略该选项，默认即为非阻塞构建)"""
+        document = dict(index.document)
+        key = list(document.pop("key").items())
+        return IndexModel(key, background=True, **document)
+
+
+# 全局实例
+index_manager = IndexManager()
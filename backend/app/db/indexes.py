@@ -0,0 +1,179 @@
+"""
+Unified Backend Platform - Canonical Indexes
+
+users / unified_records / files / record_revisions 及归档集合的唯一索引声明来源
+
+应用启动时 Beanie 不再检查这些索引，由 IndexManager 负责对账:
+    python scripts/reconcile_indexes.py            # 创建缺失索引
+    python scripts/reconcile_indexes.py --drop     # 同时删除冗余前缀索引、重建不一致的索引
+"""
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+# 列表查询都带 is_deleted == False，主列表索引只收录未删除文档，
+# 软删除数据不再占用索引空间
+LIVE_ONLY = {"is_deleted": False}
+DELETED_ONLY = {"is_deleted": True}
+HAS_EXTERNAL_ID = {"external_id": {"$type": "string"}}
+
+
+CANONICAL_INDEXES: dict[str, list[IndexModel]] = {
+    # ==========================================================================
+    # users
+    # ==========================================================================
+    "users": [
+        IndexModel([("casdoor_id", ASCENDING)], name="idx_users_casdoor_id", unique=True),
+        IndexModel(
+            [("email", ASCENDING)],
+            name="idx_users_email",
+            unique=True,
+            sparse=True,
+        ),
+        IndexModel([("primary_role_id", ASCENDING)], name="idx_users_primary_role"),
+        IndexModel([("created_at", DESCENDING)], name="idx_users_created_at"),
+    ],
+    # ==========================================================================
+    # unified_records
+    # ==========================================================================
+    "unified_records": [
+        # 按应用/类型的列表查询 (等值 -> 排序)
+        IndexModel(
+            [
+                ("app_identifier", ASCENDING),
+                ("collection_type", ASCENDING),
+                ("created_at", DESCENDING),
+            ],
+            name="idx_records_app_collection_live",
+            partialFilterExpression=LIVE_ONLY,
+        ),
+        # 同时覆盖 app_identifier / (app_identifier, collection_type) 前缀查询
+        IndexModel(
+            [
+                ("app_identifier", ASCENDING),
+                ("collection_type", ASCENDING),
+                ("owner_id", ASCENDING),
+            ],
+            name="idx_records_app_collection_owner_live",
+            partialFilterExpression=LIVE_ONLY,
+        ),
+        IndexModel(
+            [("owner_id", ASCENDING)],
+            name="idx_records_owner_live",
+            partialFilterExpression=LIVE_ONLY,
+        ),
+        # 按应用/类型、按更新时间排序的列表查询
+        IndexModel(
+            [
+                ("app_identifier", ASCENDING),
+                ("collection_type", ASCENDING),
+                ("updated_at", DESCENDING),
+            ],
+            name="idx_records_app_collection_updated_live",
+            partialFilterExpression=LIVE_ONLY,
+        ),
+        # 不带应用筛选的列表排序 (排序白名单中的每个字段都需要一个以其开头的索引)
+        IndexModel(
+            [("created_at", DESCENDING)],
+            name="idx_records_created_live",
+            partialFilterExpression=LIVE_ONLY,
+        ),
+        IndexModel(
+            [("updated_at", DESCENDING)],
+            name="idx_records_updated_live",
+            partialFilterExpression=LIVE_ONLY,
+        ),
+        # 归档任务扫描
+        IndexModel(
+            [("deleted_at", ASCENDING)],
+            name="idx_records_deleted_at",
+            partialFilterExpression=DELETED_ONLY,
+        ),
+        # 外部键唯一 (包含软删除记录，upsert 命中已删除记录时将其恢复)
+        IndexModel(
+            [
+                ("app_identifier", ASCENDING),
+                ("collection_type", ASCENDING),
+                ("external_id", ASCENDING),
+            ],
+            name="idx_records_external_id",
+            unique=True,
+            partialFilterExpression=HAS_EXTERNAL_ID,
+        ),
+    ],
+    "record_revisions": [
+        IndexModel(
+            [("record_id", ASCENDING), ("version", ASCENDING)],
+            name="idx_revisions_record_version",
+        ),
+    ],
+    "unified_records_archive": [
+        IndexModel(
+            [("app_identifier", ASCENDING), ("deleted_at", ASCENDING)],
+            name="idx_records_archive_app_deleted",
+        ),
+    ],
+    "record_revisions_archive": [
+        IndexModel(
+            [("record_id", ASCENDING), ("version", ASCENDING)],
+            name="idx_revisions_archive_record_version",
+        ),
+    ],
+    # ==========================================================================
+    # files
+    # ==========================================================================
+    "files": [
+        # 同时覆盖 owner_id 前缀查询
+        IndexModel(
+            [("owner_id", ASCENDING), ("app_identifier", ASCENDING)],
+            name="idx_files_owner_app_live",
+            partialFilterExpression=LIVE_ONLY,
+        ),
+        IndexModel(
+            [("app_identifier", ASCENDING), ("category", ASCENDING)],
+            name="idx_files_app_category_live",
+            partialFilterExpression=LIVE_ONLY,
+        ),
+        # 列表排序 (排序白名单中的每个字段都需要一个以其开头的索引)
+        IndexModel(
+            [("created_at", DESCENDING)],
+            name="idx_files_created_live",
+            partialFilterExpression=LIVE_ONLY,
+        ),
+        IndexModel(
+            [("updated_at", DESCENDING)],
+            name="idx_files_updated_live",
+            partialFilterExpression=LIVE_ONLY,
+        ),
+        IndexModel([("file_hash", ASCENDING)], name="idx_files_file_hash"),
+        # 内容去重后多个文件可共用同一个存储路径 (引用计数见 stored_objects)；
+        # 新名称与旧的唯一索引 idx_files_storage_path 区分，旧索引见 RETIRED_INDEXES
+        IndexModel([("storage_path", ASCENDING)], name="idx_files_storage_path_shared"),
+        # 归档任务扫描
+        IndexModel(
+            [("deleted_at", ASCENDING)],
+            name="idx_files_deleted_at",
+            partialFilterExpression=DELETED_ONLY,
+        ),
+    ],
+    "files_archive": [
+        IndexModel(
+            [("app_identifier", ASCENDING), ("deleted_at", ASCENDING)],
+            name="idx_files_archive_app_deleted",
+        ),
+    ],
+}
+
+
+def get_index_keys(collection: str) -> list[tuple[str, ...]]:
+    """获取集合索引的字段序列 (供查询规划使用)"""
+    return [
+        tuple(index.document["key"].keys())
+        for index in CANONICAL_INDEXES.get(collection, [])
+    ]
+
+
+# 已被新声明取代的旧索引：对账时 (包括启动时的后台对账) 在创建新索引后自动删除，
+# 不需要 --drop。只收录保留会导致写入失败的索引
+RETIRED_INDEXES: dict[str, list[str]] = {
+    # 内容去重前 storage_path 是唯一索引，保留会使共用存储对象的文件记录写入失败
+    "files": ["idx_files_storage_path"],
+}
@@ -30,12 +30,31 @@ class MongoDB:
         # 延迟导入模型，避免循环依赖
         from app.models.user import User
         from app.models.unified_record import UnifiedRecord
+        from app.models.collection_schema import CollectionSchema
         from app.models.file import File
+        from app.models.record_partition import RecordPartition
+        from app.models.record_revision import RecordRevision
+        from app.models.record_stats import RecordStats
+        from app.models.stored_object import StoredObject
         from app.models.permission import Permission, Role, UserRoleAssignment
 
+        # User / UnifiedRecord / RecordRevision / File 不声明 Beanie 索引，启动时无需建索引；
+        # 索引由 app.db.index_manager 对账
         await init_beanie(
             database=self.client.get_database(settings.mongodb_database),
-            document_models=[User, UnifiedRecord, File, Permission, Role, UserRoleAssignment],
+            document_models=[
+                User,
+                UnifiedRecord,
+                RecordRevision,
+                RecordPartition,
+                RecordStats,
+                CollectionSchema,
+                File,
+                StoredObject,
+                Permission,
+                Role,
+                UserRoleAssignment,
+            ],
         )
 
     async def disconnect(self) -> None:
@@ -0,0 +1,79 @@
+"""
+Unified Backend Platform - Read Preferences
+
+按操作类别选择 MongoDB 读偏好：写入和所有者读取始终走主节点，
+匿名列表、导出和聚合可以路由到副本集从节点以分担读负载
+"""
+from __future__ import annotations
+
+from enum import Enum
+from functools import lru_cache
+
+import motor.motor_asyncio
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    ReadPreference,
+    Secondary,
+    SecondaryPreferred,
+)
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# 可配置的非 primary 模式 (均支持 maxStalenessSeconds)
+SecondaryMode = PrimaryPreferred | Secondary | SecondaryPreferred | Nearest
+ReadPreferenceMode = Primary | SecondaryMode
+
+_SECONDARY_MODES: dict[str, type[SecondaryMode]] = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+class ReadClass(str, Enum):
+    """读操作类别"""
+
+    PRIMARY = "primary"          # 写入前后的读取、所有者读取 (需要读到自己的写入)
+    LISTING = "listing"          # 不写入缓存的匿名列表查询 (可接受短暂延迟)
+    EXPORT = "export"            # 批量导出
+    AGGREGATION = "aggregation"  # 统计 / 对账等聚合
+
+
+@lru_cache
+def get_read_preference(read_class: ReadClass) -> ReadPreferenceMode:
+    """
+    获取操作类别对应的读偏好
+
+    PRIMARY 固定使用主节点；其余类别按 MONGODB_READ_PREFERENCES 配置，
+    非 primary 模式附带 MONGODB_MAX_STALENESS_SECONDS
+
+    Raises:
+        ValueError: 配置了未知的读偏好模式
+    """
+    if read_class == ReadClass.PRIMARY:
+        return ReadPreference.PRIMARY
+
+    mode = settings.mongodb_read_preferences.get(read_class.value, "primary")
+    if mode == "primary":
+        return ReadPreference.PRIMARY
+
+    mode_class = _SECONDARY_MODES.get(mode)
+    if mode_class is None:
+        raise ValueError(f"Unknown read preference for {read_class.value}: {mode}")
+    return mode_class(max_staleness=settings.mongodb_max_staleness_seconds)
+
+
+def with_read_class(
+    collection: motor.motor_asyncio.AsyncIOMotorCollection,
+    read_class: ReadClass,
+) -> motor.motor_asyncio.AsyncIOMotorCollection:
+    """返回使用指定操作类别读偏好的集合对象 (PRIMARY 时原样返回)"""
+    read_preference = get_read_preference(read_class)
+    if read_preference == collection.read_preference:
+        return collection
+    return collection.with_options(read_preference=read_preference)
@@ -3,6 +3,7 @@ Unified Backend Platform - Main Entry Point
 
 FastAPI 应用入口
 """
+import asyncio
 from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import AsyncGenerator
@@ -12,13 +13,44 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, HTMLResponse
 from fastapi.staticfiles import StaticFiles
 
-from app.api.v1.endpoints import auth, files, permissions, records
+from app.api.v1.endpoints import admin, auth, files, payload_schemas, permissions, records
 from app.core.config import get_settings
+from app.db.index_manager import index_manager
 from app.db.mongodb import mongodb
+from app.services.download_service import download_service
+from app.services.image_service import image_service
+from app.services.instant_upload_service import instant_uploads
+from app.services.loop_lag_service import loop_lag_monitor
+from app.services.minio_service import minio_service
+from app.services.record_cache_service import record_cache
+from app.services.record_stats_service import record_stats
+from app.services.retention_service import retention_service
 
 settings = get_settings()
 
 
+async def reconcile_indexes_in_background() -> None:
+    """后台创建缺失索引，失败只记录日志"""
+    try:
+        report = await index_manager.reconcile(await mongodb.get_database())
+        created = {name: r["created"] for name, r in report.items() if r["created"]}
+        dropped = {name: r["dropped"] for name, r in report.items() if r["dropped"]}
+        drift = {
+            name: r["mismatched"]
+            + [extra["name"] for extra in r["extra"] if extra["name"] not in r["dropped"]]
+            for name, r in report.items()
+        }
+        drift = {name: names for name, names in drift.items() if names}
+        if created:
+            print(f"✅ Indexes created: {created}")
+        if dropped:
+            print(f"🗑️  Retired indexes dropped: {dropped}")
+        if drift:
+            print(f"⚠️  Index drift (run scripts/reconcile_indexes.py --drop): {drift}")
+    except Exception as e:
+        print(f"❌ Index reconciliation failed: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """应用生命周期管理"""
@@ -26,8 +58,56 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     await mongodb.connect()
     print(f"✅ MongoDB connected: {settings.mongodb_url}")
 
+    # 索引对账在后台进行，不阻塞启动
+    index_task = None
+    if settings.index_reconcile_on_startup:
+        index_task = asyncio.create_task(reconcile_indexes_in_background())
+
+    # 软删除数据定时归档
+    retention_task = None
+    if settings.retention_enabled:
+        retention_task = asyncio.create_task(retention_service.run_forever())
+
+    # 记录统计定时对账
+    stats_task = None
+    if settings.record_stats_enabled:
+        stats_task = asyncio.create_task(record_stats.run_forever())
+
+    # 图片缩略图 / 尺寸变体处理
+    image_task = None
+    if settings.image_processing_enabled:
+        image_task = asyncio.create_task(image_service.run_forever())
+
+    # 下载计数批量写入 / 存储核对
+    download_task = asyncio.create_task(download_service.run_forever())
+
+    # 事件循环延迟采样
+    lag_task = None
+    if settings.loop_lag_monitor_enabled:
+        lag_task = asyncio.create_task(loop_lag_monitor.run_forever())
+
     yield
 
+    # 取消后台任务并等待其退出，再关闭它们使用的连接
+    tasks = [
+        task
+        for task in (index_task, retention_task, stats_task, image_task, download_task, lag_task)
+        if task is not None
+    ]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    await image_service.close()
+    await download_service.close()
+    await instant_uploads.close()
+    await retention_service.close()
+    await record_stats.close()
+    await record_cache.close()
+
+    # 等待进行中的对象存储调用完成
+    minio_service.close()
+
     # 关闭时断开连接
     await mongodb.disconnect()
     print("✅ MongoDB disconnected")
@@ -195,12 +275,24 @@ app.include_router(
     tags=["Records"],
 )
 
+app.include_router(
+    payload_schemas.router,
+    prefix=settings.api_prefix,
+    tags=["Payload Schemas"],
+)
+
 app.include_router(
     files.router,
     prefix=settings.api_prefix,
     tags=["Files"],
 )
 
+app.include_router(
+    admin.router,
+    prefix=settings.api_prefix,
+    tags=["Admin"],
+)
+
 
 # ============================================================================
 # 静态文件和文档路由配置
@@ -1,13 +1,24 @@
 """Models module"""
 
+from app.models.collection_schema import CollectionSchema
 from app.models.file import File, FileCategory, FileStatus
+from app.models.record_partition import PartitionStatus, RecordPartition
+from app.models.record_revision import RecordRevision
+from app.models.record_stats import RecordStats
+from app.models.stored_object import StoredObject
 from app.models.unified_record import UnifiedRecord
 from app.models.user import User
 
 __all__ = [
     "User",
     "UnifiedRecord",
+    "RecordRevision",
+    "RecordPartition",
+    "PartitionStatus",
+    "RecordStats",
+    "CollectionSchema",
     "File",
     "FileCategory",
     "FileStatus",
+    "StoredObject",
 ]
@@ -0,0 +1,51 @@
+"""
+Unified Backend Platform - CollectionSchema Model
+
+按 (app_identifier, collection_type) 注册的 payload JSON Schema
+"""
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from beanie import Document
+from pydantic import Field, field_validator
+
+
+class CollectionSchema(Document):
+    """
+    payload 结构约束
+
+    注册后，该应用/数据类型的记录在创建、更新、部分更新和批量导入时
+    都会按此 JSON Schema 校验 payload；未注册的组合不做校验。
+    """
+
+    id: str = Field(..., description="Schema ID ({app_identifier}:{collection_type})")
+
+    app_identifier: str = Field(..., description="应用标识符")
+    collection_type: str = Field(..., description="数据类型")
+
+    json_schema: dict[str, Any] = Field(..., description="JSON Schema (Draft 4/6/7)")
+    version: int = Field(default=1, description="Schema 版本号 (每次修改递增)")
+    is_enabled: bool = Field(default=True, description="是否启用校验")
+
+    created_by: UUID | None = Field(default=None, description="创建者 ID")
+    created_at: datetime = Field(default_factory=datetime.utcnow, description="创建时间")
+    updated_at: datetime = Field(default_factory=datetime.utcnow, description="更新时间")
+
+    class Settings:
+        name = "collection_schemas"
+
+    @field_validator("app_identifier", "collection_type")
+    @classmethod
+    def lowercase_identifier(cls, v: str) -> str:
+        """标识符转小写并规范化 (与 UnifiedRecord 一致)"""
+        return v.lower().strip().replace("_", "-")
+
+    @staticmethod
+    def make_id(app_identifier: str, collection_type: str) -> str:
+        """生成 Schema ID"""
+        return f"{app_identifier}:{collection_type}"
+
+    def touch(self) -> None:
+        """更新 updated_at 时间戳"""
+        self.updated_at = datetime.utcnow()
@@ -8,7 +8,7 @@ from enum import Enum
 from typing import Any
 from uuid import UUID, uuid4
 
-from beanie import Document, Indexed
+from beanie import Document
 from pydantic import Field, field_validator
 
 
@@ -50,12 +50,14 @@ class File(Document):
     # ==========================================================================
     id: UUID = Field(default_factory=uuid4, description="文件 ID")
 
-    owner_id: UUID | None = Indexed(
-        description="所有者用户 ID，匿名上传为 None"
+    owner_id: UUID | None = Field(
+        default=None,
+        description="所有者用户 ID，匿名上传为 None",
     )
 
-    app_identifier: str = Indexed(
-        description="应用标识符 (如: blog-app, forum-app)"
+    app_identifier: str = Field(
+        ...,
+        description="应用标识符 (如: blog-app, forum-app)",
     )
 
     # ==========================================================================
@@ -107,6 +109,16 @@ class File(Document):
     width: int | None = Field(default=None, description="图片宽度 (像素)")
     height: int | None = Field(default=None, description="图片高度 (像素)")
 
+    image_variants: dict[str, str] = Field(
+        default_factory=dict,
+        description="WebP 尺寸变体 {最长边: 缩略图存储桶中的路径}",
+    )
+
+    image_processed_at: datetime | None = Field(
+        default=None,
+        description="缩略图/变体处理完成时间 (失败也记录，避免反复重试)",
+    )
+
     # 视频/音频额外信息
     duration: int | None = Field(default=None, description="时长 (秒)")
 
@@ -127,12 +139,22 @@ class File(Document):
         description="上传失败时的错误信息",
     )
 
+    multipart_upload_id: str | None = Field(
+        default=None,
+        description="进行中的 S3 分片上传 ID (分片上传完成或中止后清空)",
+    )
+
     # 文件哈希 (用于去重)
     file_hash: str | None = Field(
         default=None,
         description="文件 SHA256 哈希 (去重用)",
     )
 
+    content_key: str | None = Field(
+        default=None,
+        description="去重后引用的存储对象 ID (StoredObject)，仅服务端计算哈希的上传",
+    )
+
     # ==========================================================================
     # 访问控制
     # ==========================================================================
@@ -177,6 +199,11 @@ class File(Document):
         description="过期时间 (临时文件)",
     )
 
+    deleted_at: datetime | None = Field(
+        default=None,
+        description="删除时间 (软删除)",
+    )
+
     # ==========================================================================
     # 自定义元数据 (可存储任意 JSON)
     # ==========================================================================
@@ -190,18 +217,7 @@ class File(Document):
     # ==========================================================================
     class Settings:
         name = "files"
-        indexes = [
-            "owner_id",
-            "app_identifier",
-            "category",
-            "status",
-            "is_deleted",
-            "is_public",
-            "file_hash",
-            "created_at",
-            ("owner_id", "app_identifier"),
-            ("app_identifier", "category"),
-        ]
+        # 索引统一在 app.db.indexes 中声明，由 IndexManager 对账
         use_state_management = True
 
     @field_validator("app_identifier")
@@ -220,6 +236,12 @@ class File(Document):
         """更新 updated_at 时间戳"""
         self.updated_at = datetime.utcnow()
 
+    def mark_deleted(self) -> None:
+        """软删除 (记录删除时间，供归档任务使用)"""
+        self.is_deleted = True
+        self.deleted_at = datetime.utcnow()
+        self.touch()
+
     def increment_download(self) -> None:
         """增加下载次数"""
         self.download_count += 1
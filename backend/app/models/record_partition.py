@@ -0,0 +1,47 @@
+"""
+Unified Backend Platform - RecordPartition Model
+
+UnifiedRecord 按应用分区的路由表
+"""
+from datetime import datetime
+from enum import Enum
+
+from beanie import Document
+from pydantic import Field
+
+
+class PartitionStatus(str, Enum):
+    """分区状态"""
+
+    MIGRATING = "migrating"  # 迁移中: 新写入进入分区集合，读取同时查询共享集合和分区集合
+    ACTIVE = "active"        # 已完成: 该应用的读写只访问分区集合
+
+
+class RecordPartition(Document):
+    """
+    记录分区路由
+
+    数据量大的应用可以拥有独立的物理集合，避免其索引和工作集挤占其他应用。
+    未出现在路由表中的应用仍使用共享的 unified_records 集合。
+    """
+
+    id: str = Field(..., description="应用标识符 (已规范化)")
+    collection_name: str = Field(..., description="分区集合名称")
+    status: PartitionStatus = Field(default=PartitionStatus.MIGRATING, description="分区状态")
+    migrated_count: int = Field(default=0, description="已从共享集合迁移的文档数")
+
+    created_at: datetime = Field(default_factory=datetime.utcnow, description="创建时间")
+    updated_at: datetime = Field(default_factory=datetime.utcnow, description="更新时间")
+    activated_at: datetime | None = Field(default=None, description="迁移完成时间")
+
+    class Settings:
+        name = "record_partitions"
+
+    @property
+    def app_identifier(self) -> str:
+        """应用标识符"""
+        return self.id
+
+    def touch(self) -> None:
+        """更新 updated_at 时间戳"""
+        self.updated_at = datetime.utcnow()
@@ -0,0 +1,54 @@
+"""
+Unified Backend Platform - RecordRevision Model
+
+UnifiedRecord.payload 的历史版本 (反向增量 + 定期快照)
+"""
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from beanie import Document
+from pydantic import Field
+
+
+class RecordRevision(Document):
+    """
+    记录历史版本
+
+    每次更新 UnifiedRecord 时写入被替换版本的信息：
+    - 版本号为快照间隔的整数倍时，保存完整 payload (snapshot)
+    - 其余版本只保存反向增量 (delta)：从下一版本的 payload 还原本版本所需的修改
+
+    还原任意版本只需读取 [version, 下一个快照] 区间内的修订 (一次范围查询)，
+    区间超出已有修订时以记录当前 payload 作为起点。
+
+    ID 固定为 "{record_id}:{version}"，写入是幂等的 upsert。
+    """
+
+    id: str = Field(..., description="修订 ID ({record_id}:{version})")
+
+    record_id: UUID = Field(..., description="记录 ID (UnifiedRecord.id)")
+    version: int = Field(..., description="被替换的版本号")
+
+    snapshot: dict[str, Any] | None = Field(default=None, description="完整 payload (快照版本)")
+    delta: dict[str, Any] | None = Field(
+        default=None,
+        description='反向增量 {"set": [[path, value], ...], "unset": [path, ...]}',
+    )
+
+    changed_by: UUID | None = Field(default=None, description="产生下一版本的用户 ID")
+    created_at: datetime = Field(default_factory=datetime.utcnow, description="写入时间")
+
+    class Settings:
+        name = "record_revisions"
+        # 索引统一在 app.db.indexes 中声明，由 IndexManager 对账
+
+    @property
+    def is_snapshot(self) -> bool:
+        """是否为快照版本"""
+        return self.snapshot is not None
+
+    @staticmethod
+    def make_id(record_id: UUID, version: int) -> str:
+        """生成修订 ID"""
+        return f"{record_id}:{version}"
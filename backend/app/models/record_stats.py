@@ -0,0 +1,39 @@
+"""
+Unified Backend Platform - RecordStats Model
+
+按 (app_identifier, collection_type) 物化的记录统计
+"""
+from datetime import datetime
+
+from beanie import Document
+from pydantic import Field
+
+
+class RecordStats(Document):
+    """
+    记录统计
+
+    创建、删除、发布状态变化和 payload 更新时增量维护，
+    并由定时对账任务按实际数据重新计算，修正增量更新可能产生的偏差。
+    只统计未删除的记录。
+    """
+
+    id: str = Field(..., description="统计 ID ({app_identifier}:{collection_type})")
+
+    app_identifier: str = Field(..., description="应用标识符")
+    collection_type: str = Field(..., description="数据类型")
+
+    record_count: int = Field(default=0, description="记录数")
+    published_count: int = Field(default=0, description="已发布记录数")
+    storage_bytes: int = Field(default=0, description="记录文档的 BSON 大小合计 (字节)")
+
+    last_activity_at: datetime | None = Field(default=None, description="最后一次写入时间")
+    reconciled_at: datetime | None = Field(default=None, description="最后一次对账时间")
+
+    class Settings:
+        name = "record_stats"
+
+    @staticmethod
+    def make_id(app_identifier: str, collection_type: str) -> str:
+        """生成统计 ID"""
+        return f"{app_identifier}:{collection_type}"
@@ -0,0 +1,40 @@
+"""
+Unified Backend Platform - StoredObject Model
+
+内容寻址的对象存储引用计数
+"""
+from datetime import datetime
+
+from beanie import Document
+from pydantic import Field
+
+
+class StoredObject(Document):
+    """
+    按 (app_identifier, SHA-256) 去重的存储对象
+
+    同一应用内内容相同的文件共用一个对象存储对象，File.content_key 指向本文档；
+    ref_count 为引用该对象的未删除文件数。引用归零且删除时要求删除存储内容，
+    才会删除对象 (以及本文档)；否则保留，后续相同内容的上传仍可复用。
+    """
+
+    id: str = Field(..., description="对象 ID ({app_identifier}:{sha256})")
+
+    app_identifier: str = Field(..., description="应用标识符")
+    file_hash: str = Field(..., description="内容 SHA-256 (十六进制)")
+    file_size: int = Field(..., description="对象大小 (字节)")
+    content_type: str = Field(..., description="首次上传时的 MIME 类型")
+
+    bucket_name: str = Field(..., description="存储桶名称")
+    storage_path: str = Field(..., description="对象存储路径 (首次上传的路径)")
+
+    ref_count: int = Field(default=0, description="引用该对象的文件数")
+    created_at: datetime = Field(default_factory=datetime.utcnow, description="创建时间")
+
+    class Settings:
+        name = "stored_objects"
+
+    @staticmethod
+    def make_id(app_identifier: str, file_hash: str) -> str:
+        """生成对象 ID"""
+        return f"{app_identifier}:{file_hash}"
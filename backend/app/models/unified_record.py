@@ -7,8 +7,11 @@ from datetime import datetime
 from typing import Any
 from uuid import UUID, uuid4
 
-from beanie import Document, Indexed
-from pydantic import Field, field_validator
+from beanie import Document, Insert, Replace, Save, before_event
+from beanie.odm.utils.dump import get_dict
+from pydantic import Field, PrivateAttr, computed_field, field_validator
+
+from app.core.payload_compression import compress_payload, decompress_payload
 
 
 class UnifiedRecord(Document):
@@ -43,25 +46,45 @@ class UnifiedRecord(Document):
     # ==========================================================================
     id: UUID = Field(default_factory=uuid4, description="记录 ID")
 
-    app_identifier: str = Indexed(
-        description="应用标识符 (如: blog-app, shop-app)"
+    app_identifier: str = Field(
+        ...,
+        description="应用标识符 (如: blog-app, shop-app)",
+    )
+
+    collection_type: str = Field(
+        ...,
+        description="数据类型 (如: post, comment, order)",
     )
 
-    collection_type: str = Indexed(
-        description="数据类型 (如: post, comment, order)"
+    owner_id: UUID | None = Field(
+        default=None,
+        description="所有者用户 ID (User.id)，匿名数据为 None",
     )
 
-    owner_id: UUID | None = Indexed(
-        description="所有者用户 ID (User.id)，匿名数据为 None"
+    external_id: str | None = Field(
+        default=None,
+        description="外部系统中的键，同一应用/数据类型内唯一 (供数据同步按键 upsert)",
     )
 
     # ==========================================================================
-    # 核心业务数据 (任意 JSON 结构)
+    # 核心业务数据 (任意 JSON 结构，通过 payload 属性读写)
     # ==========================================================================
-    payload: dict[str, Any] = Field(
+    # 存储层字段：数据库中的 payload。未压缩时即完整 payload；
+    # 开启压缩且超过阈值时只保留需要筛选的键，完整 payload 以 zstd 保存在 payload_compressed
+    # (见 app.core.payload_compression)
+    stored_payload: dict[str, Any] = Field(
         default_factory=dict,
-        description="业务数据负载，可存储任意 JSON 结构",
+        alias="payload",
+        exclude=True,
+        description="数据库中的 payload (压缩时只含筛选键，不出现在响应中)",
+    )
+    payload_compressed: bytes | None = Field(
+        default=None,
+        exclude=True,
+        description="zstd 压缩的完整 payload (不出现在响应中)",
     )
+    # 压缩记录解压后的完整 payload (首次访问 payload 时解压)
+    _payload: dict[str, Any] | None = PrivateAttr(default=None)
 
     # ==========================================================================
     # 元数据与软删除
@@ -78,6 +101,7 @@ class UnifiedRecord(Document):
     created_at: datetime = Field(default_factory=datetime.utcnow, description="创建时间")
     updated_at: datetime = Field(default_factory=datetime.utcnow, description="更新时间")
     published_at: datetime | None = Field(default=None, description="发布时间")
+    deleted_at: datetime | None = Field(default=None, description="删除时间 (软删除)")
 
     # ==========================================================================
     # 扩展字段 (可选的版本控制和统计)
@@ -90,15 +114,7 @@ class UnifiedRecord(Document):
     # ==========================================================================
     class Settings:
         name = "unified_records"
-        indexes = [
-            "app_identifier",
-            "collection_type",
-            "owner_id",
-            ("app_identifier", "collection_type"),  # 复合索引
-            ("app_identifier", "collection_type", "owner_id"),  # 复合索引
-            "created_at",
-            "is_deleted",
-        ]
+        # 索引统一在 app.db.indexes 中声明，由 IndexManager 对账
         use_state_management = True  # 启用变更追踪
 
     @field_validator("app_identifier", "collection_type")
@@ -107,10 +123,54 @@ class UnifiedRecord(Document):
         """标识符转小写并规范化"""
         return v.lower().strip().replace("_", "-")
 
+    @computed_field(description="业务数据负载，可存储任意 JSON 结构")
+    @property
+    def payload(self) -> dict[str, Any]:
+        """完整 payload (压缩记录在首次访问时解压)"""
+        if self.payload_compressed is None:
+            return self.stored_payload
+        if self._payload is None:
+            self._payload = decompress_payload(self.payload_compressed)
+        return self._payload
+
+    @payload.setter
+    def payload(self, value: dict[str, Any]) -> None:
+        # 写入时再按配置压缩
+        self.stored_payload = value
+        self.payload_compressed = None
+        self._payload = None
+
+    @property
+    def payload_loaded(self) -> bool:
+        """payload 是否无需解压即可读取 (未压缩或已解压)"""
+        return self.payload_compressed is None or self._payload is not None
+
+    @before_event(Insert, Replace, Save)
+    def compress_before_write(self) -> None:
+        """写入前按配置压缩 payload (未访问过 payload 的压缩记录按存储格式原样写入)"""
+        if not self.payload_loaded:
+            return
+        payload = self.payload
+        self.stored_payload, self.payload_compressed = compress_payload(
+            self.app_identifier, self.collection_type, payload
+        )
+        self._payload = payload if self.payload_compressed is not None else None
+
+    def to_stored_document(self) -> dict[str, Any]:
+        """编码为数据库中的文档 (已按配置压缩 payload)，供不经过 Beanie 的批量写入使用"""
+        self.compress_before_write()
+        return get_dict(self, to_db=True)
+
     def touch(self) -> None:
         """更新 updated_at 时间戳"""
         self.updated_at = datetime.utcnow()
 
+    def mark_deleted(self) -> None:
+        """软删除 (记录删除时间，供归档任务使用)"""
+        self.is_deleted = True
+        self.deleted_at = datetime.utcnow()
+        self.touch()
+
     def increment_view(self) -> None:
         """增加查看次数"""
         self.view_count += 1
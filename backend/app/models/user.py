@@ -7,7 +7,7 @@ from datetime import datetime
 from typing import Literal
 from uuid import UUID, uuid4
 
-from beanie import Document, Indexed
+from beanie import Document
 from pydantic import Field, field_validator
 
 
@@ -23,9 +23,9 @@ class User(Document):
     # ==========================================================================
     id: UUID = Field(default_factory=uuid4, description="本地用户 ID")
 
-    casdoor_id: str = Indexed(unique=True, description="Casdoor 用户 ID")
+    casdoor_id: str = Field(..., description="Casdoor 用户 ID (唯一)")
 
-    email: str = Indexed(unique=True, description="用户邮箱")
+    email: str = Field(..., description="用户邮箱 (唯一)")
 
     # ==========================================================================
     # 用户属性
@@ -66,14 +66,7 @@ class User(Document):
     # ==========================================================================
     class Settings:
         name = "users"
-        indexes = [
-            "casdoor_id",
-            "email",
-            "is_superuser",
-            "is_active",
-            "created_at",
-            "primary_role_id",
-        ]
+        # 索引统一在 app.db.indexes 中声明，由 IndexManager 对账
 
     @field_validator("email")
     @classmethod
@@ -0,0 +1,303 @@
+"""
+Unified Backend Platform - Download Service
+
+文件下载：预签名 URL 缓存、下载计数批量写入、对象存储定时核对
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime
+from uuid import UUID
+
+import redis.asyncio as redis
+from bson import Binary
+from pymongo import UpdateOne
+
+from app.core.config import get_settings
+from app.models.file import File, FileStatus
+from app.services.minio_service import minio_service
+
+settings = get_settings()
+
+# 存储核对时同时进行的 HEAD 请求数 (不挤占上传 / 下载使用的 S3 线程池)
+_RECONCILE_CONCURRENCY = 4
+
+
+class DownloadService:
+    """
+    文件下载服务
+
+    职责:
+    1. 按对象缓存下载预签名 URL，剩余有效期低于 download_url_refresh_margin 时重新签名
+       (缓存在 worker 进程内，LRU 淘汰)
+    2. 下载计数先在内存中累加，每 download_count_flush_seconds 秒一次 bulk_write ($inc)
+    3. 下载时信任 File.status == COMPLETED，不再逐次 HEAD；
+       由定时核对分批检查已完成文件的对象是否存在，缺失的标记为 FAILED。
+       核对游标保存在 Redis，多 worker 部署时通过 Redis 锁保证同一周期只有一个 worker 执行
+
+    worker 异常退出时未写入的下载计数会丢失 (最多一个写入间隔)。
+    """
+
+    LOCK_KEY = "storage_reconcile:lock"
+    CURSOR_KEY = "storage_reconcile:cursor"
+
+    def __init__(self) -> None:
+        # (bucket, object_name) -> (url, 过期时间 monotonic)
+        self._urls: OrderedDict[tuple[str, str], tuple[str, float]] = OrderedDict()
+        self._pending_counts: dict[UUID, int] = {}
+        self._redis_client: redis.Redis | None = None
+
+    # ==============================================================================
+    # 预签名 URL
+    # ==============================================================================
+
+    async def get_download_url(self, file_record: File) -> tuple[str, int]:
+        """
+        获取文件的下载 URL
+
+        Returns:
+            (预签名 URL, 剩余有效期秒数)
+        """
+        urls = await self.get_download_urls([file_record])
+        return urls[(file_record.bucket_name, file_record.storage_path)]
+
+    async def get_download_urls(
+        self,
+        file_records: list[File],
+    ) -> dict[tuple[str, str], tuple[str, int]]:
+        """
+        批量获取下载 URL，未缓存的对象在一次线程池调用中签名
+
+        Returns:
+            {(bucket, storage_path): (预签名 URL, 剩余有效期秒数)}
+        """
+        return await self.get_object_urls(
+            [(file_record.bucket_name, file_record.storage_path) for file_record in file_records]
+        )
+
+    async def get_object_urls(
+        self,
+        keys: list[tuple[str, str]],
+    ) -> dict[tuple[str, str], tuple[str, int]]:
+        """
+        批量获取对象的下载 URL (也用于缩略图存储桶中的按需变体)
+
+        Returns:
+            {(bucket, object_name): (预签名 URL, 剩余有效期秒数)}
+        """
+        now = time.monotonic()
+        result: dict[tuple[str, str], tuple[str, int]] = {}
+        missing: list[tuple[str, str]] = []
+        for key in keys:
+            if key in result or key in missing:
+                continue
+            cached = self._urls.get(key)
+            if cached is not None:
+                url, expires_at = cached
+                if expires_at - now > settings.download_url_refresh_margin:
+                    self._urls.move_to_end(key)
+                    result[key] = (url, int(expires_at - now))
+                    continue
+                del self._urls[key]
+            missing.append(key)
+
+        if missing:
+            expires_in = settings.download_url_expires
+            signed = await minio_service.generate_presigned_get_urls(missing, expires_in)
+            for key, url in signed.items():
+                result[key] = (url, expires_in)
+                if settings.download_url_cache_size:
+                    self._urls[key] = (url, now + expires_in)
+            while len(self._urls) > settings.download_url_cache_size:
+                self._urls.popitem(last=False)
+        return result
+
+    def forget(self, file_record: File) -> None:
+        """丢弃缓存的 URL (如对象已缺失)"""
+        self._urls.pop((file_record.bucket_name, file_record.storage_path), None)
+
+    # ==============================================================================
+    # 下载计数
+    # ==============================================================================
+
+    def count_download(self, file_id: UUID) -> None:
+        """记录一次下载 (延迟写入)"""
+        self._pending_counts[file_id] = self._pending_counts.get(file_id, 0) + 1
+
+    async def flush_counts(self) -> int:
+        """
+        写入累计的下载计数
+
+        Returns:
+            更新的文件数
+        """
+        if not self._pending_counts:
+            return 0
+        pending, self._pending_counts = self._pending_counts, {}
+
+        try:
+            await File.get_motor_collection().bulk_write(
+                [
+                    UpdateOne({"_id": Binary.from_uuid(file_id)}, {"$inc": {"download_count": count}})
+                    for file_id, count in pending.items()
+                ],
+                ordered=False,
+            )
+        except Exception:
+            # 写入失败时合并回待写入计数，下个周期重试
+            for file_id, count in pending.items():
+                self._pending_counts[file_id] = self._pending_counts.get(file_id, 0) + count
+            raise
+        return len(pending)
+
+    async def _flush_forever(self) -> None:
+        """定时写入下载计数"""
+        while True:
+            await asyncio.sleep(settings.download_count_flush_seconds)
+            try:
+                await self.flush_counts()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Download count flush failed: {e}")
+
+    # ==============================================================================
+    # 存储核对
+    # ==============================================================================
+
+    async def _get_redis(self) -> redis.Redis:
+        """获取 Redis 客户端"""
+        if self._redis_client is None:
+            self._redis_client = redis.from_url(
+                settings.redis_url,
+                encoding="utf-8",
+                decode_responses=True,
+            )
+        return self._redis_client
+
+    async def _acquire_lock(self) -> bool:
+        """获取本周期的核对锁，Redis 不可用时直接执行"""
+        try:
+            r = await self._get_redis()
+            return bool(
+                await r.set(
+                    self.LOCK_KEY,
+                    datetime.utcnow().isoformat(),
+                    nx=True,
+                    ex=max(settings.storage_reconcile_interval_seconds - 1, 1),
+                )
+            )
+        except Exception as e:
+            print(f"Storage reconcile lock error: {e}")
+            return True
+
+    async def _get_cursor(self) -> UUID | None:
+        """上次核对到的文件 ID"""
+        try:
+            r = await self._get_redis()
+            value = await r.get(self.CURSOR_KEY)
+            return UUID(value) if value else None
+        except Exception:
+            return None
+
+    async def _set_cursor(self, file_id: UUID | None) -> None:
+        """保存核对游标 (None 表示下一周期从头开始)"""
+        try:
+            r = await self._get_redis()
+            if file_id is None:
+                await r.delete(self.CURSOR_KEY)
+            else:
+                await r.set(self.CURSOR_KEY, str(file_id))
+        except Exception as e:
+            print(f"Storage reconcile cursor error: {e}")
+
+    async def reconcile(self, use_lock: bool = True) -> list[UUID] | None:
+        """
+        按 ID 顺序核对一批已完成文件，对象缺失的标记为 FAILED
+
+        只有存储明确返回对象不存在时才标记；其他错误 (权限、限流、5xx 等)
+        使整批失败且不推进游标，下一周期重新核对。
+
+        Returns:
+            本批标记为缺失的文件 ID；未获得锁时为 None
+
+        Raises:
+            ClientError: 存储返回对象不存在以外的错误
+        """
+        if use_lock and not await self._acquire_lock():
+            return None
+
+        cursor = await self._get_cursor()
+        query = File.find(File.status == FileStatus.COMPLETED, File.is_deleted == False)
+        if cursor is not None:
+            query = query.find(File.id > cursor)
+        batch = await query.sort(+File.id).limit(settings.storage_reconcile_batch_size).to_list()
+
+        semaphore = asyncio.Semaphore(_RECONCILE_CONCURRENCY)
+
+        async def exists(file_record: File) -> bool:
+            async with semaphore:
+                return await minio_service.file_exists(
+                    file_record.bucket_name,
+                    file_record.storage_path,
+                )
+
+        results = await asyncio.gather(*(exists(file_record) for file_record in batch))
+        missing = [
+            file_record for file_record, found in zip(batch, results) if not found
+        ]
+        for file_record in missing:
+            # 条件更新：核对期间被删除或重新上传的文件不受影响
+            await File.find_one(
+                File.id == file_record.id,
+                File.status == FileStatus.COMPLETED,
+                File.storage_path == file_record.storage_path,
+            ).update(
+                {
+                    "$set": {
+                        File.status: FileStatus.FAILED,
+                        File.error_message: "Object missing from storage",
+                        File.updated_at: datetime.utcnow(),
+                    }
+                }
+            )
+            self.forget(file_record)
+            print(f"⚠️  File {file_record.id} missing from storage: {file_record.storage_path}")
+
+        # 不足一批说明已到末尾，下一周期从头开始
+        full = len(batch) == settings.storage_reconcile_batch_size
+        await self._set_cursor(batch[-1].id if full else None)
+        return [file_record.id for file_record in missing]
+
+    async def run_forever(self) -> None:
+        """定时写入下载计数、核对存储 (在应用生命周期内作为后台任务运行)"""
+        flusher = asyncio.create_task(self._flush_forever())
+        try:
+            while True:
+                if settings.storage_reconcile_enabled:
+                    try:
+                        await self.reconcile()
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        print(f"❌ Storage reconcile failed: {e}")
+
+                await asyncio.sleep(settings.storage_reconcile_interval_seconds)
+        finally:
+            flusher.cancel()
+
+    async def close(self) -> None:
+        """写入剩余的下载计数，关闭 Redis 连接"""
+        try:
+            await self.flush_counts()
+        except Exception as e:
+            print(f"❌ Download count flush failed: {e}")
+        if self._redis_client:
+            await self._redis_client.close()
+            self._redis_client = None
+
+
+# 全局单例
+download_service = DownloadService()
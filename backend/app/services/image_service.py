@@ -0,0 +1,405 @@
+"""
+Unified Backend Platform - Image Service
+
+图片后台处理：上传确认后生成 WebP 缩略图和尺寸变体，记录图片尺寸
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Any, Callable, Literal, TypeVar
+from uuid import UUID
+
+import redis.asyncio as redis
+from pydantic import BaseModel, Field
+
+from app.core.config import get_settings
+from app.core.image_processing import OUTPUT_FORMATS, render_variants, transform
+from app.models.file import File, FileCategory, FileStatus
+from app.services.minio_service import minio_service
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+# 不做栅格化处理的图片类型
+_SKIPPED_TYPES = {"image/svg+xml"}
+
+# 待处理队列上限；队列满时丢弃，由定时补处理任务兜底
+_QUEUE_SIZE = 1000
+
+
+class ImageTransform(BaseModel):
+    """按需缩放参数"""
+
+    width: int | None = Field(default=None, description="目标宽度 (像素)")
+    height: int | None = Field(default=None, description="目标高度 (像素)")
+    fit: Literal["contain", "cover", "fill"] = Field(default="contain", description="适配方式")
+    format: Literal["webp", "jpeg", "png"] = Field(default="webp", description="输出格式")
+    quality: int = Field(default=80, description="有损格式质量")
+
+    @property
+    def name(self) -> str:
+        """变体文件名 (参数相同的请求共用同一个缓存对象)"""
+        width = self.width or "auto"
+        height = self.height or "auto"
+        return f"{width}x{height}-{self.fit}-q{self.quality}.{self.format}"
+
+    @property
+    def content_type(self) -> str:
+        """输出 MIME 类型"""
+        return OUTPUT_FORMATS[self.format][1]
+
+
+class ImageService:
+    """
+    图片处理服务
+
+    职责:
+    1. 上传确认后将图片加入进程内队列，后台任务从队列取出处理
+    2. 解码、缩放、WebP 编码在进程池中执行 (不占用事件循环，不受 GIL 限制)
+    3. 缩略图存到 generate_thumbnail_path，尺寸变体存到 generate_variant_path
+       (均在缩略图存储桶)，并把尺寸、路径写回 File 文档
+    4. 内容去重的文件直接复用同一内容已生成的变体
+    5. 定时扫描未处理的图片 (入队后 worker 重启等情况)；
+       多 worker 部署时通过 Redis 锁保证同一周期只有一个 worker 扫描
+    6. 按需缩放：结果缓存在缩略图存储桶，同一 worker 内对同一变体的并发请求只渲染一次；
+       已确认存在的变体记录在进程内 LRU 中，之后的请求不再 HEAD
+
+    处理失败也会写入 image_processed_at，避免损坏的图片被反复重试。
+    """
+
+    LOCK_KEY = "image_processing:lock"
+
+    def __init__(self) -> None:
+        self._pool: ProcessPoolExecutor | None = None
+        self._queue: asyncio.Queue[UUID] | None = None
+        self._redis_client: redis.Redis | None = None
+        # 渲染中的按需变体 (变体路径 -> 渲染任务)，并发请求共用同一任务
+        self._inflight: dict[str, asyncio.Future[None]] = {}
+        # 已确认存在的按需变体 (源对象路径, 变体路径)；
+        # 内容删除后重新上传时源对象路径不同，不会命中已删除的变体
+        self._known_variants: OrderedDict[tuple[str, str], None] = OrderedDict()
+
+    # ==============================================================================
+    # 进程池
+    # ==============================================================================
+
+    async def run_in_pool(self, func: Callable[..., T], *args: Any) -> T:
+        """在图片处理进程池中执行 CPU 密集函数"""
+        if self._pool is None:
+            # spawn: 子进程不继承事件循环、线程池和数据库连接
+            self._pool = ProcessPoolExecutor(
+                max_workers=settings.image_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._pool, func, *args)
+        except BrokenProcessPool:
+            # 子进程异常退出 (如内存不足被杀) 后进程池不可再用，下次调用时重建
+            self._pool = None
+            raise
+
+    # ==============================================================================
+    # 队列
+    # ==============================================================================
+
+    def _get_queue(self) -> asyncio.Queue[UUID]:
+        """获取待处理队列"""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+        return self._queue
+
+    def enqueue(self, file_record: File) -> None:
+        """上传确认后调用：图片加入处理队列 (非图片忽略)"""
+        if not settings.image_processing_enabled or not self._should_process(file_record):
+            return
+        try:
+            self._get_queue().put_nowait(file_record.id)
+        except asyncio.QueueFull:
+            print(f"⚠️  Image queue full, {file_record.id} left for the sweep")
+
+    @staticmethod
+    def _should_process(file_record: File) -> bool:
+        """是否需要生成缩略图"""
+        return (
+            file_record.category == FileCategory.IMAGE
+            and file_record.content_type not in _SKIPPED_TYPES
+            and file_record.status == FileStatus.COMPLETED
+            and file_record.image_processed_at is None
+        )
+
+    # ==============================================================================
+    # 处理
+    # ==============================================================================
+
+    async def process(self, file_id: UUID) -> bool:
+        """
+        生成单个文件的缩略图和变体
+
+        Returns:
+            是否成功生成 (或复用) 变体
+        """
+        file_record = await File.find_one(File.id == file_id, File.is_deleted == False)
+        if file_record is None or not self._should_process(file_record):
+            return False
+
+        update: dict[str, Any] = {File.image_processed_at: datetime.utcnow()}
+        succeeded = False
+        try:
+            reused = await self._find_processed_duplicate(file_record)
+            if reused is not None:
+                update.update(
+                    {
+                        File.width: reused.width,
+                        File.height: reused.height,
+                        File.thumbnail_path: reused.thumbnail_path,
+                        File.image_variants: reused.image_variants,
+                    }
+                )
+            else:
+                update.update(await self._render(file_record))
+            succeeded = True
+        except Exception as e:
+            print(f"❌ Image processing failed for {file_id}: {e}")
+
+        await File.find_one(File.id == file_id).update({"$set": update})
+        return succeeded
+
+    async def _find_processed_duplicate(self, file_record: File) -> File | None:
+        """内容去重的文件：查找同一内容已处理过的文件"""
+        if file_record.content_key is None:
+            return None
+        return await File.find_one(
+            File.content_key == file_record.content_key,
+            File.thumbnail_path != None,
+        )
+
+    async def _render(self, file_record: File) -> dict[Any, Any]:
+        """读取原图，在进程池中生成变体并上传"""
+        data = await minio_service.get_bytes(file_record.bucket_name, file_record.storage_path)
+
+        sizes = sorted({settings.image_thumbnail_size, *settings.image_variant_sizes})
+        width, height, rendered = await self.run_in_pool(
+            render_variants,
+            data,
+            sizes,
+            settings.image_webp_quality,
+        )
+        del data
+
+        bucket = settings.minio_thumbnail_bucket
+        thumbnail_path = minio_service.generate_thumbnail_path(
+            file_record.app_identifier,
+            file_record.id,
+        )
+        variants: dict[str, str] = {}
+        for size, body in rendered.items():
+            if size == settings.image_thumbnail_size:
+                path = thumbnail_path
+            else:
+                path = minio_service.generate_variant_path(
+                    file_record.app_identifier,
+                    file_record.id,
+                    str(size),
+                )
+            await minio_service.put_bytes(bucket, path, body, "image/webp")
+            variants[str(size)] = path
+
+        return {
+            File.width: width,
+            File.height: height,
+            File.thumbnail_path: thumbnail_path,
+            File.image_variants: variants,
+        }
+
+    # ==============================================================================
+    # 按需缩放
+    # ==============================================================================
+
+    def transform_path(self, file_record: File, spec: ImageTransform) -> str:
+        """按需变体的存储路径 (缩略图存储桶)"""
+        return minio_service.generate_transform_prefix(file_record) + spec.name
+
+    async def get_transformed(self, file_record: File, spec: ImageTransform) -> str:
+        """
+        获取按需变体 (不存在时渲染并写入缓存)
+
+        Returns:
+            缩略图存储桶中的路径
+        """
+        path = self.transform_path(file_record, spec)
+        known = (file_record.storage_path, path)
+        if known in self._known_variants:
+            self._known_variants.move_to_end(known)
+            return path
+
+        if not await minio_service.file_exists(settings.minio_thumbnail_bucket, path):
+            task = self._inflight.get(path)
+            if task is None:
+                task = asyncio.ensure_future(self._render_transform(file_record, spec, path))
+                self._inflight[path] = task
+                task.add_done_callback(lambda _: self._inflight.pop(path, None))
+
+            # shield: 某个请求断开不会取消其他请求正在等待的渲染
+            await asyncio.shield(task)
+
+        if settings.image_transform_known_cache_size:
+            self._known_variants[known] = None
+            while len(self._known_variants) > settings.image_transform_known_cache_size:
+                self._known_variants.popitem(last=False)
+        return path
+
+    def _pick_source(self, file_record: File, spec: ImageTransform) -> tuple[str, str]:
+        """
+        选择渲染源：尺寸足够的最小预生成变体，否则原图
+
+        避免为小尺寸请求解码整张原图
+        """
+        if file_record.width and file_record.height:
+            longest = max(file_record.width, file_record.height)
+            for size, path in sorted(
+                file_record.image_variants.items(), key=lambda item: int(item[0])
+            ):
+                scale = min(int(size) / longest, 1.0)
+                if (spec.width or 0) <= file_record.width * scale and (
+                    spec.height or 0
+                ) <= file_record.height * scale:
+                    return settings.minio_thumbnail_bucket, path
+        return file_record.bucket_name, file_record.storage_path
+
+    async def _render_transform(
+        self,
+        file_record: File,
+        spec: ImageTransform,
+        path: str,
+    ) -> None:
+        """读取源图，在进程池中渲染，写入缓存"""
+        bucket, source_path = self._pick_source(file_record, spec)
+        data = await minio_service.get_bytes(bucket, source_path)
+        body = await self.run_in_pool(
+            transform,
+            data,
+            spec.width,
+            spec.height,
+            spec.fit,
+            spec.format,
+            spec.quality,
+        )
+        del data
+
+        await minio_service.put_bytes(
+            settings.minio_thumbnail_bucket,
+            path,
+            body,
+            spec.content_type,
+        )
+
+    # ==============================================================================
+    # 补处理
+    # ==============================================================================
+
+    async def _get_redis(self) -> redis.Redis:
+        """获取 Redis 客户端"""
+        if self._redis_client is None:
+            self._redis_client = redis.from_url(
+                settings.redis_url,
+                encoding="utf-8",
+                decode_responses=True,
+            )
+        return self._redis_client
+
+    async def _acquire_lock(self) -> bool:
+        """获取本周期的扫描锁，Redis 不可用时直接执行"""
+        try:
+            r = await self._get_redis()
+            return bool(
+                await r.set(
+                    self.LOCK_KEY,
+                    datetime.utcnow().isoformat(),
+                    nx=True,
+                    ex=max(settings.image_sweep_seconds - 1, 1),
+                )
+            )
+        except Exception as e:
+            print(f"Image sweep lock error: {e}")
+            return True
+
+    async def sweep(self, limit: int = 100) -> int:
+        """
+        将未处理的图片加入队列
+
+        只扫描确认超过一个周期的文件，刚确认的文件仍在其 worker 的队列中
+
+        Returns:
+            加入队列的文件数
+        """
+        if not await self._acquire_lock():
+            return 0
+
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.image_sweep_seconds)
+        pending = await File.find(
+            File.category == FileCategory.IMAGE,
+            File.status == FileStatus.COMPLETED,
+            File.is_deleted == False,
+            File.image_processed_at == None,
+            File.updated_at < cutoff,
+        ).limit(limit).to_list()
+
+        queued = 0
+        for file_record in pending:
+            if self._should_process(file_record):
+                self.enqueue(file_record)
+                queued += 1
+        return queued
+
+    async def _consume(self) -> None:
+        """队列消费者"""
+        queue = self._get_queue()
+        while True:
+            file_id = await queue.get()
+            try:
+                await self.process(file_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Image processing error for {file_id}: {e}")
+            finally:
+                queue.task_done()
+
+    async def run_forever(self) -> None:
+        """消费队列并定时补处理 (在应用生命周期内作为后台任务运行)"""
+        consumers = [
+            asyncio.create_task(self._consume()) for _ in range(settings.image_workers)
+        ]
+        try:
+            while True:
+                try:
+                    await self.sweep()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"❌ Image sweep failed: {e}")
+
+                await asyncio.sleep(settings.image_sweep_seconds)
+        finally:
+            for consumer in consumers:
+                consumer.cancel()
+
+    async def close(self) -> None:
+        """关闭进程池和 Redis 连接"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._redis_client:
+            await self._redis_client.close()
+            self._redis_client = None
+
+
+# 全局单例
+image_service = ImageService()
@@ -0,0 +1,183 @@
+"""
+Unified Backend Platform - Instant Upload Service
+
+秒传的访问控制：只有可见的已有引用或持有证明才能引用已存储的内容
+"""
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import secrets
+from typing import Any
+
+import redis.asyncio as redis
+from beanie.operators import Or
+from botocore.exceptions import ClientError
+from pydantic import BaseModel, Field
+
+from app.core.config import get_settings
+from app.models.file import File, FileStatus
+from app.models.user import User
+from app.services.minio_service import minio_service
+
+settings = get_settings()
+
+
+class ContentMissingError(Exception):
+    """签发挑战后存储对象已删除 (调用方退回普通上传)"""
+
+    def __init__(self, state: dict[str, Any]) -> None:
+        super().__init__("Stored content no longer exists")
+        self.state = state
+
+
+class ProofChallenge(BaseModel):
+    """持有证明挑战"""
+
+    challenge_id: str = Field(..., description="挑战 ID")
+    offset: int = Field(..., description="字节范围起点")
+    length: int = Field(..., description="字节数")
+    nonce: str = Field(..., description="随机数 (十六进制)")
+    expires_in: int = Field(..., description="有效期 (秒)")
+
+
+class InstantUploadService:
+    """
+    秒传服务
+
+    职责:
+    1. 调用者已拥有引用该内容的文件、或该内容被公开文件引用时，直接允许秒传
+    2. 否则签发持有证明挑战：服务端随机选择一段字节范围和随机数，
+       客户端提交 SHA-256(随机数 + 该范围内容)，校验通过后才允许秒传
+    3. 挑战保存在 Redis，单次有效；Redis 不可用时不签发挑战 (调用方退回普通上传)
+
+    只知道内容哈希和大小、不持有内容的调用者无法通过秒传引用他人的私有文件。
+    """
+
+    CHALLENGE_KEY = "instant_upload:challenge:"
+
+    def __init__(self) -> None:
+        self._redis_client: redis.Redis | None = None
+
+    async def _get_redis(self) -> redis.Redis:
+        """获取 Redis 客户端"""
+        if self._redis_client is None:
+            self._redis_client = redis.from_url(
+                settings.redis_url,
+                encoding="utf-8",
+                decode_responses=True,
+            )
+        return self._redis_client
+
+    async def has_visible_reference(self, stored: dict[str, Any], user: User) -> bool:
+        """该内容是否被调用者自己的文件或公开文件引用"""
+        reference = await File.find_one(
+            File.file_hash == stored["file_hash"],
+            File.content_key == stored["_id"],
+            File.status == FileStatus.COMPLETED,
+            File.is_deleted == False,
+            Or(File.owner_id == user.id, File.is_public == True),
+        )
+        return reference is not None
+
+    async def issue_challenge(
+        self,
+        stored: dict[str, Any],
+        upload: dict[str, Any],
+        user: User,
+    ) -> ProofChallenge | None:
+        """
+        签发持有证明挑战
+
+        Args:
+            stored: 存储对象文档
+            upload: 校验通过后创建文件记录所需的字段 (filename / content_type 等)
+            user: 当前用户
+
+        Returns:
+            挑战；Redis 不可用时返回 None
+        """
+        file_size = stored["file_size"]
+        length = min(settings.instant_upload_proof_length, file_size)
+        challenge = ProofChallenge(
+            challenge_id=secrets.token_urlsafe(24),
+            offset=secrets.randbelow(file_size - length + 1),
+            length=length,
+            nonce=secrets.token_hex(16),
+            expires_in=settings.instant_upload_challenge_ttl,
+        )
+        state = {
+            **upload,
+            "owner_id": str(user.id),
+            "bucket_name": stored["bucket_name"],
+            "storage_path": stored["storage_path"],
+            "offset": challenge.offset,
+            "length": challenge.length,
+            "nonce": challenge.nonce,
+        }
+        try:
+            r = await self._get_redis()
+            await r.set(
+                self.CHALLENGE_KEY + challenge.challenge_id,
+                json.dumps(state),
+                ex=settings.instant_upload_challenge_ttl,
+            )
+        except Exception as e:
+            print(f"Instant upload challenge error: {e}")
+            return None
+        return challenge
+
+    async def verify(
+        self,
+        challenge_id: str,
+        proof: str,
+        user: User,
+    ) -> dict[str, Any] | None:
+        """
+        校验持有证明 (挑战无论成功与否只能使用一次)
+
+        Returns:
+            签发挑战时保存的上传字段；证明不正确时返回 None
+
+        Raises:
+            ValueError: 挑战不存在、已过期或不属于当前用户
+            ContentMissingError: 签发挑战后存储对象已删除 (携带上传字段)
+            ClientError: 读取存储对象失败 (对象不存在以外的错误)
+        """
+        try:
+            r = await self._get_redis()
+            raw = await r.getdel(self.CHALLENGE_KEY + challenge_id)
+        except Exception as e:
+            raise ValueError(f"Challenge store unavailable: {e}") from e
+        if raw is None:
+            raise ValueError("Challenge not found or expired")
+        state = json.loads(raw)
+        if state["owner_id"] != str(user.id):
+            raise ValueError("Challenge not found or expired")
+
+        try:
+            content = await minio_service.get_range(
+                state["bucket_name"],
+                state["storage_path"],
+                state["offset"],
+                state["length"],
+            )
+        except ClientError as e:
+            if minio_service.is_not_found(e):
+                raise ContentMissingError(state) from e
+            raise
+        expected = hashlib.sha256(bytes.fromhex(state["nonce"]) + content).hexdigest()
+        if not hmac.compare_digest(expected, proof.lower()):
+            return None
+        return state
+
+    async def close(self) -> None:
+        """关闭 Redis 连接"""
+        if self._redis_client:
+            await self._redis_client.close()
+            self._redis_client = None
+
+
+# 全局单例
+instant_uploads = InstantUploadService()
@@ -0,0 +1,83 @@
+"""
+Unified Backend Platform - Event Loop Lag Monitor
+
+事件循环延迟采样：定时 sleep，实际唤醒时间超出预期的部分即为事件循环被阻塞的时长
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+
+from pydantic import BaseModel, Field
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class LoopLagSnapshot(BaseModel):
+    """事件循环延迟统计 (毫秒)"""
+
+    samples: int = Field(..., description="窗口内采样数")
+    interval_ms: float = Field(..., description="采样间隔")
+    mean_ms: float = Field(..., description="平均延迟")
+    p50_ms: float = Field(..., description="中位数延迟")
+    p99_ms: float = Field(..., description="P99 延迟")
+    max_ms: float = Field(..., description="窗口内最大延迟")
+    worst_ms: float = Field(..., description="自启动 (或上次清空) 以来的最大延迟")
+
+
+class LoopLagMonitor:
+    """
+    事件循环延迟监控
+
+    每隔 loop_lag_sample_interval 秒 sleep 一次并记录唤醒延迟，
+    保留最近 loop_lag_window 个采样。同步阻塞调用 (如直接调用 boto3)
+    会表现为延迟尖峰。统计只针对当前 worker 进程。
+    """
+
+    def __init__(self) -> None:
+        self._samples: deque[float] = deque(maxlen=settings.loop_lag_window)
+        self._worst_ms = 0.0
+
+    def observe(self, lag_ms: float) -> None:
+        """记录一次采样"""
+        self._samples.append(lag_ms)
+        self._worst_ms = max(self._worst_ms, lag_ms)
+
+    def snapshot(self) -> LoopLagSnapshot:
+        """当前窗口的统计"""
+        samples = sorted(self._samples)
+
+        def percentile(p: float) -> float:
+            if not samples:
+                return 0.0
+            return round(samples[min(int(len(samples) * p), len(samples) - 1)], 3)
+
+        return LoopLagSnapshot(
+            samples=len(samples),
+            interval_ms=settings.loop_lag_sample_interval * 1000,
+            mean_ms=round(sum(samples) / len(samples), 3) if samples else 0.0,
+            p50_ms=percentile(0.50),
+            p99_ms=percentile(0.99),
+            max_ms=round(samples[-1], 3) if samples else 0.0,
+            worst_ms=round(self._worst_ms, 3),
+        )
+
+    def reset(self) -> None:
+        """清空统计"""
+        self._samples.clear()
+        self._worst_ms = 0.0
+
+    async def run_forever(self) -> None:
+        """定时采样 (在应用生命周期内作为后台任务运行)"""
+        loop = asyncio.get_running_loop()
+        interval = settings.loop_lag_sample_interval
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            self.observe(max(loop.time() - started - interval, 0.0) * 1000)
+
+
+# 全局单例
+loop_lag_monitor = LoopLagMonitor()
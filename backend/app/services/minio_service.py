@@ -3,31 +3,56 @@ Unified Backend Platform - MinIO Service
 
 MinIO/S3 对象存储服务封装
 """
+import asyncio
+import functools
 import hashlib
+from collections.abc import AsyncIterator, Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, TypeVar
 from uuid import UUID, uuid4
 
 from botocore.exceptions import ClientError
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
 from app.core.config import get_settings
 from app.models.file import File, FileCategory, FileStatus
+from app.models.stored_object import StoredObject
 
 settings = get_settings()
 
+T = TypeVar("T")
+
+
+class FileTooLargeError(ValueError):
+    """上传内容超过大小限制"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        super().__init__(f"File too large (max {max_size // 1024 // 1024}MB)")
+
 
 class MinIOService:
-    """MinIO 对象存储服务"""
+    """
+    MinIO 对象存储服务
+
+    boto3 是同步客户端：所有 S3 调用都通过 _call 在专用的有界线程池中执行，
+    不阻塞事件循环。线程数与 botocore 连接池大小一致 (minio_max_workers)，
+    超出的调用在线程池队列中等待，不会无限制地创建连接。
+    """
 
     def __init__(self):
         """初始化 MinIO 客户端"""
+        self._executor: ThreadPoolExecutor | None = None
         try:
             import boto3
+            from botocore.config import Config
 
             # 解析 endpoint 获取主机和端口
             endpoint = settings.minio_endpoint
 
-            # 创建 S3 客户端
+            # 创建 S3 客户端 (boto3 客户端线程安全，可在线程池中共享)
             self.s3_client = boto3.client(
                 "s3",
                 endpoint_url=endpoint,
@@ -35,6 +60,7 @@ class MinIOService:
                 aws_secret_access_key=settings.minio_secret_key,
                 region_name="us-east-1",
                 use_ssl=settings.minio_secure,
+                config=Config(max_pool_connections=settings.minio_max_workers),
             )
             self._initialized = True
         except ImportError:
@@ -45,6 +71,30 @@ class MinIOService:
             self.s3_client = None
             print(f"❌ MinIO 初始化失败: {e}")
 
+    async def _call(self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """在 S3 线程池中执行同步调用"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.minio_max_workers,
+                thread_name_prefix="minio",
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    def close(self) -> None:
+        """关闭线程池 (等待进行中的调用完成)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    @staticmethod
+    def is_not_found(error: ClientError) -> bool:
+        """错误是否表示对象不存在 (HEAD 请求只返回状态码)"""
+        code = error.response.get("Error", {}).get("Code")
+        return code in ("404", "NoSuchKey", "NotFound")
+
     def is_available(self) -> bool:
         """检查 MinIO 是否可用"""
         return self._initialized and self.s3_client is not None
@@ -73,6 +123,25 @@ class MinIOService:
         now = datetime.utcnow()
         return f"{app_identifier}/{now.year}/{now.month:02d}/thumbnails/{file_id}.webp"
 
+    def generate_variant_path(
+        self,
+        app_identifier: str,
+        file_id: UUID,
+        name: str,
+    ) -> str:
+        """生成图片变体存储路径 (与缩略图同目录)"""
+        now = datetime.utcnow()
+        return f"{app_identifier}/{now.year}/{now.month:02d}/thumbnails/{file_id}-{name}.webp"
+
+    def generate_transform_prefix(self, file_record: File) -> str:
+        """
+        按需缩放变体的存储目录
+
+        有内容哈希时按哈希存放，内容相同的文件共用同一份缓存
+        """
+        source = file_record.file_hash or str(file_record.id)
+        return f"{file_record.app_identifier}/variants/{source}/"
+
     async def create_file_record(
         self,
         owner_id: UUID | None,
@@ -131,6 +200,8 @@ class MinIOService:
         self,
         file_id: UUID,
         file_hash: str | None = None,
+        file_size: int | None = None,
+        deduplicate: bool = False,
     ) -> File:
         """
         确认上传完成
@@ -138,6 +209,9 @@ class MinIOService:
         Args:
             file_id: 文件 ID
             file_hash: 文件 SHA256 哈希
+            file_size: 实际上传的字节数 (流式上传时在上传完成后才知道)
+            deduplicate: file_hash 由服务端计算时为 True，按内容去重
+                (客户端提供的哈希不可信，不参与去重)
 
         Returns:
             更新后的 File 记录
@@ -151,6 +225,10 @@ class MinIOService:
         file_record.status = FileStatus.COMPLETED
         if file_hash:
             file_record.file_hash = file_hash
+        if file_size is not None:
+            file_record.file_size = file_size
+        if deduplicate and file_hash:
+            await self._link_content(file_record)
 
         # 生成公共 URL
         file_record.public_url = self.get_public_url(
@@ -181,7 +259,254 @@ class MinIOService:
 
         return file_record
 
-    def generate_presigned_url(
+    async def upload_stream(
+        self,
+        read: Callable[[int], Awaitable[bytes]],
+        bucket: str,
+        object_name: str,
+        content_type: str,
+        max_size: int,
+    ) -> tuple[int, str]:
+        """
+        流式上传 (不在内存中缓存整个文件)
+
+        按 upload_part_size 分块读取，写入 S3 分片上传，边读边检查大小限制并增量计算 SHA-256；
+        不足一个分片的小文件直接 put_object。失败时中止分片上传，
+        已上传的分片由 S3 清理。内存占用约为一个分片大小。
+
+        Args:
+            read: 读取函数 (如 UploadFile.read)，返回空字节串表示结束
+            bucket: 存储桶名称
+            object_name: 对象名称
+            content_type: MIME 类型
+            max_size: 最大字节数
+
+        Returns:
+            (上传的字节数, SHA-256 十六进制)
+
+        Raises:
+            FileTooLargeError: 内容超过 max_size
+        """
+        part_size = settings.upload_part_size
+        # 大块数据的 hashlib.update 会释放 GIL，与 S3 调用一样放到线程池中执行
+        hasher = hashlib.sha256()
+        chunk = await self._read_chunk(read, part_size)
+        if len(chunk) > max_size:
+            raise FileTooLargeError(max_size)
+
+        if len(chunk) < part_size:
+            await self._call(hasher.update, chunk)
+            await self._call(
+                self.s3_client.put_object,
+                Bucket=bucket,
+                Key=object_name,
+                Body=chunk,
+                ContentType=content_type,
+            )
+            return len(chunk), hasher.hexdigest()
+
+        upload_id = await self.create_multipart_upload(bucket, object_name, content_type)
+        parts: list[dict[str, Any]] = []
+        total = 0
+        try:
+            while chunk:
+                total += len(chunk)
+                if total > max_size:
+                    raise FileTooLargeError(max_size)
+
+                await self._call(hasher.update, chunk)
+                part_number = len(parts) + 1
+                response = await self._call(
+                    self.s3_client.upload_part,
+                    Bucket=bucket,
+                    Key=object_name,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=chunk,
+                )
+                parts.append({"PartNumber": part_number, "ETag": response["ETag"]})
+                chunk = await self._read_chunk(read, part_size)
+
+            await self.complete_multipart_upload(bucket, object_name, upload_id, parts)
+        except BaseException:
+            await self.abort_multipart_upload(bucket, object_name, upload_id)
+            raise
+
+        return total, hasher.hexdigest()
+
+    @staticmethod
+    async def _read_chunk(read: Callable[[int], Awaitable[bytes]], size: int) -> bytes:
+        """读取 size 字节 (流结束时可能更少)"""
+        chunk = await read(size)
+        if len(chunk) >= size or not chunk:
+            return chunk
+
+        buffer = bytearray(chunk)
+        while len(buffer) < size:
+            data = await read(size - len(buffer))
+            if not data:
+                break
+            buffer += data
+        return bytes(buffer)
+
+    async def put_bytes(
+        self,
+        bucket: str,
+        object_name: str,
+        data: bytes,
+        content_type: str,
+    ) -> None:
+        """上传小对象 (缩略图等)"""
+        await self._call(
+            self.s3_client.put_object,
+            Bucket=bucket,
+            Key=object_name,
+            Body=data,
+            ContentType=content_type,
+        )
+
+    async def get_bytes(
+        self,
+        bucket: str,
+        object_name: str,
+    ) -> bytes:
+        """
+        读取整个对象 (仅用于大小受限的对象，如图片处理)
+
+        Raises:
+            ClientError: 对象不存在或读取失败
+        """
+
+        def read() -> bytes:
+            body = self.s3_client.get_object(Bucket=bucket, Key=object_name)["Body"]
+            try:
+                return body.read()
+            finally:
+                body.close()
+
+        return await self._call(read)
+
+    async def get_range(
+        self,
+        bucket: str,
+        object_name: str,
+        offset: int,
+        length: int,
+    ) -> bytes:
+        """
+        读取对象中的一段字节 (用于秒传持有证明)
+
+        Raises:
+            ClientError: 对象不存在或读取失败
+        """
+        if length <= 0:
+            return b""
+
+        def read() -> bytes:
+            body = self.s3_client.get_object(
+                Bucket=bucket,
+                Key=object_name,
+                Range=f"bytes={offset}-{offset + length - 1}",
+            )["Body"]
+            try:
+                return body.read()
+            finally:
+                body.close()
+
+        return await self._call(read)
+
+    async def hash_object(
+        self,
+        bucket: str,
+        object_name: str,
+    ) -> tuple[int, str]:
+        """
+        读取已上传的对象并计算 SHA-256 (用于校验客户端提供的哈希)
+
+        Returns:
+            (对象字节数, SHA-256 十六进制)
+
+        Raises:
+            ClientError: 对象不存在或读取失败
+        """
+
+        def compute() -> tuple[int, str]:
+            body = self.s3_client.get_object(Bucket=bucket, Key=object_name)["Body"]
+            hasher = hashlib.sha256()
+            size = 0
+            try:
+                for chunk in body.iter_chunks(settings.upload_part_size):
+                    hasher.update(chunk)
+                    size += len(chunk)
+            finally:
+                body.close()
+            return size, hasher.hexdigest()
+
+        return await self._call(compute)
+
+    async def open_object(
+        self,
+        bucket: str,
+        object_name: str,
+        byte_range: str | None = None,
+        if_none_match: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        发起 GetObject，只读取响应头，对象内容由 stream_object 逐块读取
+
+        Args:
+            byte_range: HTTP Range 值 (如 bytes=0-1023)
+            if_none_match: 客户端缓存的 ETag，未变化时 S3 返回 304
+
+        Returns:
+            GetObject 响应 (Body / ContentLength / ContentRange / ETag / LastModified)
+
+        Raises:
+            ClientError: 对象不存在、Range 无法满足 (InvalidRange) 或未修改 (304)
+        """
+        params: dict[str, Any] = {"Bucket": bucket, "Key": object_name}
+        if byte_range:
+            params["Range"] = byte_range
+        if if_none_match:
+            params["IfNoneMatch"] = if_none_match
+        return await self._call(self.s3_client.get_object, **params)
+
+    async def stream_object(
+        self,
+        body: Any,
+        chunk_size: int,
+        read_ahead: int,
+    ) -> AsyncIterator[bytes]:
+        """
+        逐块读取 open_object 返回的 Body
+
+        后台任务最多预读 read_ahead 块，每个请求的内存占用约为 (read_ahead + 2) × chunk_size；
+        迭代结束或被中断 (如客户端断开) 时关闭 Body，归还连接
+        """
+        queue: asyncio.Queue[bytes | Exception | None] = asyncio.Queue(
+            maxsize=max(read_ahead, 1)
+        )
+
+        async def produce() -> None:
+            try:
+                while chunk := await self._call(body.read, chunk_size):
+                    await queue.put(chunk)
+            except Exception as e:
+                await queue.put(e)
+                return
+            await queue.put(None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (item := await queue.get()) is not None:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            producer.cancel()
+            await self._call(body.close)
+
+    async def generate_presigned_url(
         self,
         bucket: str,
         object_name: str,
@@ -201,7 +526,8 @@ class MinIOService:
             预签名 URL
         """
         try:
-            response = self.s3_client.generate_presigned_url(
+            response = await self._call(
+                self.s3_client.generate_presigned_url,
                 ClientMethod=method,
                 Params={
                     "Bucket": bucket,
@@ -214,7 +540,26 @@ class MinIOService:
             print(f"❌ 生成预签名 URL 失败: {e}")
             raise
 
-    def generate_presigned_post(
+    async def generate_presigned_get_urls(
+        self,
+        objects: list[tuple[str, str]],
+        expiration: int = 3600,
+    ) -> dict[tuple[str, str], str]:
+        """一次生成多个对象的预签名下载 URL (在一次线程池调用中完成)"""
+
+        def presign() -> dict[tuple[str, str], str]:
+            return {
+                (bucket, object_name): self.s3_client.generate_presigned_url(
+                    ClientMethod="get_object",
+                    Params={"Bucket": bucket, "Key": object_name},
+                    ExpiresIn=expiration,
+                )
+                for bucket, object_name in objects
+            }
+
+        return await self._call(presign)
+
+    async def generate_presigned_post(
         self,
         bucket: str,
         object_name: str,
@@ -232,7 +577,8 @@ class MinIOService:
             包含 url 和 fields 的字典
         """
         try:
-            response = self.s3_client.generate_presigned_post(
+            response = await self._call(
+                self.s3_client.generate_presigned_post,
                 Bucket=bucket,
                 Key=object_name,
                 Fields=None,
@@ -261,7 +607,8 @@ class MinIOService:
     ) -> bool:
         """删除文件"""
         try:
-            self.s3_client.delete_object(
+            await self._call(
+                self.s3_client.delete_object,
                 Bucket=bucket,
                 Key=object_name,
             )
@@ -270,20 +617,60 @@ class MinIOService:
             print(f"❌ 删除文件失败: {e}")
             return False
 
+    async def delete_prefix(
+        self,
+        bucket: str,
+        prefix: str,
+    ) -> int:
+        """
+        删除指定前缀下的所有对象
+
+        Returns:
+            删除的对象数
+        """
+
+        def delete_all() -> int:
+            deleted = 0
+            paginator = self.s3_client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+                keys = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+                if keys:
+                    # 每页最多 1000 个，正好是 delete_objects 的上限
+                    self.s3_client.delete_objects(
+                        Bucket=bucket,
+                        Delete={"Objects": keys, "Quiet": True},
+                    )
+                    deleted += len(keys)
+            return deleted
+
+        try:
+            return await self._call(delete_all)
+        except ClientError as e:
+            print(f"❌ 删除目录失败: {e}")
+            return 0
+
     async def file_exists(
         self,
         bucket: str,
         object_name: str,
     ) -> bool:
-        """检查文件是否存在"""
+        """
+        检查文件是否存在
+
+        Raises:
+            ClientError: 对象不存在以外的错误 (权限、限流、5xx 等)
+        """
         try:
-            self.s3_client.head_object(
+            await self._call(
+                self.s3_client.head_object,
                 Bucket=bucket,
                 Key=object_name,
             )
             return True
-        except ClientError:
-            return False
+        except ClientError as e:
+            if self.is_not_found(e):
+                return False
+            raise
 
     async def get_file_size(
         self,
@@ -292,7 +679,8 @@ class MinIOService:
     ) -> int | None:
         """获取文件大小"""
         try:
-            response = self.s3_client.head_object(
+            response = await self._call(
+                self.s3_client.head_object,
                 Bucket=bucket,
                 Key=object_name,
             )
@@ -313,7 +701,8 @@ class MinIOService:
                 "Bucket": source_bucket,
                 "Key": source_key,
             }
-            self.s3_client.copy_object(
+            await self._call(
+                self.s3_client.copy_object,
                 CopySource=copy_source,
                 Bucket=dest_bucket,
                 Key=dest_key,
@@ -323,6 +712,294 @@ class MinIOService:
             print(f"❌ 复制文件失败: {e}")
             return False
 
+    # ==========================================================================
+    # 分片上传
+    # ==========================================================================
+
+    async def create_multipart_upload(
+        self,
+        bucket: str,
+        object_name: str,
+        content_type: str,
+    ) -> str:
+        """初始化分片上传，返回 UploadId"""
+        response = await self._call(
+            self.s3_client.create_multipart_upload,
+            Bucket=bucket,
+            Key=object_name,
+            ContentType=content_type,
+        )
+        return response["UploadId"]
+
+    async def generate_presigned_part_urls(
+        self,
+        bucket: str,
+        object_name: str,
+        upload_id: str,
+        part_numbers: list[int],
+        expiration: int = 3600,
+    ) -> dict[int, str]:
+        """一次生成多个分片的预签名 PUT URL (在一次线程池调用中完成)"""
+
+        def presign() -> dict[int, str]:
+            return {
+                part_number: self.s3_client.generate_presigned_url(
+                    ClientMethod="upload_part",
+                    Params={
+                        "Bucket": bucket,
+                        "Key": object_name,
+                        "UploadId": upload_id,
+                        "PartNumber": part_number,
+                    },
+                    ExpiresIn=expiration,
+                )
+                for part_number in part_numbers
+            }
+
+        return await self._call(presign)
+
+    async def list_parts(
+        self,
+        bucket: str,
+        object_name: str,
+        upload_id: str,
+    ) -> list[dict[str, Any]]:
+        """
+        列出已上传的分片 (自动翻页)
+
+        Returns:
+            [{"PartNumber", "ETag", "Size"}, ...]，按编号排序
+        """
+
+        def list_all() -> list[dict[str, Any]]:
+            parts: list[dict[str, Any]] = []
+            marker = 0
+            while True:
+                response = self.s3_client.list_parts(
+                    Bucket=bucket,
+                    Key=object_name,
+                    UploadId=upload_id,
+                    PartNumberMarker=marker,
+                )
+                parts.extend(response.get("Parts", []))
+                if not response.get("IsTruncated"):
+                    return parts
+                marker = response["NextPartNumberMarker"]
+
+        return await self._call(list_all)
+
+    async def complete_multipart_upload(
+        self,
+        bucket: str,
+        object_name: str,
+        upload_id: str,
+        parts: list[dict[str, Any]],
+    ) -> None:
+        """完成分片上传 (parts: [{"PartNumber", "ETag"}]，按编号升序)"""
+        await self._call(
+            self.s3_client.complete_multipart_upload,
+            Bucket=bucket,
+            Key=object_name,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+
+    async def abort_multipart_upload(
+        self,
+        bucket: str,
+        object_name: str,
+        upload_id: str,
+    ) -> bool:
+        """中止分片上传 (已上传的分片由 S3 删除)"""
+        try:
+            await self._call(
+                self.s3_client.abort_multipart_upload,
+                Bucket=bucket,
+                Key=object_name,
+                UploadId=upload_id,
+            )
+            return True
+        except ClientError as e:
+            print(f"❌ 中止分片上传失败: {e}")
+            return False
+
+    # ==========================================================================
+    # 内容去重 (引用计数)
+    # ==========================================================================
+
+    async def _link_content(self, file_record: File) -> None:
+        """
+        将文件登记到内容寻址对象 (ref_count + 1)
+
+        同一应用已有相同 SHA-256 的对象时，删除刚上传的副本，
+        让文件记录指向已有对象；否则本次上传的对象成为该内容的存储对象。
+        """
+        key = StoredObject.make_id(file_record.app_identifier, file_record.file_hash)
+        collection = StoredObject.get_motor_collection()
+        try:
+            stored = await self._acquire_object(collection, key, file_record)
+        except DuplicateKeyError:
+            # 并发上传相同内容时 upsert 冲突，另一方已创建，重试即命中
+            stored = await self._acquire_object(collection, key, file_record)
+
+        if (stored["bucket_name"], stored["storage_path"]) != (
+            file_record.bucket_name,
+            file_record.storage_path,
+        ):
+            await self.delete_file(file_record.bucket_name, file_record.storage_path)
+            file_record.bucket_name = stored["bucket_name"]
+            file_record.storage_path = stored["storage_path"]
+        file_record.content_key = key
+
+    async def _acquire_object(
+        self,
+        collection: Any,
+        key: str,
+        file_record: File,
+    ) -> dict[str, Any]:
+        """引用计数 + 1，不存在时以本文件的对象创建"""
+        return await collection.find_one_and_update(
+            {"_id": key},
+            {
+                "$inc": {"ref_count": 1},
+                "$setOnInsert": {
+                    "app_identifier": file_record.app_identifier,
+                    "file_hash": file_record.file_hash,
+                    "file_size": file_record.file_size,
+                    "content_type": file_record.content_type,
+                    "bucket_name": file_record.bucket_name,
+                    "storage_path": file_record.storage_path,
+                    "created_at": datetime.utcnow(),
+                },
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def find_stored_object(
+        self,
+        app_identifier: str,
+        file_hash: str,
+        file_size: int,
+    ) -> dict[str, Any] | None:
+        """查找应用内内容 (SHA-256 + 大小) 相同的存储对象"""
+        key = StoredObject.make_id(
+            File.lowercase_identifier(app_identifier), file_hash.lower()
+        )
+        return await StoredObject.get_motor_collection().find_one(
+            {"_id": key, "file_size": file_size}
+        )
+
+    async def create_from_existing(
+        self,
+        owner_id: UUID | None,
+        app_identifier: str,
+        filename: str,
+        content_type: str,
+        file_size: int,
+        file_hash: str,
+    ) -> File | None:
+        """
+        秒传：应用内已有相同内容时直接创建引用该对象的文件记录
+
+        调用方负责确认调用者有权引用该内容 (见 InstantUploadService)。
+
+        Returns:
+            已完成的 File 记录；未命中 (哈希或大小不一致) 时返回 None
+        """
+        app_identifier = File.lowercase_identifier(app_identifier)
+        file_hash = file_hash.lower()
+        key = StoredObject.make_id(app_identifier, file_hash)
+        collection = StoredObject.get_motor_collection()
+        stored = await collection.find_one_and_update(
+            {"_id": key, "file_size": file_size},
+            {"$inc": {"ref_count": 1}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if stored is None:
+            return None
+
+        file_extension = filename.rsplit(".", 1)[-1] if "." in filename else ""
+        file_record = File(
+            owner_id=owner_id,
+            app_identifier=app_identifier,
+            filename=filename,
+            file_size=file_size,
+            content_type=content_type,
+            file_extension=file_extension,
+            category=self._determine_category(content_type),
+            storage_path=stored["storage_path"],
+            bucket_name=stored["bucket_name"],
+            public_url=self.get_public_url(stored["bucket_name"], stored["storage_path"]),
+            status=FileStatus.COMPLETED,
+            file_hash=file_hash,
+            content_key=key,
+            is_public=True,  # 默认公开
+        )
+        try:
+            await file_record.insert()
+        except BaseException:
+            await collection.update_one({"_id": key}, {"$inc": {"ref_count": -1}})
+            raise
+        return file_record
+
+    async def release_file(
+        self,
+        file_record: File,
+        delete_from_storage: bool = False,
+    ) -> bool:
+        """
+        文件删除后释放其存储对象
+
+        去重文件的引用计数 - 1，只有最后一个引用释放且要求删除存储内容时才删除对象；
+        未参与去重的文件 (旧数据、预签名上传) 按 delete_from_storage 直接删除。
+        删除对象时一并删除缩略图和尺寸变体。
+
+        Returns:
+            是否删除了存储对象
+        """
+        if file_record.content_key is None:
+            if delete_from_storage:
+                await self.delete_derivatives(file_record)
+                return await self.delete_file(file_record.bucket_name, file_record.storage_path)
+            return False
+
+        collection = StoredObject.get_motor_collection()
+        stored = await collection.find_one_and_update(
+            {"_id": file_record.content_key},
+            {"$inc": {"ref_count": -1}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if stored is None or stored["ref_count"] > 0 or not delete_from_storage:
+            return False
+
+        # 条件删除：期间有新的上传复用了该对象时 ref_count 已回升，保留对象
+        result = await collection.delete_one(
+            {"_id": file_record.content_key, "ref_count": {"$lte": 0}}
+        )
+        if not result.deleted_count:
+            return False
+        # 同一内容的文件可能各自生成过变体 (并发处理时)，一并删除
+        await self.delete_derivatives(
+            *await File.find(File.content_key == file_record.content_key).to_list()
+        )
+        return await self.delete_file(stored["bucket_name"], stored["storage_path"])
+
+    async def delete_derivatives(self, *file_records: File) -> None:
+        """删除缩略图、尺寸变体和按需缩放变体"""
+        paths: set[str] = set()
+        prefixes: set[str] = set()
+        for file_record in file_records:
+            if file_record.thumbnail_path:
+                paths.add(file_record.thumbnail_path)
+            paths.update(file_record.image_variants.values())
+            if file_record.category == FileCategory.IMAGE:
+                prefixes.add(self.generate_transform_prefix(file_record))
+        for path in sorted(paths):
+            await self.delete_file(settings.minio_thumbnail_bucket, path)
+        for prefix in sorted(prefixes):
+            await self.delete_prefix(settings.minio_thumbnail_bucket, prefix)
+
     def _determine_category(self, content_type: str) -> FileCategory:
         """根据 MIME 类型确定文件分类"""
         if content_type in settings.allowed_image_types:
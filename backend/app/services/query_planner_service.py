@@ -0,0 +1,303 @@
+"""
+Unified Backend Platform - Query Planner Service
+
+列表查询规划：排序字段白名单、索引匹配、慢查询形态统计与索引建议
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+
+from beanie import Document
+from pydantic import BaseModel, Field
+
+from app.db.indexes import get_index_keys
+
+
+class QueryPlan(BaseModel):
+    """列表查询的执行计划"""
+
+    collection: str = Field(..., description="集合名称")
+    filter_fields: tuple[str, ...] = Field(..., description="等值筛选字段 (排序后)")
+    has_search: bool = Field(default=False, description="是否包含 $or/$regex 搜索")
+    sort_by: str = Field(..., description="排序字段")
+    sort_direction: int = Field(..., description="排序方向 (1/-1)")
+    index: tuple[str, ...] | None = Field(default=None, description="支撑排序的索引")
+
+    @property
+    def sort(self) -> list[tuple[str, int]]:
+        """Motor 排序参数"""
+        return [(self.sort_by, self.sort_direction)]
+
+    @property
+    def shape(self) -> tuple[Any, ...]:
+        """查询形态 (不含具体取值)"""
+        return (
+            self.collection,
+            self.filter_fields,
+            self.has_search,
+            self.sort_by,
+            self.sort_direction,
+        )
+
+
+class QueryShapeStats(BaseModel):
+    """单个查询形态的耗时统计"""
+
+    plan: QueryPlan
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    sample_filter: dict[str, Any] = Field(default_factory=dict)
+
+    @property
+    def avg_ms(self) -> float:
+        """平均耗时"""
+        return self.total_ms / self.count if self.count else 0.0
+
+
+class QueryPlanner:
+    """
+    列表查询规划器
+
+    职责:
+    1. 排序字段白名单：不在白名单内的字段 (包括 payload.*) 直接拒绝 (400)
+    2. 白名单只能包含有索引支撑的字段：注册时检查每个字段都是某个声明索引的首个键，
+       任意筛选条件下都不会退化为内存排序 (避免触及 100MB 限制)；
+       规划时优先选择 "等值字段前缀 + 排序字段" 的复合索引
+    3. 记录每种查询形态的耗时，供管理端点做 explain() 和索引建议
+
+    统计数据保存在进程内存中，每个 worker 独立统计。
+    """
+
+    MAX_SHAPES = 500
+
+    def __init__(self) -> None:
+        self._sortable: dict[str, set[str]] = {}
+        self._models: dict[str, type[Document]] = {}
+        self._shapes: dict[tuple[Any, ...], QueryShapeStats] = {}
+
+    # ==============================================================================
+    # 注册
+    # ==============================================================================
+
+    def register(
+        self,
+        model: type[Document],
+        sortable_fields: list[str],
+    ) -> None:
+        """
+        注册集合的排序白名单
+
+        Args:
+            model: Beanie 文档模型
+            sortable_fields: 允许排序的字段
+
+        Raises:
+            ValueError: 字段没有以其开头的声明索引 (需先在 app.db.indexes 中声明)
+        """
+        collection = model.Settings.name
+        leading = {keys[0] for keys in self.get_indexes(model) if keys}
+        unindexed = sorted(set(sortable_fields) - leading)
+        if unindexed:
+            raise ValueError(
+                f"Sort fields without a supporting index on {collection}: {', '.join(unindexed)}"
+            )
+        self._models[collection] = model
+        self._sortable[collection] = set(sortable_fields)
+
+    def get_indexes(self, model: type[Document]) -> list[tuple[str, ...]]:
+        """读取集合声明的索引键序列 (app.db.indexes)"""
+        return get_index_keys(model.Settings.name)
+
+    # ==============================================================================
+    # 规划
+    # ==============================================================================
+
+    def plan(
+        self,
+        model: type[Document],
+        query: Mapping[str, Any],
+        sort_by: str,
+        sort_order: str,
+    ) -> QueryPlan:
+        """
+        为列表查询生成执行计划
+
+        Args:
+            model: Beanie 文档模型
+            query: 已编码的 MongoDB 筛选条件
+            sort_by: 请求的排序字段
+            sort_order: asc / desc
+
+        Returns:
+            QueryPlan
+
+        Raises:
+            ValueError: 排序字段不在白名单内
+        """
+        collection = model.Settings.name
+        sortable = self._sortable.get(collection, set())
+        if sort_by not in sortable:
+            raise ValueError(
+                f"Unsupported sort field: {sort_by} "
+                f"(allowed: {', '.join(sorted(sortable))})"
+            )
+
+        filter_fields, has_search = self._extract_shape(query)
+        index = self._find_sort_index(model, set(filter_fields), sort_by)
+
+        return QueryPlan(
+            collection=collection,
+            filter_fields=filter_fields,
+            has_search=has_search,
+            sort_by=sort_by,
+            sort_direction=1 if sort_order == "asc" else -1,
+            index=index,
+        )
+
+    def _find_sort_index(
+        self,
+        model: type[Document],
+        equality_fields: set[str],
+        sort_by: str,
+    ) -> tuple[str, ...] | None:
+        """
+        查找可支撑排序的索引
+
+        索引键满足 "等值字段前缀 + 排序字段" 时可避免内存排序 (ESR 规则)
+        """
+        for keys in self.get_indexes(model):
+            for key in keys:
+                if key == sort_by:
+                    return keys
+                if key not in equality_fields:
+                    break
+        return None
+
+    def _extract_shape(self, query: Mapping[str, Any]) -> tuple[tuple[str, ...], bool]:
+        """从筛选条件中提取等值字段和是否包含搜索"""
+        clauses = query.get("$and", [query]) if query else []
+        fields: set[str] = set()
+        has_search = False
+        for clause in clauses:
+            for key, value in clause.items():
+                if key.startswith("$"):
+                    has_search = True
+                elif isinstance(value, Mapping) and any(k.startswith("$") for k in value):
+                    has_search = True
+                else:
+                    fields.add(key)
+        return tuple(sorted(fields)), has_search
+
+    # ==============================================================================
+    # 观测与建议
+    # ==============================================================================
+
+    def observe(
+        self,
+        plan: QueryPlan,
+        query: Mapping[str, Any],
+        duration_ms: float,
+    ) -> None:
+        """记录一次查询耗时"""
+        stats = self._shapes.get(plan.shape)
+        if stats is None:
+            if len(self._shapes) >= self.MAX_SHAPES:
+                fastest = min(self._shapes, key=lambda s: self._shapes[s].avg_ms)
+                del self._shapes[fastest]
+            stats = self._shapes[plan.shape] = QueryShapeStats(plan=plan)
+
+        stats.count += 1
+        stats.total_ms += duration_ms
+        stats.max_ms = max(stats.max_ms, duration_ms)
+        stats.sample_filter = dict(query)
+
+    def slowest_shapes(self, limit: int = 10) -> list[QueryShapeStats]:
+        """按平均耗时排序的查询形态"""
+        return sorted(
+            self._shapes.values(),
+            key=lambda stats: stats.avg_ms,
+            reverse=True,
+        )[:limit]
+
+    def reset(self) -> None:
+        """清空统计"""
+        self._shapes.clear()
+
+    async def explain(self, stats: QueryShapeStats, limit: int = 20) -> dict[str, Any]:
+        """
+        对查询形态的样本执行 explain()
+
+        Returns:
+            {
+                "stages": ["FETCH", "IXSCAN"],
+                "index_name": "created_at_1",
+                "blocking_sort": False,
+                "collection_scan": False,
+                "n_returned": 20,
+                "keys_examined": 20,
+                "docs_examined": 20,
+                "execution_time_ms": 1,
+            }
+        """
+        model = self._models[stats.plan.collection]
+        cursor = (
+            model.get_motor_collection()
+            .find(stats.sample_filter)
+            .sort(stats.plan.sort)
+            .limit(limit)
+        )
+        result = await cursor.explain()
+
+        stages: list[str] = []
+        index_names: list[str] = []
+        self._collect_stages(
+            result.get("queryPlanner", {}).get("winningPlan", {}),
+            stages,
+            index_names,
+        )
+        execution = result.get("executionStats", {})
+
+        return {
+            "stages": stages,
+            "index_name": index_names[0] if index_names else None,
+            "blocking_sort": "SORT" in stages,
+            "collection_scan": "COLLSCAN" in stages,
+            "n_returned": execution.get("nReturned"),
+            "keys_examined": execution.get("totalKeysExamined"),
+            "docs_examined": execution.get("totalDocsExamined"),
+            "execution_time_ms": execution.get("executionTimeMillis"),
+        }
+
+    def _collect_stages(
+        self,
+        plan: Mapping[str, Any],
+        stages: list[str],
+        index_names: list[str],
+    ) -> None:
+        """递归收集执行计划中的 stage"""
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        if "indexName" in plan:
+            index_names.append(plan["indexName"])
+        for key in ("queryPlan", "inputStage"):
+            if isinstance(plan.get(key), Mapping):
+                self._collect_stages(plan[key], stages, index_names)
+        for child in plan.get("inputStages", []):
+            self._collect_stages(child, stages, index_names)
+
+    def suggest_index(self, plan: QueryPlan) -> list[tuple[str, int]]:
+        """
+        按 ESR 规则建议索引：等值字段在前，排序字段在后
+
+        is_deleted 这类低基数布尔字段放在等值字段末尾
+        """
+        equality = sorted(plan.filter_fields, key=lambda f: (f.startswith("is_"), f))
+        keys = [(field, 1) for field in equality if field != plan.sort_by]
+        keys.append((plan.sort_by, plan.sort_direction))
+        return keys
+
+
+# 全局单例
+query_planner = QueryPlanner()
@@ -0,0 +1,299 @@
+"""
+Unified Backend Platform - Record Batch Service
+
+原子批量写入：在一个 MongoDB 多文档事务中执行批量创建 / 更新 / 删除
+"""
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from typing import Any
+from uuid import UUID
+
+import motor.motor_asyncio
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure, PyMongoError
+
+from app.models.unified_record import UnifiedRecord
+from app.services.record_stats_service import record_stats
+from app.services.revision_service import revision_service
+
+# 单节点 MongoDB 不支持事务时返回的错误码 (IllegalOperation)
+_ILLEGAL_OPERATION = 20
+
+# 原子更新不覆盖的字段：view_count 由 GET 并发 $inc，不参与版本检查
+_UNMANAGED_FIELDS = ("_id", "view_count")
+
+
+class RecordConflictError(ValueError):
+    """记录在读取之后被并发修改 (version 已变化)"""
+
+
+class _WriteErrors(Exception):
+    """事务中的部分写入失败 (事务已中止，由调用方去掉失败条目后重试)"""
+
+    def __init__(self, errors: dict[int, dict[str, Any]]) -> None:
+        super().__init__(f"{len(errors)} write errors")
+        self.errors = errors
+
+
+class RecordBatchService:
+    """
+    原子批量写入服务
+
+    职责:
+    1. 将已校验、已在内存中修改的记录按集合分组，每个集合一次 bulk_write
+    2. 所有 bulk_write (以及更新产生的历史版本) 在同一个事务中执行；
+       Motor 的 with_transaction 在 TransientTransactionError /
+       UnknownTransactionCommitResult 时自动重试
+    3. 更新和删除以读取时的 version 为条件，期间被并发修改的记录会使整个事务中止
+    4. 提交后更新记录统计
+
+    事务需要副本集或分片集群，单节点 MongoDB 会返回明确的错误。
+    单条更新 (save) 与逐条独立的批量写入 (write_each) 在不支持事务时
+    退化为先写入记录、再写入修订。
+    """
+
+    def __init__(self) -> None:
+        # 部署是否支持事务 (首次单条更新时探测)
+        self._transactions_supported: bool | None = None
+
+    async def insert(self, records: list[UnifiedRecord]) -> None:
+        """
+        原子批量创建
+
+        Raises:
+            ValueError: 事务失败 (已全部回滚)
+        """
+        operations: dict[str, list[Any]] = {}
+        collections: dict[str, motor.motor_asyncio.AsyncIOMotorCollection] = {}
+        documents = []
+        for record in records:
+            collection = type(record).get_motor_collection()
+            collections[collection.name] = collection
+            document = record.to_stored_document()
+            documents.append(document)
+            operations.setdefault(collection.name, []).append(InsertOne(document))
+
+        await self._run(collections, operations)
+        await record_stats.documents_changed([(document, None) for document in documents])
+
+    async def update(
+        self,
+        changes: list[tuple[UnifiedRecord, dict[str, Any]]],
+        changed_by: UUID | None = None,
+        record_revisions: bool = True,
+    ) -> None:
+        """
+        原子批量更新 / 软删除
+
+        Args:
+            changes: [(已在内存中修改的记录, 修改前的状态 record.get_saved_state())]
+            changed_by: 执行更新的用户 ID
+            record_revisions: 是否在同一事务中写入被替换版本的修订 (软删除不需要)
+
+        Raises:
+            ValueError: 记录被并发修改或事务失败 (已全部回滚)
+        """
+        operations: dict[str, list[Any]] = {}
+        collections: dict[str, motor.motor_asyncio.AsyncIOMotorCollection] = {}
+        documents = []
+        for record, before in changes:
+            collection = type(record).get_motor_collection()
+            collections[collection.name] = collection
+            document = record.to_stored_document()
+            documents.append((document, before))
+            operations.setdefault(collection.name, []).append(
+                UpdateOne(*self._versioned_update(document, before))
+            )
+
+        revisions = (
+            [(before, record.payload) for record, before in changes]
+            if record_revisions
+            else []
+        )
+        await self._run(collections, operations, revisions, changed_by)
+        await record_stats.documents_changed(documents)
+
+    async def save(
+        self,
+        record: UnifiedRecord,
+        before: dict[str, Any],
+        changed_by: UUID | None = None,
+    ) -> None:
+        """
+        以读取时的 version 为条件保存单条记录，并写入被替换版本的修订
+
+        副本集上记录与修订在同一事务中写入；单节点 MongoDB 不支持事务时，
+        先执行条件更新，成功后再写入修订。写入后更新记录统计。
+
+        Args:
+            record: 已在内存中修改 (version 已递增) 的记录
+            before: 修改前的状态 record.get_saved_state()
+            changed_by: 执行更新的用户 ID
+
+        Raises:
+            RecordConflictError: 记录在读取之后被并发修改或已删除
+        """
+        collection = type(record).get_motor_collection()
+        document = record.to_stored_document()
+        update_filter, update = self._versioned_update(document, before)
+
+        async def execute(
+            session: motor.motor_asyncio.AsyncIOMotorClientSession | None = None,
+        ) -> None:
+            result = await collection.update_one(update_filter, update, session=session)
+            if result.matched_count != 1:
+                raise RecordConflictError(
+                    f"Record was modified concurrently (version {before['version']} is stale)"
+                )
+            await revision_service.record_bulk_update(
+                [(before, record.payload)], changed_by, session=session
+            )
+
+        await self._with_transaction(collection, execute)
+        await record_stats.documents_changed([(document, before)])
+
+    async def write_each(
+        self,
+        collection: motor.motor_asyncio.AsyncIOMotorCollection,
+        operations: list[Any],
+        revisions: list[tuple[dict[str, Any], dict[str, Any]] | None],
+        changed_by: UUID | None = None,
+    ) -> dict[int, dict[str, Any]]:
+        """
+        逐条独立成败的批量写入：成功条目的修订与其写入在同一事务中
+
+        事务中任一写入失败会中止整个事务，因此去掉失败的条目后在新事务中重试其余条目
+        (每次重试至少少一条)。不支持事务时执行一次无序 bulk_write，再写入成功条目的修订。
+
+        Args:
+            collection: 目标集合
+            operations: 写操作
+            revisions: 与 operations 对应的 (更新前的原始文档, 更新后的完整 payload)，
+                不需要修订的条目 (如新建) 为 None
+            changed_by: 执行更新的用户 ID
+
+        Returns:
+            失败条目的 {下标: writeError}
+        """
+        errors: dict[int, dict[str, Any]] = {}
+        while True:
+            pending = [index for index in range(len(operations)) if index not in errors]
+            if not pending:
+                return errors
+
+            async def execute(
+                session: motor.motor_asyncio.AsyncIOMotorClientSession | None = None,
+            ) -> None:
+                try:
+                    await collection.bulk_write(
+                        [operations[index] for index in pending],
+                        ordered=False,
+                        session=session,
+                    )
+                except BulkWriteError as e:
+                    failed = {
+                        pending[item["index"]]: item
+                        for item in e.details.get("writeErrors", [])
+                    }
+                    if session is not None:
+                        raise _WriteErrors(failed) from e
+                    errors.update(failed)
+                await revision_service.record_bulk_update(
+                    [
+                        revisions[index]
+                        for index in pending
+                        if index not in errors and revisions[index] is not None
+                    ],
+                    changed_by,
+                    session=session,
+                )
+
+            try:
+                await self._with_transaction(collection, execute)
+                return errors
+            except _WriteErrors as e:
+                errors.update(e.errors)
+
+    async def _with_transaction(
+        self,
+        collection: motor.motor_asyncio.AsyncIOMotorCollection,
+        execute: Callable[
+            [motor.motor_asyncio.AsyncIOMotorClientSession | None], Awaitable[None]
+        ],
+    ) -> None:
+        """在事务中执行 execute(session)；部署不支持事务时 (首次探测后缓存) 不使用会话执行"""
+        if self._transactions_supported is not False:
+            client = collection.database.client
+            try:
+                async with await client.start_session() as session:
+                    await session.with_transaction(execute)
+                self._transactions_supported = True
+                return
+            except OperationFailure as e:
+                if e.code != _ILLEGAL_OPERATION:
+                    raise
+                self._transactions_supported = False
+        await execute(None)
+
+    @staticmethod
+    def _versioned_update(
+        document: dict[str, Any],
+        before: dict[str, Any],
+    ) -> tuple[dict[str, Any], dict[str, Any]]:
+        """以读取时的 version 为条件的更新 (filter, update)"""
+        return (
+            {"_id": before["_id"], "version": before["version"], "is_deleted": False},
+            {
+                "$set": {
+                    field: value
+                    for field, value in document.items()
+                    if field not in _UNMANAGED_FIELDS
+                }
+            },
+        )
+
+    async def _run(
+        self,
+        collections: dict[str, motor.motor_asyncio.AsyncIOMotorCollection],
+        operations: dict[str, list[Any]],
+        revisions: list[tuple[dict[str, Any], dict[str, Any]]] | None = None,
+        changed_by: UUID | None = None,
+    ) -> None:
+        """在一个事务中执行各集合的 bulk_write"""
+        if not operations:
+            return
+
+        async def execute(session: motor.motor_asyncio.AsyncIOMotorClientSession) -> None:
+            for name, ops in operations.items():
+                result = await collections[name].bulk_write(ops, ordered=True, session=session)
+                written = result.inserted_count + result.matched_count
+                if written != len(ops):
+                    raise RecordConflictError(
+                        "Records were modified concurrently, batch aborted "
+                        f"({len(ops) - written} of {len(ops)} changed since read)"
+                    )
+            if revisions:
+                await revision_service.record_bulk_update(revisions, changed_by, session=session)
+
+        client = UnifiedRecord.get_motor_collection().database.client
+        try:
+            async with await client.start_session() as session:
+                await session.with_transaction(execute)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors") or [{"index": 0, "errmsg": str(e)}]
+            raise ValueError(
+                f"Transaction aborted: operation {errors[0]['index']} failed: {errors[0]['errmsg']}"
+            ) from e
+        except OperationFailure as e:
+            if e.code == _ILLEGAL_OPERATION:
+                raise ValueError(
+                    "Atomic batches require MongoDB transactions (replica set or sharded cluster)"
+                ) from e
+            raise ValueError(f"Transaction aborted: {e}") from e
+        except PyMongoError as e:
+            raise ValueError(f"Transaction aborted: {e}") from e
+
+
+# 全局单例
+record_batches = RecordBatchService()
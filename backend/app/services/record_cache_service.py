@@ -0,0 +1,207 @@
+"""
+Unified Backend Platform - Record Cache Service
+
+UnifiedRecord 读穿透缓存 (Redis)，热点记录读取合并为单次 Mongo 查询
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Iterable
+from uuid import UUID
+
+import redis.asyncio as redis
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class RecordCacheService:
+    """
+    UnifiedRecord 读穿透缓存
+
+    职责:
+    1. 缓存单条记录 (按记录 ID)
+    2. 缓存匿名列表查询 (按规范化查询参数)
+    3. 同一进程内的请求合并 (single-flight)，热点 key 未命中时只触发一次加载
+    4. 写路径失效：单条记录与列表都通过 generation 计数器失效 (generation 是缓存键的一部分)；
+       写入前已开始的加载完成后写入的是旧 generation 的键，不会再被读到
+
+    Redis 不可用时自动降级为直接查询数据库。
+    """
+
+    ITEM_PREFIX = "records:item"
+    ITEM_GENERATION_PREFIX = "records:item:gen"
+    LIST_PREFIX = "records:list"
+    GENERATION_PREFIX = "records:list:gen"
+    ALL_APPS = "*"
+
+    def __init__(self) -> None:
+        self._redis_client: redis.Redis | None = None
+        self._inflight: dict[str, asyncio.Future[str]] = {}
+
+    async def _get_redis(self) -> redis.Redis:
+        """获取 Redis 客户端"""
+        if self._redis_client is None:
+            self._redis_client = redis.from_url(
+                settings.redis_url,
+                encoding="utf-8",
+                decode_responses=True,
+            )
+        return self._redis_client
+
+    # ==============================================================================
+    # 缓存键
+    # ==============================================================================
+
+    async def make_item_key(self, record_id: UUID) -> str:
+        """
+        生成单条记录缓存键
+
+        键中包含该记录的 generation，记录写入时递增 generation 即可使旧键失效
+        """
+        generation = await self._read_generation(self._make_item_generation_key(record_id))
+        return f"{self.ITEM_PREFIX}:{record_id}:{generation}"
+
+    def _make_item_generation_key(self, record_id: UUID) -> str:
+        """生成单条记录的 generation 计数器键"""
+        return f"{self.ITEM_GENERATION_PREFIX}:{record_id}"
+
+    async def make_list_key(self, app_identifier: str | None, **params: Any) -> str:
+        """
+        生成列表查询缓存键
+
+        键中包含对应 app 的 generation，写入时递增 generation 即可使旧键全部失效
+        """
+        scope = app_identifier or self.ALL_APPS
+        generation = await self._read_generation(self._make_generation_key(scope))
+        normalized = json.dumps(
+            {"app_identifier": app_identifier, **params},
+            sort_keys=True,
+            default=str,
+        )
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+        return f"{self.LIST_PREFIX}:{scope}:{generation}:{digest}"
+
+    def _make_generation_key(self, scope: str) -> str:
+        """生成 generation 计数器键"""
+        return f"{self.GENERATION_PREFIX}:{scope}"
+
+    async def _read_generation(self, key: str) -> str:
+        """读取 generation 计数器"""
+        try:
+            r = await self._get_redis()
+            return await r.get(key) or "0"
+        except Exception as e:
+            print(f"Record cache error: {e}")
+            return "0"
+
+    # ==============================================================================
+    # 读穿透
+    # ==============================================================================
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[str]],
+        ttl: int,
+    ) -> str:
+        """
+        读穿透获取缓存值
+
+        Args:
+            key: 缓存键
+            loader: 未命中时的加载函数，返回序列化后的 JSON 字符串
+            ttl: 缓存过期时间 (秒)
+
+        Returns:
+            JSON 字符串
+
+        同一 key 的并发未命中只会执行一次 loader，其余请求等待其结果；
+        loader 抛出的异常 (如 404) 会传递给所有等待者，且不写入缓存。
+        """
+        cached = await self._get(key)
+        if cached is not None:
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        # 没有等待者时避免 "exception was never retrieved" 警告
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+
+        try:
+            value = await loader()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(value)
+        await self._set(key, value, ttl)
+        return value
+
+    async def _get(self, key: str) -> str | None:
+        """从 Redis 读取"""
+        try:
+            r = await self._get_redis()
+            return await r.get(key)
+        except Exception as e:
+            print(f"Record cache error: {e}")
+            return None
+
+    async def _set(self, key: str, value: str, ttl: int) -> None:
+        """写入 Redis"""
+        try:
+            r = await self._get_redis()
+            await r.setex(key, ttl, value)
+        except Exception as e:
+            print(f"Record cache save error: {e}")
+
+    # ==============================================================================
+    # 失效
+    # ==============================================================================
+
+    async def invalidate(
+        self,
+        record_ids: Iterable[UUID],
+        app_identifiers: Iterable[str],
+    ) -> None:
+        """
+        写操作后使缓存失效
+
+        Args:
+            record_ids: 被修改的记录 ID
+            app_identifiers: 被修改记录所属的应用 (用于列表缓存失效)
+        """
+        scopes = {self.ALL_APPS, *app_identifiers}
+
+        try:
+            r = await self._get_redis()
+            async with r.pipeline(transaction=False) as pipe:
+                for record_id in record_ids:
+                    key = self._make_item_generation_key(record_id)
+                    pipe.incr(key)
+                    # 计数器比缓存值存活更久：过期归零时旧 generation 下的缓存早已过期
+                    pipe.expire(key, settings.record_cache_ttl * 2)
+                for scope in scopes:
+                    pipe.incr(self._make_generation_key(scope))
+                await pipe.execute()
+        except Exception as e:
+            print(f"Record cache invalidation error: {e}")
+
+    async def close(self) -> None:
+        """关闭 Redis 连接"""
+        if self._redis_client:
+            await self._redis_client.close()
+            self._redis_client = None
+
+
+# 全局单例
+record_cache = RecordCacheService()
@@ -0,0 +1,231 @@
+"""
+Unified Backend Platform - Record Expansion Service
+
+展开 payload 中引用的其他记录 (以及记录所有者)，每层一次批量 $in 查询
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+from uuid import UUID
+
+from beanie.operators import In
+
+from app.core.config import get_settings
+from app.models.unified_record import UnifiedRecord
+from app.models.user import User
+from app.services.record_partition_service import record_partitions
+
+settings = get_settings()
+
+OWNER_PATH = "owner"
+
+
+def parse_expand(expand: str | None) -> list[list[str]]:
+    """
+    解析 expand 参数
+
+    格式: 逗号分隔的路径，如 "payload.author_id,payload.item_ids,owner"；
+    引用之后的路径作用于被引用的记录，如 "payload.author_id.payload.team_id" (两层)
+
+    Raises:
+        ValueError: 路径格式无效
+    """
+    if not expand:
+        return []
+
+    paths = []
+    for raw in expand.split(","):
+        raw = raw.strip()
+        if not raw:
+            continue
+        segments = raw.split(".")
+        if segments == [OWNER_PATH]:
+            paths.append(segments)
+            continue
+        if segments[0] != "payload" or len(segments) < 2 or not all(segments):
+            raise ValueError(
+                f"Invalid expand path: {raw} (expected payload.<key>[...] or owner)"
+            )
+        paths.append(segments)
+
+    if len(paths) > settings.record_expand_max_paths:
+        raise ValueError(f"Too many expand paths (max {settings.record_expand_max_paths})")
+    return paths
+
+
+def is_visible(item: dict[str, Any], current_user: User | None) -> bool:
+    """响应条目对当前用户是否可见 (与获取单条记录的规则相同)"""
+    if item["is_published"]:
+        return True
+    return bool(
+        current_user
+        and (item["owner_id"] == current_user.id or current_user.is_superuser)
+    )
+
+
+def _as_reference(value: Any) -> UUID | list[UUID] | None:
+    """值是记录 ID (UUID 字符串) 或记录 ID 列表时返回 UUID，否则返回 None"""
+    if isinstance(value, str):
+        try:
+            return UUID(value)
+        except ValueError:
+            return None
+    if isinstance(value, list) and value:
+        references = [_as_reference(item) for item in value]
+        if all(isinstance(reference, UUID) for reference in references):
+            return references
+    return None
+
+
+class RecordExpansionService:
+    """
+    引用展开服务
+
+    职责:
+    1. 沿 expand 路径在 payload 中查找记录 ID (单个或列表)
+    2. 同一层的所有引用合并为一次批量查询 (记录按集合 $in，所有者一次 $in)
+    3. 对被引用记录应用与获取单条记录相同的可见性规则，不可见或不存在时为 null
+    4. 引用之后的剩余路径在下一层继续展开，层数受 RECORD_EXPAND_MAX_DEPTH 限制
+
+    展开结果写入响应条目的 "expanded" 字段，键为引用所在的路径。
+    """
+
+    async def expand(
+        self,
+        items: list[dict[str, Any]],
+        paths: list[list[str]],
+        current_user: User | None,
+        to_response: Callable[[dict[str, Any]], dict[str, Any]],
+    ) -> None:
+        """
+        展开响应条目中的引用 (原地修改)
+
+        Args:
+            items: UnifiedRecordResponse 结构的响应条目
+            paths: parse_expand() 的结果
+            current_user: 当前用户 (可见性检查)
+            to_response: 原始文档 -> 响应条目 的转换函数
+
+        Raises:
+            ValueError: 单层引用数量超过上限
+        """
+        resolved: dict[UUID, dict[str, Any] | None] = {}
+        work = [(item, path) for item in items for path in paths]
+        depth = 0
+
+        while work and depth < settings.record_expand_max_depth:
+            depth += 1
+            # (条目, expanded 键, 引用, 剩余路径)
+            pending: list[tuple[dict[str, Any], str, Any, list[str]]] = []
+            record_ids: set[UUID] = set()
+            owner_ids: set[UUID] = set()
+
+            for item, path in work:
+                if path == [OWNER_PATH]:
+                    if item.get("owner_id"):
+                        owner_ids.add(item["owner_id"])
+                        pending.append((item, OWNER_PATH, item["owner_id"], []))
+                    continue
+
+                found = self._find_reference(item.get("payload") or {}, path)
+                if found is None:
+                    continue
+                key, reference, rest = found
+                references = reference if isinstance(reference, list) else [reference]
+                record_ids.update(r for r in references if r not in resolved)
+                pending.append((item, key, reference, rest))
+
+            if len(record_ids) + len(owner_ids) > settings.record_expand_max_ids:
+                raise ValueError(
+                    f"Too many references to expand (max {settings.record_expand_max_ids} per level)"
+                )
+
+            await self._resolve_records(record_ids, current_user, to_response, resolved)
+            owners = await self._resolve_owners(owner_ids)
+
+            work = []
+            for item, key, reference, rest in pending:
+                expanded = item["expanded"] = item.get("expanded") or {}
+                if key == OWNER_PATH:
+                    expanded[key] = owners.get(reference)
+                    continue
+
+                # 同一记录可能被多处引用，每处使用浅拷贝，嵌套展开互不影响；
+                # 多条路径经过同一引用时复用已展开的条目
+                if key not in expanded:
+                    if isinstance(reference, list):
+                        expanded[key] = [self._copy(resolved.get(r)) for r in reference]
+                    else:
+                        expanded[key] = self._copy(resolved.get(reference))
+
+                if rest:
+                    targets = expanded[key] if isinstance(reference, list) else [expanded[key]]
+                    work.extend((target, rest) for target in targets if target is not None)
+
+    @staticmethod
+    def _copy(item: dict[str, Any] | None) -> dict[str, Any] | None:
+        """浅拷贝响应条目"""
+        return {**item} if item is not None else None
+
+    def _find_reference(
+        self,
+        payload: dict[str, Any],
+        path: list[str],
+    ) -> tuple[str, Any, list[str]] | None:
+        """
+        沿路径查找第一个引用
+
+        Returns:
+            (引用所在路径, 引用, 剩余路径)；路径不存在或不是引用时返回 None
+        """
+        value: Any = payload
+        for index, segment in enumerate(path[1:], start=1):
+            if not isinstance(value, dict) or segment not in value:
+                return None
+            value = value[segment]
+            reference = _as_reference(value)
+            if reference is not None:
+                rest = path[index + 1:]
+                if rest and rest != [OWNER_PATH] and rest[0] != "payload":
+                    return None
+                return ".".join(path[: index + 1]), reference, rest
+        return None
+
+    async def _resolve_records(
+        self,
+        record_ids: set[UUID],
+        current_user: User | None,
+        to_response: Callable[[dict[str, Any]], dict[str, Any]],
+        resolved: dict[UUID, dict[str, Any] | None],
+    ) -> None:
+        """批量读取被引用的记录并检查可见性"""
+        if not record_ids:
+            return
+
+        docs = await record_partitions.find_documents_by_ids(
+            list(record_ids),
+            UnifiedRecord.is_deleted == False,
+        )
+        for record_id in record_ids:
+            doc = docs.get(record_id)
+            item = to_response(doc) if doc is not None else None
+            resolved[record_id] = item if item and is_visible(item, current_user) else None
+
+    async def _resolve_owners(self, owner_ids: set[UUID]) -> dict[UUID, dict[str, Any]]:
+        """批量读取记录所有者 (只返回公开资料)"""
+        if not owner_ids:
+            return {}
+        users = await User.find(In(User.id, list(owner_ids))).to_list()
+        return {
+            user.id: {
+                "id": user.id,
+                "display_name": user.display_name,
+                "avatar": user.avatar,
+            }
+            for user in users
+        }
+
+
+# 全局单例
+record_expander = RecordExpansionService()
@@ -0,0 +1,458 @@
+"""
+Unified Backend Platform - Record Partition Service
+
+UnifiedRecord 按应用分区：路由表、透明路由与在线分批迁移
+"""
+from __future__ import annotations
+
+import asyncio
+import copy
+import time
+import warnings
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from beanie import init_beanie
+from beanie.odm.utils.parsing import parse_obj
+from beanie.operators import In, Inc
+from pydantic import create_model
+from pymongo import DeleteOne, ReplaceOne
+
+from app.core.config import get_settings
+from app.db.index_manager import IndexManager
+from app.db.indexes import CANONICAL_INDEXES
+from app.db.read_preference import ReadClass, with_read_class
+from app.models.record_partition import PartitionStatus, RecordPartition
+from app.models.unified_record import UnifiedRecord
+from app.services.record_cache_service import record_cache
+
+settings = get_settings()
+
+# 迁移删除源文档时用于检测并发修改的字段：
+# 复制之后文档若被更新，删除条件不再匹配，下一轮会重新复制
+_UNCHANGED_FIELDS = ("version", "updated_at", "view_count", "is_deleted")
+
+# 跨集合聚合中的临时字段：文档来源集合 / 迁移期间在分区集合中的副本
+_SOURCE_FIELD = "_partition"
+_COPIED_FIELD = "_copied"
+
+
+class RecordPartitionService:
+    """
+    记录分区服务
+
+    职责:
+    1. 维护 应用 -> 分区集合 的路由表 (record_partitions 集合，进程内定期刷新)
+    2. 为读写选择 Beanie 模型：分区集合对应动态生成的 UnifiedRecord 子类，
+       共享集合仍为 UnifiedRecord 本身
+    3. 在线迁移：先写入 MIGRATING 路由并等待所有 worker 刷新，
+       然后分批复制到分区集合、删除未被并发修改的源文档，最后切换为 ACTIVE
+
+    路由规则:
+    - 无路由: 读写共享集合
+    - MIGRATING: 写入分区集合；读取合并两个集合，已复制到分区集合的文档以分区副本为准
+    - ACTIVE: 只读写分区集合
+    """
+
+    def __init__(self) -> None:
+        self._routes: dict[str, RecordPartition] = {}
+        self._models: dict[str, type[UnifiedRecord]] = {}
+        self._loaded_at: float = 0.0
+        self._lock = asyncio.Lock()
+
+    # ==============================================================================
+    # 路由表
+    # ==============================================================================
+
+    @staticmethod
+    def normalize(app_identifier: str) -> str:
+        """与 UnifiedRecord.app_identifier 相同的规范化规则"""
+        return UnifiedRecord.lowercase_identifier(app_identifier)
+
+    def collection_name_for(self, app_identifier: str) -> str:
+        """应用对应的分区集合名称"""
+        suffix = self.normalize(app_identifier).replace("-", "_")
+        return f"{settings.record_partition_prefix}{suffix}"
+
+    async def refresh(self, force: bool = False) -> None:
+        """刷新路由表 (超过刷新间隔或 force=True 时从数据库重新加载)"""
+        if not settings.record_partitioning_enabled:
+            return
+        if not force and not self._is_stale():
+            return
+
+        async with self._lock:
+            if not force and not self._is_stale():
+                return
+            routes = await RecordPartition.find_all().to_list()
+            for route in routes:
+                await self._get_model(route.collection_name)
+            self._routes = {route.id: route for route in routes}
+            self._loaded_at = time.monotonic()
+
+    def _is_stale(self) -> bool:
+        """路由表是否超过刷新间隔"""
+        return time.monotonic() - self._loaded_at >= settings.record_partition_refresh_seconds
+
+    async def get_route(self, app_identifier: str | None) -> RecordPartition | None:
+        """获取应用的分区路由"""
+        if not app_identifier or not settings.record_partitioning_enabled:
+            return None
+        await self.refresh()
+        return self._routes.get(self.normalize(app_identifier))
+
+    async def list_routes(self) -> list[RecordPartition]:
+        """列出路由表"""
+        await self.refresh(force=True)
+        return sorted(self._routes.values(), key=lambda route: route.id)
+
+    # ==============================================================================
+    # 模型选择
+    # ==============================================================================
+
+    async def _get_model(self, collection_name: str) -> type[UnifiedRecord]:
+        """
+        获取分区集合对应的 Beanie 模型 (首次使用时创建并初始化)
+
+        UnifiedRecord 初始化后其字段被替换为查询表达式，直接继承会把表达式当作默认值，
+        因此子类需要重新声明全部字段
+        """
+        model = self._models.get(collection_name)
+        if model is not None:
+            return model
+
+        fields = {
+            name: (field.annotation, copy.copy(field))
+            for name, field in UnifiedRecord.model_fields.items()
+        }
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            model = create_model(
+                "PartitionedUnifiedRecord",
+                __base__=UnifiedRecord,
+                __module__=UnifiedRecord.__module__,
+                **fields,
+            )
+        model.Settings = type("Settings", (UnifiedRecord.Settings,), {"name": collection_name})
+
+        await init_beanie(
+            database=UnifiedRecord.get_motor_collection().database,
+            document_models=[model],
+        )
+        self._models[collection_name] = model
+        return model
+
+    async def model_for_write(self, app_identifier: str) -> type[UnifiedRecord]:
+        """新记录写入使用的模型"""
+        route = await self.get_route(app_identifier)
+        if route is None:
+            return UnifiedRecord
+        return await self._get_model(route.collection_name)
+
+    async def models_for_read(self, app_identifier: str | None) -> list[type[UnifiedRecord]]:
+        """
+        读取需要访问的模型 (按优先级排列)
+
+        app_identifier 为空时返回共享集合和所有分区集合
+        """
+        if not settings.record_partitioning_enabled:
+            return [UnifiedRecord]
+
+        if app_identifier is None:
+            await self.refresh()
+            return [UnifiedRecord] + [
+                await self._get_model(route.collection_name)
+                for route in self._routes.values()
+            ]
+
+        route = await self.get_route(app_identifier)
+        if route is None:
+            return [UnifiedRecord]
+        model = await self._get_model(route.collection_name)
+        if route.status == PartitionStatus.ACTIVE:
+            return [model]
+        return [model, UnifiedRecord]
+
+    async def all_models(self) -> list[type[UnifiedRecord]]:
+        """所有记录集合的模型 (供归档等后台任务使用)"""
+        return await self.models_for_read(None)
+
+    # ==============================================================================
+    # 透明读取
+    # ==============================================================================
+
+    async def find_record(self, record_id: UUID, *conditions: Any) -> UnifiedRecord | None:
+        """
+        按 ID 查找记录 (不知道所属应用)
+
+        没有分区时直接查询共享集合；否则用一次 $unionWith 聚合同时查询所有集合
+        (每个集合按 _id 索引查找)，迁移中的应用同时存在两份时以分区集合中的副本为准。
+        """
+        models = await self.models_for_read(None)
+        if len(models) == 1:
+            return await UnifiedRecord.find_one(UnifiedRecord.id == record_id, *conditions)
+
+        query = UnifiedRecord.find(UnifiedRecord.id == record_id, *conditions).get_filter_query()
+        pipeline: list[dict[str, Any]] = [{"$match": query}]
+        for model in models[1:]:
+            pipeline.append(
+                {
+                    "$unionWith": {
+                        "coll": model.get_collection_name(),
+                        "pipeline": [
+                            {"$match": query},
+                            {"$addFields": {_SOURCE_FIELD: model.get_collection_name()}},
+                        ],
+                    }
+                }
+            )
+        docs = await UnifiedRecord.get_motor_collection().aggregate(pipeline).to_list(length=None)
+        if not docs:
+            return None
+
+        # 共享集合的文档没有来源字段，排在分区副本之后
+        doc = max(docs, key=lambda item: _SOURCE_FIELD in item)
+        source = doc.pop(_SOURCE_FIELD, None)
+        model = UnifiedRecord if source is None else await self._get_model(source)
+        return parse_obj(model, doc)
+
+    async def increment_view_count(self, record: UnifiedRecord) -> None:
+        """原子增加查看次数 (记录可能来自缓存，不确定所在集合)"""
+        for model in await self.models_for_read(record.app_identifier):
+            result = await model.find_one(model.id == record.id).update(
+                Inc({model.view_count: 1})
+            )
+            if result is not None and result.modified_count:
+                return
+
+    async def _migrating_collections(self, app_identifier: str | None) -> list[str]:
+        """读取涉及的迁移中分区集合 (共享集合中已复制到这些集合的文档需要排除)"""
+        if not settings.record_partitioning_enabled:
+            return []
+        if app_identifier is None:
+            await self.refresh()
+            routes = list(self._routes.values())
+        else:
+            route = await self.get_route(app_identifier)
+            routes = [route] if route is not None else []
+        return [
+            route.collection_name
+            for route in routes
+            if route.status == PartitionStatus.MIGRATING
+        ]
+
+    @staticmethod
+    def _exclude_copied(migrating: list[str]) -> list[dict[str, Any]]:
+        """
+        共享集合的附加聚合阶段：排除已复制到迁移中分区集合、尚未从共享集合删除的文档
+
+        按 _id 索引查找分区集合，只在迁移期间使用
+        """
+        stages: list[dict[str, Any]] = []
+        for collection_name in migrating:
+            stages += [
+                {
+                    "$lookup": {
+                        "from": collection_name,
+                        "localField": "_id",
+                        "foreignField": "_id",
+                        "as": _COPIED_FIELD,
+                    }
+                },
+                {"$match": {_COPIED_FIELD: {"$size": 0}}},
+            ]
+        if stages:
+            stages.append({"$project": {_COPIED_FIELD: 0}})
+        return stages
+
+    async def _read_pipelines(
+        self,
+        app_identifier: str | None,
+        query: dict[str, Any],
+        read_class: ReadClass,
+    ) -> list[tuple[Any, list[dict[str, Any]]]]:
+        """
+        读取涉及的集合及其筛选阶段 (按优先级排列)
+
+        Returns:
+            [(集合, 筛选阶段)]；迁移期间共享集合的筛选阶段排除已复制到分区集合的文档
+        """
+        migrating = await self._migrating_collections(app_identifier)
+        sources = []
+        for model in await self.models_for_read(app_identifier):
+            stages: list[dict[str, Any]] = [{"$match": query}]
+            if model is UnifiedRecord:
+                stages += self._exclude_copied(migrating)
+            sources.append((with_read_class(model.get_motor_collection(), read_class), stages))
+        return sources
+
+    async def count_documents(
+        self,
+        app_identifier: str | None,
+        query: dict[str, Any],
+        read_class: ReadClass = ReadClass.PRIMARY,
+    ) -> int:
+        """跨集合计数 (迁移期间同时存在于两个集合的文档只计一次)"""
+        total = 0
+        for collection, stages in await self._read_pipelines(app_identifier, query, read_class):
+            if len(stages) == 1:
+                total += await collection.count_documents(query)
+                continue
+            async for row in collection.aggregate(stages + [{"$count": "count"}]):
+                total += row["count"]
+        return total
+
+    async def find_documents(
+        self,
+        app_identifier: str | None,
+        query: dict[str, Any],
+        sort: list[tuple[str, int]],
+        skip: int,
+        limit: int,
+        read_class: ReadClass = ReadClass.PRIMARY,
+    ) -> list[dict[str, Any]]:
+        """
+        跨集合分页查询原始文档
+
+        只涉及一个集合时使用普通 find；否则用 $unionWith 在服务端合并后排序分页
+        (迁移期间同时存在于两个集合的文档只返回分区集合中的副本)
+        """
+        sources = await self._read_pipelines(app_identifier, query, read_class)
+        if len(sources) == 1:
+            cursor = sources[0][0].find(query).sort(sort).skip(skip).limit(limit)
+            return await cursor.to_list(length=limit)
+
+        (collection, pipeline), *others = sources
+        pipeline = list(pipeline)
+        for other, stages in others:
+            pipeline.append({"$unionWith": {"coll": other.name, "pipeline": stages}})
+        pipeline += [{"$sort": dict(sort)}, {"$skip": skip}, {"$limit": limit}]
+        return await collection.aggregate(pipeline).to_list(length=limit)
+
+    async def find_documents_by_ids(
+        self,
+        record_ids: list[UUID],
+        *conditions: Any,
+    ) -> dict[UUID, dict[str, Any]]:
+        """
+        按 ID 批量读取原始文档 (不知道所属应用)
+
+        每个集合一次 $in 查询；先查分区集合 (迁移中的应用以分区副本为准)，
+        剩余 ID 再查共享集合
+
+        Returns:
+            {记录 ID: 原始文档}，未找到的 ID 不在结果中
+        """
+        found: dict[UUID, dict[str, Any]] = {}
+        remaining = list(dict.fromkeys(record_ids))
+
+        for model in reversed(await self.models_for_read(None)):
+            if not remaining:
+                break
+            query = model.find(In(model.id, remaining), *conditions).get_filter_query()
+            async for doc in model.get_motor_collection().find(query):
+                found[doc["_id"].as_uuid()] = doc
+            remaining = [record_id for record_id in remaining if record_id not in found]
+
+        return found
+
+    # ==============================================================================
+    # 迁移
+    # ==============================================================================
+
+    async def ensure_indexes(self, collection_name: str) -> None:
+        """分区集合使用与 unified_records 相同的索引声明"""
+        manager = IndexManager({collection_name: CANONICAL_INDEXES["unified_records"]})
+        await manager.reconcile(UnifiedRecord.get_motor_collection().database)
+
+    async def create_partition(self, app_identifier: str) -> RecordPartition:
+        """创建 (或返回已有的) 分区路由，初始状态为 MIGRATING"""
+        app_identifier = self.normalize(app_identifier)
+        route = await RecordPartition.get(app_identifier)
+        if route is None:
+            route = RecordPartition(
+                id=app_identifier,
+                collection_name=self.collection_name_for(app_identifier),
+            )
+            await route.insert()
+
+        await self.ensure_indexes(route.collection_name)
+        await self.refresh(force=True)
+        return route
+
+    async def migrate(
+        self,
+        app_identifier: str,
+        batch_size: int | None = None,
+        wait_for_workers: bool = True,
+        on_batch: Callable[[int], None] | None = None,
+    ) -> RecordPartition:
+        """
+        将应用的记录从共享集合在线迁移到分区集合
+
+        Args:
+            app_identifier: 应用标识符
+            batch_size: 每批文档数
+            wait_for_workers: 开始移动前是否等待一个路由刷新间隔
+            on_batch: 每批完成后的回调，参数为累计迁移数
+
+        Returns:
+            ACTIVE 状态的路由
+        """
+        route = await self.create_partition(app_identifier)
+        if route.status == PartitionStatus.ACTIVE:
+            return route
+
+        if wait_for_workers:
+            # 其他 worker 在看到 MIGRATING 路由之前仍只读共享集合
+            await asyncio.sleep(settings.record_partition_refresh_seconds)
+
+        source = UnifiedRecord.get_motor_collection()
+        target = source.database[route.collection_name]
+        batch_size = batch_size or settings.record_partition_batch_size
+
+        while True:
+            docs = (
+                await source.find({"app_identifier": route.id})
+                .sort("_id", 1)
+                .limit(batch_size)
+                .to_list(length=batch_size)
+            )
+            if not docs:
+                break
+
+            await target.bulk_write(
+                [ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in docs],
+                ordered=False,
+            )
+            result = await source.bulk_write(
+                [
+                    DeleteOne(
+                        {"_id": doc["_id"], **{f: doc.get(f) for f in _UNCHANGED_FIELDS}}
+                    )
+                    for doc in docs
+                ],
+                ordered=False,
+            )
+
+            route.migrated_count += result.deleted_count
+            route.touch()
+            await route.save()
+            if on_batch:
+                on_batch(route.migrated_count)
+
+        route.status = PartitionStatus.ACTIVE
+        route.activated_at = datetime.utcnow()
+        route.touch()
+        await route.save()
+        await self.refresh(force=True)
+
+        if settings.record_cache_enabled:
+            await record_cache.invalidate(record_ids=[], app_identifiers={route.id})
+        return route
+
+
+# 全局单例
+record_partitions = RecordPartitionService()
@@ -0,0 +1,308 @@
+"""
+Unified Backend Platform - Record Stats Service
+
+按 (app_identifier, collection_type) 物化的记录统计：写入时增量更新，定时对账
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from typing import Any
+
+import bson
+import redis.asyncio as redis
+from bson.binary import UuidRepresentation
+from bson.codec_options import CodecOptions
+from pymongo import DeleteMany, ReplaceOne, UpdateOne
+
+from app.core.config import get_settings
+from app.db.read_preference import ReadClass, with_read_class
+from app.models.record_stats import RecordStats
+from app.models.unified_record import UnifiedRecord
+from app.services.record_partition_service import record_partitions
+
+settings = get_settings()
+
+_CODEC_OPTIONS = CodecOptions(uuid_representation=UuidRepresentation.STANDARD)
+
+# 对账聚合中 "未删除" 的表达式
+_LIVE = {"$ne": ["$is_deleted", True]}
+
+
+def _contribution(doc: dict[str, Any] | None) -> tuple[int, int, int]:
+    """
+    文档对统计的贡献 (记录数, 已发布数, 字节数)
+
+    doc 为数据库中的文档形式 (Beanie 保存的状态)；None 或已删除时贡献为 0
+    """
+    if not doc or doc.get("is_deleted"):
+        return 0, 0, 0
+    size = len(bson.encode(doc, codec_options=_CODEC_OPTIONS))
+    return 1, int(bool(doc.get("is_published"))), size
+
+
+class RecordStatsService:
+    """
+    记录统计服务
+
+    职责:
+    1. 记录写入后，比较写入前后的文档状态，对统计文档执行 $inc
+       (创建 / 删除 / 发布状态变化 / payload 大小变化)
+    2. 定时对账：聚合所有记录集合 (共享集合与分区集合)，整体替换统计；
+       多 worker 部署时通过 Redis 锁保证同一周期只有一个 worker 执行
+    3. 为管理页面按应用汇总统计、为记录列表提供 total，不扫描记录集合
+
+    增量更新失败不影响记录写入，由下一次对账修正。
+    对账聚合与替换之间发生的写入可能被覆盖，同样在下一次对账时修正。
+    """
+
+    LOCK_KEY = "record_stats:lock"
+
+    def __init__(self) -> None:
+        self._redis_client: redis.Redis | None = None
+
+    # ==============================================================================
+    # 增量更新
+    # ==============================================================================
+
+    async def record_changed(
+        self,
+        record: UnifiedRecord,
+        before: dict[str, Any] | None = None,
+    ) -> None:
+        """
+        记录保存后更新统计
+
+        Args:
+            record: 已保存的记录
+            before: 修改前的文档状态 (record.get_saved_state())，新建记录为 None
+        """
+        await self.records_changed([(record, before)])
+
+    async def records_changed(
+        self,
+        changes: list[tuple[UnifiedRecord, dict[str, Any] | None]],
+    ) -> None:
+        """批量版本：同一 (应用, 数据类型) 的变化合并为一次 $inc"""
+        await self.documents_changed(
+            [(record.get_saved_state(), before) for record, before in changes]
+        )
+
+    async def documents_changed(
+        self,
+        changes: list[tuple[dict[str, Any], dict[str, Any] | None]],
+    ) -> None:
+        """
+        按原始文档更新统计 (供不经过 Beanie 的批量写入使用)
+
+        Args:
+            changes: [(写入后的文档, 写入前的文档或 None)]
+        """
+        if not settings.record_stats_enabled or not changes:
+            return
+
+        now = datetime.utcnow()
+        deltas: dict[tuple[str, str], list[int]] = {}
+        for after, before in changes:
+            current = _contribution(after)
+            previous = _contribution(before)
+            key = (after["app_identifier"], after["collection_type"])
+            delta = deltas.setdefault(key, [0, 0, 0])
+            for i in range(3):
+                delta[i] += current[i] - previous[i]
+
+        operations = [
+            UpdateOne(
+                {"_id": RecordStats.make_id(app_identifier, collection_type)},
+                {
+                    "$inc": {
+                        "record_count": record_count,
+                        "published_count": published_count,
+                        "storage_bytes": storage_bytes,
+                    },
+                    "$max": {"last_activity_at": now},
+                    "$setOnInsert": {
+                        "app_identifier": app_identifier,
+                        "collection_type": collection_type,
+                    },
+                },
+                upsert=True,
+            )
+            for (app_identifier, collection_type), (
+                record_count,
+                published_count,
+                storage_bytes,
+            ) in deltas.items()
+        ]
+        try:
+            await RecordStats.get_motor_collection().bulk_write(operations, ordered=False)
+        except Exception as e:
+            print(f"Record stats update error: {e}")
+
+    # ==============================================================================
+    # 查询
+    # ==============================================================================
+
+    async def list_stats(self, app_identifier: str | None = None) -> list[RecordStats]:
+        """列出统计 (按应用、数据类型排序)"""
+        filters = []
+        if app_identifier:
+            app_identifier = UnifiedRecord.lowercase_identifier(app_identifier)
+            filters.append(RecordStats.app_identifier == app_identifier)
+        return await RecordStats.find(*filters).sort(+RecordStats.id).to_list()
+
+    async def count_records(
+        self,
+        app_identifier: str,
+        collection_type: str | None = None,
+        is_published: bool | None = None,
+    ) -> int | None:
+        """
+        从统计读取未删除记录数 (记录列表的 total，不扫描记录集合)
+
+        Args:
+            app_identifier: 应用标识符
+            collection_type: 数据类型，None 时合计应用下的全部数据类型
+            is_published: True 只计已发布，False 只计未发布，None 全部
+
+        Returns:
+            未开启、没有统计或统计尚未对账 (计数不可信) 时返回 None，由调用方执行 count_documents
+        """
+        if not settings.record_stats_enabled or not settings.record_stats_list_totals:
+            return None
+
+        filters = [RecordStats.app_identifier == app_identifier]
+        if collection_type:
+            filters.append(RecordStats.collection_type == collection_type)
+        try:
+            stats = await RecordStats.find(*filters).to_list()
+        except Exception as e:
+            print(f"Record stats read error: {e}")
+            return None
+        if not stats or any(entry.reconciled_at is None for entry in stats):
+            return None
+
+        if is_published is None:
+            return sum(entry.record_count for entry in stats)
+        published = sum(entry.published_count for entry in stats)
+        if is_published:
+            return published
+        return sum(entry.record_count for entry in stats) - published
+
+    # ==============================================================================
+    # 对账
+    # ==============================================================================
+
+    async def _get_redis(self) -> redis.Redis:
+        """获取 Redis 客户端"""
+        if self._redis_client is None:
+            self._redis_client = redis.from_url(
+                settings.redis_url,
+                encoding="utf-8",
+                decode_responses=True,
+            )
+        return self._redis_client
+
+    async def _acquire_lock(self) -> bool:
+        """获取本周期的执行锁，Redis 不可用时直接执行 (对账幂等)"""
+        try:
+            r = await self._get_redis()
+            return bool(
+                await r.set(
+                    self.LOCK_KEY,
+                    datetime.utcnow().isoformat(),
+                    nx=True,
+                    ex=max(settings.record_stats_reconcile_seconds - 1, 1),
+                )
+            )
+        except Exception as e:
+            print(f"Record stats lock error: {e}")
+            return True
+
+    async def reconcile(self, use_lock: bool = True) -> int | None:
+        """
+        按实际数据重新计算统计
+
+        Returns:
+            统计条目数；未获得锁时返回 None
+        """
+        if use_lock and not await self._acquire_lock():
+            return None
+
+        reconciled_at = datetime.utcnow()
+        pipeline: list[dict[str, Any]] = [
+            {
+                "$group": {
+                    "_id": {"app": "$app_identifier", "type": "$collection_type"},
+                    "record_count": {"$sum": {"$cond": [_LIVE, 1, 0]}},
+                    "published_count": {
+                        "$sum": {
+                            "$cond": [
+                                {"$and": [_LIVE, {"$eq": ["$is_published", True]}]},
+                                1,
+                                0,
+                            ]
+                        }
+                    },
+                    "storage_bytes": {
+                        "$sum": {"$cond": [_LIVE, {"$bsonSize": "$$ROOT"}, 0]}
+                    },
+                    "last_activity_at": {"$max": "$updated_at"},
+                }
+            },
+        ]
+
+        totals: dict[str, dict[str, Any]] = {}
+        for model in await record_partitions.all_models():
+            collection = with_read_class(model.get_motor_collection(), ReadClass.AGGREGATION)
+            async for row in collection.aggregate(pipeline):
+                key = RecordStats.make_id(row["_id"]["app"], row["_id"]["type"])
+                entry = totals.setdefault(
+                    key,
+                    {
+                        "_id": key,
+                        "app_identifier": row["_id"]["app"],
+                        "collection_type": row["_id"]["type"],
+                        "record_count": 0,
+                        "published_count": 0,
+                        "storage_bytes": 0,
+                        "last_activity_at": None,
+                        "reconciled_at": reconciled_at,
+                    },
+                )
+                entry["record_count"] += row["record_count"]
+                entry["published_count"] += row["published_count"]
+                entry["storage_bytes"] += row["storage_bytes"]
+                if entry["last_activity_at"] is None or (
+                    row["last_activity_at"] and row["last_activity_at"] > entry["last_activity_at"]
+                ):
+                    entry["last_activity_at"] = row["last_activity_at"]
+
+        operations: list[Any] = [
+            ReplaceOne({"_id": key}, entry, upsert=True) for key, entry in totals.items()
+        ]
+        operations.append(DeleteMany({"_id": {"$nin": list(totals)}}))
+        await RecordStats.get_motor_collection().bulk_write(operations, ordered=True)
+        return len(totals)
+
+    async def run_forever(self) -> None:
+        """定时对账 (在应用生命周期内作为后台任务运行)"""
+        while True:
+            try:
+                await self.reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Record stats reconciliation failed: {e}")
+
+            await asyncio.sleep(settings.record_stats_reconcile_seconds)
+
+    async def close(self) -> None:
+        """关闭 Redis 连接"""
+        if self._redis_client:
+            await self._redis_client.close()
+            self._redis_client = None
+
+
+# 全局单例
+record_stats = RecordStatsService()
@@ -0,0 +1,320 @@
+"""
+Unified Backend Platform - Record Upsert Service
+
+按外部键 (app_identifier, collection_type, external_id) 批量 upsert 记录
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from bson import Binary
+from bson.binary import UUID_SUBTYPE
+from pydantic import BaseModel
+from pymongo import UpdateOne
+
+from app.core.config import get_settings
+from app.models.record_partition import PartitionStatus
+from app.models.unified_record import UnifiedRecord
+from app.models.user import User
+from app.services.record_batch_service import record_batches
+from app.services.record_cache_service import record_cache
+from app.services.record_partition_service import record_partitions
+from app.services.record_stats_service import record_stats
+from app.services.schema_registry_service import schema_registry
+
+settings = get_settings()
+
+# 请求中可以提供的记录字段 (未提供的字段在更新时保持不变)
+UPSERT_FIELDS = ("title", "description", "payload", "is_published")
+
+# 每次 upsert 都会写入的字段 (命中软删除记录时将其恢复)
+_ALWAYS_SET = ("updated_at", "is_deleted", "deleted_at")
+
+# 唯一索引冲突 (DuplicateKey)
+_DUPLICATE_KEY = 11000
+
+
+def _as_uuid(value: Any) -> Any:
+    """BSON UUID (Binary subtype 4) 转为 UUID"""
+    if isinstance(value, Binary) and value.subtype == UUID_SUBTYPE:
+        return value.as_uuid()
+    return value
+
+
+class UpsertOutcome(BaseModel):
+    """单条 upsert 结果"""
+
+    index: int
+    external_id: str
+    id: UUID | None = None
+    created: bool = False
+    error: str | None = None
+
+
+class _Planned(BaseModel):
+    """已生成写操作的条目"""
+
+    outcome: UpsertOutcome
+    id: UUID
+    key: dict[str, Any]
+    before: dict[str, Any] | None = None
+    after: dict[str, Any]
+    payload: dict[str, Any] | None = None
+
+
+class RecordUpsertService:
+    """
+    外部键 upsert 服务
+
+    职责:
+    1. 规范化标识符、拒绝请求内重复的外部键、按已注册 Schema 校验 payload
+    2. 每个目标集合一次 $in 查询读取已存在的记录 (所有者检查、历史版本、统计增量)
+    3. 每个目标集合一次 bulk_write(UpdateOne(upsert=True))：已存在的记录以 _id 与 version 为条件，
+       新记录以外部键与新生成的 _id 为条件 (只会插入)；唯一索引 idx_records_external_id 保证
+       并发 upsert 不会产生重复记录，也不会覆盖读取之后被并发修改或创建的记录
+    4. 被更新记录的历史版本与写入在同一事务中记录 (RecordBatchService.write_each)，
+       写入后更新统计并使缓存失效
+
+    已存在的记录只有所有者或超级管理员可以更新；命中软删除的记录时将其恢复。
+    正在迁移分区的应用暂不接受 upsert (记录可能仍在共享集合中)。
+    """
+
+    async def bulk_upsert(
+        self,
+        items: list[dict[str, Any]],
+        current_user: User,
+    ) -> list[UpsertOutcome]:
+        """
+        按外部键批量创建或更新记录
+
+        Args:
+            items: 条目字段 (只包含请求中提供的字段，必须有
+                app_identifier / collection_type / external_id)
+            current_user: 当前用户 (新记录的所有者)
+
+        Returns:
+            与 items 顺序一致的结果
+        """
+        outcomes = [
+            UpsertOutcome(index=index, external_id=item["external_id"])
+            for index, item in enumerate(items)
+        ]
+
+        groups: dict[type[UnifiedRecord], list[tuple[UpsertOutcome, dict[str, Any]]]] = {}
+        seen: set[tuple[str, str, str]] = set()
+        for outcome, item in zip(outcomes, items):
+            item = {
+                **item,
+                "app_identifier": UnifiedRecord.lowercase_identifier(item["app_identifier"]),
+                "collection_type": UnifiedRecord.lowercase_identifier(item["collection_type"]),
+            }
+            key = (item["app_identifier"], item["collection_type"], item["external_id"])
+            if key in seen:
+                outcome.error = "Duplicate external_id in request"
+                continue
+            seen.add(key)
+
+            try:
+                route = await record_partitions.get_route(item["app_identifier"])
+                if route is not None and route.status == PartitionStatus.MIGRATING:
+                    raise ValueError("Partition migration in progress, retry later")
+                if "payload" in item:
+                    await schema_registry.validate(
+                        item["app_identifier"], item["collection_type"], item["payload"]
+                    )
+            except ValueError as e:
+                outcome.error = str(e)
+                continue
+
+            model = await record_partitions.model_for_write(item["app_identifier"])
+            groups.setdefault(model, []).append((outcome, item))
+
+        for model, pending in groups.items():
+            await self._upsert_collection(model, pending, current_user)
+
+        return outcomes
+
+    async def _find_existing(
+        self,
+        model: type[UnifiedRecord],
+        pending: list[tuple[UpsertOutcome, dict[str, Any]]],
+    ) -> dict[tuple[str, str, str], dict[str, Any]]:
+        """一次查询读取已存在的记录 (包括软删除的记录)"""
+        external_ids: dict[tuple[str, str], list[str]] = {}
+        for _, item in pending:
+            external_ids.setdefault(
+                (item["app_identifier"], item["collection_type"]), []
+            ).append(item["external_id"])
+
+        query = {
+            "$or": [
+                {
+                    "app_identifier": app_identifier,
+                    "collection_type": collection_type,
+                    "external_id": {"$in": ids},
+                }
+                for (app_identifier, collection_type), ids in external_ids.items()
+            ]
+        }
+        return {
+            (doc["app_identifier"], doc["collection_type"], doc["external_id"]): doc
+            async for doc in model.get_motor_collection().find(query)
+        }
+
+    def _plan(
+        self,
+        model: type[UnifiedRecord],
+        outcome: UpsertOutcome,
+        item: dict[str, Any],
+        before: dict[str, Any] | None,
+        current_user: User,
+        now: datetime,
+    ) -> tuple[_Planned, UpdateOne]:
+        """生成单条记录的 UpdateOne"""
+        record = model(
+            app_identifier=item["app_identifier"],
+            collection_type=item["collection_type"],
+            external_id=item["external_id"],
+            owner_id=current_user.id,
+            created_at=now,
+            updated_at=now,
+            **{field: item[field] for field in UPSERT_FIELDS if field in item},
+        )
+        record.published_at = now if record.is_published else None
+        if before is not None:
+            record.id = _as_uuid(before["_id"])
+
+        doc = record.to_stored_document()
+
+        # $set: 请求中提供的字段；其余字段只在新建时写入 ($setOnInsert)
+        updated = set(_ALWAYS_SET)
+        updated.update(field for field in UPSERT_FIELDS if field in item)
+        if "payload" in item:
+            updated.add("payload_compressed")
+        if (
+            before is not None
+            and item.get("is_published")
+            and before.get("published_at") is None
+        ):
+            updated.add("published_at")
+
+        key = {
+            "app_identifier": record.app_identifier,
+            "collection_type": record.collection_type,
+            "external_id": record.external_id,
+        }
+        # 条件写入：已存在的记录以读取时的 _id 与 version 为条件；
+        # 新记录以新生成的 _id 为条件，只会插入，查询后被并发创建的同键记录不会被当作更新。
+        # 两种情况下条件不满足时都会尝试插入并触发唯一索引冲突，作为该条的错误返回
+        if before is None:
+            condition = {**key, "_id": doc["_id"]}
+        else:
+            condition = {"_id": before["_id"], "version": before.get("version")}
+        changes = {field: doc[field] for field in updated}
+        operation = UpdateOne(
+            condition,
+            {
+                "$set": changes,
+                "$setOnInsert": {
+                    field: value
+                    for field, value in doc.items()
+                    if field not in updated and field not in ("_id", "version")
+                },
+                "$inc": {"version": 1},
+            },
+            upsert=True,
+        )
+
+        if before is None:
+            after = doc
+        else:
+            after = {**before, **changes, "version": before.get("version", 1) + 1}
+
+        planned = _Planned(
+            outcome=outcome,
+            id=record.id,
+            key=key,
+            before=before,
+            after=after,
+            payload=record.payload if "payload" in item else None,
+        )
+        return planned, operation
+
+    @staticmethod
+    def _describe_error(entry: _Planned, error: dict[str, Any]) -> str:
+        """单条写入错误：条件不满足导致的唯一索引冲突转为可读的原因"""
+        if error.get("code") != _DUPLICATE_KEY:
+            return error["errmsg"]
+        if entry.before is None:
+            return "Record was created concurrently, retry"
+        return "Record was modified concurrently, retry"
+
+    async def _upsert_collection(
+        self,
+        model: type[UnifiedRecord],
+        pending: list[tuple[UpsertOutcome, dict[str, Any]]],
+        current_user: User,
+    ) -> None:
+        """对同一集合的条目执行一次 bulk_write (有条目失败时其余条目在新事务中重试)"""
+        existing = await self._find_existing(model, pending)
+        now = datetime.utcnow()
+
+        planned: list[_Planned] = []
+        operations: list[UpdateOne] = []
+        for outcome, item in pending:
+            before = existing.get(
+                (item["app_identifier"], item["collection_type"], item["external_id"])
+            )
+            if (
+                before is not None
+                and _as_uuid(before.get("owner_id")) != current_user.id
+                and not current_user.is_superuser
+            ):
+                outcome.error = "Access denied: not the owner"
+                continue
+
+            entry, operation = self._plan(model, outcome, item, before, current_user, now)
+            planned.append(entry)
+            operations.append(operation)
+
+        if not operations:
+            return
+
+        # 更新条目的修订与写入在同一事务中 (未提供 payload 的更新不需要修订)
+        write_errors = await record_batches.write_each(
+            model.get_motor_collection(),
+            operations,
+            [
+                (entry.before, entry.payload)
+                if entry.before is not None and entry.payload is not None
+                else None
+                for entry in planned
+            ],
+            current_user.id,
+        )
+
+        succeeded: list[_Planned] = []
+        for index, entry in enumerate(planned):
+            outcome = entry.outcome
+            if index in write_errors:
+                outcome.error = self._describe_error(entry, write_errors[index])
+                continue
+            # 新记录的条件是新生成的 _id，写入成功即为插入
+            outcome.id = entry.id
+            outcome.created = entry.before is None
+            succeeded.append(entry)
+
+        await record_stats.documents_changed(
+            [(entry.after, entry.before) for entry in succeeded]
+        )
+        if settings.record_cache_enabled and succeeded:
+            await record_cache.invalidate(
+                record_ids=[entry.outcome.id for entry in succeeded],
+                app_identifiers={entry.key["app_identifier"] for entry in succeeded},
+            )
+
+
+# 全局单例
+record_upserter = RecordUpsertService()
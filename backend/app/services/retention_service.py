@@ -0,0 +1,253 @@
+"""
+Unified Backend Platform - Retention Service
+
+软删除数据归档：将删除超过保留期的记录和文件元数据分批移入归档集合
+"""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any
+
+import motor.motor_asyncio
+import redis.asyncio as redis
+from pymongo import ReplaceOne
+
+from app.core.config import get_settings
+from app.models.file import File
+from app.models.record_revision import RecordRevision
+from app.models.unified_record import UnifiedRecord
+from app.services.record_partition_service import record_partitions
+
+settings = get_settings()
+
+
+class RetentionService:
+    """
+    软删除数据归档服务
+
+    职责:
+    1. 为历史软删除数据补齐 deleted_at (取 updated_at)
+    2. 按应用保留期，将 deleted_at 早于截止时间的文档分批移入 *_archive 集合
+    3. 定时执行；多 worker 部署时通过 Redis 锁保证同一周期只有一个 worker 执行
+
+    记录的分区集合与共享集合归档到同一个归档集合，记录的历史版本随记录在同一批次中
+    移入 record_revisions_archive。
+    文件只归档元数据，对象存储中的内容不做处理。
+    归档写入使用 upsert，中断后重跑是幂等的。
+    """
+
+    LOCK_KEY = "retention:lock"
+
+    # (源集合模型, 归档集合名称)
+    TARGETS: list[tuple[Any, str]] = [
+        (UnifiedRecord, "unified_records_archive"),
+        (File, "files_archive"),
+    ]
+
+    REVISIONS_ARCHIVE = "record_revisions_archive"
+
+    def __init__(self) -> None:
+        self._redis_client: redis.Redis | None = None
+
+    async def _get_redis(self) -> redis.Redis:
+        """获取 Redis 客户端"""
+        if self._redis_client is None:
+            self._redis_client = redis.from_url(
+                settings.redis_url,
+                encoding="utf-8",
+                decode_responses=True,
+            )
+        return self._redis_client
+
+    async def _acquire_lock(self) -> bool:
+        """获取本周期的执行锁，Redis 不可用时直接执行 (归档幂等)"""
+        try:
+            r = await self._get_redis()
+            return bool(
+                await r.set(
+                    self.LOCK_KEY,
+                    datetime.utcnow().isoformat(),
+                    nx=True,
+                    ex=max(settings.retention_interval_seconds - 1, 1),
+                )
+            )
+        except Exception as e:
+            print(f"Retention lock error: {e}")
+            return True
+
+    # ==============================================================================
+    # 归档
+    # ==============================================================================
+
+    async def backfill_deleted_at(
+        self,
+        source: motor.motor_asyncio.AsyncIOMotorCollection,
+    ) -> int:
+        """为没有 deleted_at 的软删除文档补齐删除时间 (删除时会 touch updated_at)"""
+        result = await source.update_many(
+            {"is_deleted": True, "deleted_at": None},
+            [{"$set": {"deleted_at": "$updated_at"}}],
+        )
+        return result.modified_count
+
+    async def archive_revisions(
+        self,
+        record_ids: list[Any],
+        archived_at: datetime,
+    ) -> int:
+        """
+        复制记录的历史版本到归档集合 (记录删除前调用，upsert 幂等)
+
+        Returns:
+            复制的修订数
+        """
+        revisions = RecordRevision.get_motor_collection()
+        archive = revisions.database[self.REVISIONS_ARCHIVE]
+        docs = await revisions.find({"record_id": {"$in": record_ids}}).to_list(length=None)
+        if docs:
+            await archive.bulk_write(
+                [
+                    ReplaceOne({"_id": doc["_id"]}, {**doc, "archived_at": archived_at}, upsert=True)
+                    for doc in docs
+                ],
+                ordered=False,
+            )
+        return len(docs)
+
+    async def archive_collection(
+        self,
+        source: motor.motor_asyncio.AsyncIOMotorCollection,
+        archive: motor.motor_asyncio.AsyncIOMotorCollection,
+        cutoff: datetime,
+        app_filter: dict[str, Any],
+        with_revisions: bool = False,
+    ) -> int:
+        """
+        分批移动软删除文档到归档集合
+
+        Args:
+            source: 源集合
+            archive: 归档集合
+            cutoff: 删除时间早于该时间的文档会被归档
+            app_filter: 应用筛选条件
+            with_revisions: 是否同时移动记录的历史版本 (记录集合)
+
+        Returns:
+            移动的文档数
+        """
+        query = {"is_deleted": True, "deleted_at": {"$lt": cutoff}, **app_filter}
+        batch_size = settings.retention_batch_size
+        moved = 0
+
+        while True:
+            docs = (
+                await source.find(query)
+                .sort("deleted_at", 1)
+                .limit(batch_size)
+                .to_list(length=batch_size)
+            )
+            if not docs:
+                break
+
+            ids = [doc["_id"] for doc in docs]
+            archived_at = datetime.utcnow()
+            await archive.bulk_write(
+                [
+                    ReplaceOne({"_id": doc["_id"]}, {**doc, "archived_at": archived_at}, upsert=True)
+                    for doc in docs
+                ],
+                ordered=False,
+            )
+            # 修订先复制再删除：中断后重跑时记录仍在源集合，会重新复制
+            if with_revisions:
+                await self.archive_revisions(ids, archived_at)
+            result = await source.delete_many({"_id": {"$in": ids}, "is_deleted": True})
+            moved += result.deleted_count
+
+            if with_revisions:
+                # 期间被恢复的记录仍在源集合，保留其修订
+                remaining = set(await source.distinct("_id", {"_id": {"$in": ids}}))
+                await RecordRevision.get_motor_collection().delete_many(
+                    {"record_id": {"$in": [i for i in ids if i not in remaining]}}
+                )
+
+            if len(docs) < batch_size:
+                break
+
+        return moved
+
+    async def run_once(self, use_lock: bool = True) -> dict[str, int]:
+        """
+        执行一次归档
+
+        Returns:
+            {"unified_records": 120, "files": 8}；未获得锁时返回空字典
+        """
+        if use_lock and not await self._acquire_lock():
+            return {}
+
+        now = datetime.utcnow()
+        # 与记录和文件的 app_identifier 相同的规范化
+        overrides = {
+            UnifiedRecord.lowercase_identifier(app_identifier): days
+            for app_identifier, days in settings.retention_app_days.items()
+        }
+        # (保留天数, 应用筛选)
+        windows: list[tuple[int, dict[str, Any]]] = [
+            (days, {"app_identifier": app_identifier})
+            for app_identifier, days in overrides.items()
+        ]
+        windows.append(
+            (settings.retention_default_days, {"app_identifier": {"$nin": list(overrides)}})
+        )
+
+        targets = list(self.TARGETS) + [
+            (model, "unified_records_archive")
+            for model in (await record_partitions.all_models())[1:]
+        ]
+
+        summary: dict[str, int] = {}
+        for model, archive_name in targets:
+            source = model.get_motor_collection()
+            archive = source.database[archive_name]
+            await self.backfill_deleted_at(source)
+
+            moved = 0
+            for days, app_filter in windows:
+                if days <= 0:
+                    continue
+                moved += await self.archive_collection(
+                    source,
+                    archive,
+                    now - timedelta(days=days),
+                    app_filter,
+                    with_revisions=issubclass(model, UnifiedRecord),
+                )
+            summary[source.name] = moved
+
+        return summary
+
+    async def run_forever(self) -> None:
+        """定时执行归档 (在应用生命周期内作为后台任务运行)"""
+        while True:
+            try:
+                summary = await self.run_once()
+                if any(summary.values()):
+                    print(f"🗄️  Archived soft-deleted documents: {summary}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Retention job failed: {e}")
+
+            await asyncio.sleep(settings.retention_interval_seconds)
+
+    async def close(self) -> None:
+        """关闭 Redis 连接"""
+        if self._redis_client:
+            await self._redis_client.close()
+            self._redis_client = None
+
+
+# 全局单例
+retention_service = RetentionService()
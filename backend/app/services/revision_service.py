@@ -0,0 +1,227 @@
+"""
+Unified Backend Platform - Revision Service
+
+UnifiedRecord.payload 历史版本：反向增量存储、定期快照与任意版本还原
+"""
+from __future__ import annotations
+
+import copy
+from typing import Any
+from uuid import UUID
+
+from beanie.odm.utils.dump import get_dict
+from pymongo import ReplaceOne
+
+from app.core.config import get_settings
+from app.core.payload_compression import decode_stored_payload
+from app.models.record_revision import RecordRevision
+from app.models.unified_record import UnifiedRecord
+
+settings = get_settings()
+
+
+# ==============================================================================
+# 增量计算
+# ==============================================================================
+
+def compute_delta(source: dict[str, Any], target: dict[str, Any]) -> dict[str, Any]:
+    """
+    计算将 source 变为 target 所需的增量
+
+    嵌套对象逐键比较，列表和标量视为整体值。
+    路径为键列表，避免键名中的 "." 产生歧义。
+
+    Returns:
+        {"set": [[path, value], ...], "unset": [path, ...]}
+    """
+    delta: dict[str, Any] = {"set": [], "unset": []}
+    _diff(source, target, [], delta)
+    return delta
+
+
+def _diff(
+    source: dict[str, Any],
+    target: dict[str, Any],
+    path: list[str],
+    delta: dict[str, Any],
+) -> None:
+    for key, value in target.items():
+        if key not in source:
+            delta["set"].append([path + [key], value])
+        elif isinstance(value, dict) and isinstance(source[key], dict):
+            _diff(source[key], value, path + [key], delta)
+        elif source[key] != value:
+            delta["set"].append([path + [key], value])
+
+    for key in source:
+        if key not in target:
+            delta["unset"].append(path + [key])
+
+
+def apply_delta(document: dict[str, Any], delta: dict[str, Any]) -> dict[str, Any]:
+    """将增量应用到 document 的副本上"""
+    result = copy.deepcopy(document)
+
+    for path in delta.get("unset", []):
+        parent = result
+        for key in path[:-1]:
+            parent = parent.get(key)
+            if not isinstance(parent, dict):
+                break
+        else:
+            parent.pop(path[-1], None)
+
+    for path, value in delta.get("set", []):
+        parent = result
+        for key in path[:-1]:
+            if not isinstance(parent.get(key), dict):
+                parent[key] = {}
+            parent = parent[key]
+        parent[path[-1]] = copy.deepcopy(value)
+
+    return result
+
+
+# ==============================================================================
+# 服务
+# ==============================================================================
+
+class RevisionService:
+    """
+    记录历史版本服务
+
+    职责:
+    1. 更新记录时写入被替换版本的修订 (由 RecordBatchService 在记录写入的同一事务中调用)：
+       版本号为快照间隔的整数倍时保存完整 payload，否则保存反向增量
+    2. 还原任意历史版本：一次范围查询读取 [version, 最近快照] 之间的修订，
+       从快照 (或记录当前 payload) 开始逆向应用增量
+
+    修订 ID 为 "{record_id}:{version}"，写入使用 upsert。
+    """
+
+    @property
+    def enabled(self) -> bool:
+        """是否记录历史版本"""
+        return settings.record_revisions_enabled
+
+    @property
+    def snapshot_interval(self) -> int:
+        """快照间隔"""
+        return settings.record_revision_snapshot_interval
+
+    async def record_bulk_update(
+        self,
+        changes: list[tuple[dict[str, Any], dict[str, Any]]],
+        changed_by: UUID | None = None,
+        session: Any = None,
+    ) -> None:
+        """
+        写入被替换版本的修订 (一次 bulk_write)
+
+        payload 未变化的更新 (只修改标题、发布状态等) 不写入修订，还原时视为与下一版本相同。
+
+        Args:
+            changes: [(更新前的原始文档, 更新后的完整 payload)]
+            changed_by: 执行更新的用户 ID
+            session: 所属事务的会话 (可选)
+        """
+        if not self.enabled or not changes:
+            return
+
+        revisions = []
+        for doc, payload in changes:
+            previous = decode_stored_payload(doc)
+            if previous == payload:
+                continue
+            revisions.append(
+                self._build_revision(
+                    doc["_id"].as_uuid(), doc["version"], previous, payload, changed_by
+                )
+            )
+        if not revisions:
+            return
+
+        await RecordRevision.get_motor_collection().bulk_write(
+            [
+                ReplaceOne({"_id": revision.id}, get_dict(revision, to_db=True), upsert=True)
+                for revision in revisions
+            ],
+            ordered=False,
+            session=session,
+        )
+
+    def _build_revision(
+        self,
+        record_id: UUID,
+        previous_version: int,
+        previous_payload: dict[str, Any],
+        current_payload: dict[str, Any],
+        changed_by: UUID | None,
+    ) -> RecordRevision:
+        """构造被替换版本的修订：快照间隔的整数倍保存完整 payload，否则保存反向增量"""
+        revision = RecordRevision(
+            id=RecordRevision.make_id(record_id, previous_version),
+            record_id=record_id,
+            version=previous_version,
+            changed_by=changed_by,
+        )
+        if previous_version % self.snapshot_interval == 0:
+            revision.snapshot = previous_payload
+        else:
+            revision.delta = compute_delta(current_payload, previous_payload)
+        return revision
+
+    async def list_revisions(
+        self,
+        record: UnifiedRecord,
+        limit: int = 50,
+    ) -> list[RecordRevision]:
+        """按版本号倒序列出记录的修订"""
+        return (
+            await RecordRevision.find(RecordRevision.record_id == record.id)
+            .sort(-RecordRevision.version)
+            .limit(limit)
+            .to_list()
+        )
+
+    async def get_payload_at(
+        self,
+        record: UnifiedRecord,
+        version: int,
+    ) -> dict[str, Any]:
+        """
+        还原指定版本的 payload
+
+        Raises:
+            ValueError: 版本不存在
+        """
+        if version == record.version:
+            return record.payload
+        if version < 1 or version > record.version:
+            raise ValueError(f"Version {version} does not exist")
+
+        # 自 version 起向上读取，直到遇到快照 (通常不超过快照间隔条)；
+        # 缺少修订的版本是 payload 未变化的更新，与下一版本相同
+        chain: list[RecordRevision] = []
+        base: dict[str, Any] | None = None
+        async for revision in RecordRevision.find(
+            RecordRevision.record_id == record.id,
+            RecordRevision.version >= version,
+            RecordRevision.version < record.version,
+        ).sort(+RecordRevision.version):
+            if revision.is_snapshot:
+                base = revision.snapshot
+                break
+            chain.append(revision)
+
+        if base is None:
+            base = record.payload
+
+        payload = base
+        for revision in reversed(chain):
+            payload = apply_delta(payload, revision.delta or {})
+        return payload
+
+
+# 全局实例
+revision_service = RevisionService()
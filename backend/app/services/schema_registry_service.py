@@ -0,0 +1,274 @@
+"""
+Unified Backend Platform - Schema Registry Service
+
+payload JSON Schema 注册表：编译缓存、校验与耗时统计
+"""
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from typing import Any
+from uuid import UUID
+
+import fastjsonschema
+from pydantic import BaseModel, Field
+
+from app.core.config import get_settings
+from app.models.collection_schema import CollectionSchema
+
+settings = get_settings()
+
+
+class SchemaMetrics(BaseModel):
+    """单个 (app_identifier, collection_type) 的编译与校验统计"""
+
+    app_identifier: str
+    collection_type: str
+    schema_version: int | None = None
+    compile_count: int = 0
+    compile_ms_total: float = 0.0
+    last_compile_ms: float = 0.0
+    validation_count: int = 0
+    validation_failures: int = 0
+    validation_ms_total: float = 0.0
+    validation_ms_max: float = 0.0
+
+    @property
+    def validation_ms_avg(self) -> float:
+        """平均校验耗时"""
+        return self.validation_ms_total / self.validation_count if self.validation_count else 0.0
+
+
+class _CachedValidator(BaseModel):
+    """已编译的校验器 (validator 为 None 表示未注册或已停用)"""
+
+    checked_at: float
+    version: int | None = None
+    validator: Callable[[Any], Any] | None = Field(default=None, exclude=True)
+
+
+class SchemaRegistry:
+    """
+    payload Schema 注册表
+
+    职责:
+    1. 管理 collection_schemas 集合中的 JSON Schema
+    2. 将 Schema 用 fastjsonschema 编译为 Python 校验函数并缓存；
+       缓存过期后只比对 Schema 版本号，未变化时不重新编译
+    3. 在记录写入前校验 payload，统计编译和校验耗时
+
+    缓存和统计保存在进程内存中，每个 worker 独立；
+    其他 worker 修改 Schema 后，最迟 SCHEMA_CACHE_TTL 秒生效。
+    """
+
+    def __init__(self) -> None:
+        self._cache: dict[str, _CachedValidator] = {}
+        self._metrics: dict[str, SchemaMetrics] = {}
+
+    # ==============================================================================
+    # 编译
+    # ==============================================================================
+
+    @staticmethod
+    def compile(json_schema: dict[str, Any]) -> Callable[[Any], Any]:
+        """
+        编译 JSON Schema
+
+        不填充 default，校验不会修改 payload
+
+        Raises:
+            ValueError: Schema 本身无效
+        """
+        try:
+            return fastjsonschema.compile(json_schema, use_default=False)
+        except (fastjsonschema.JsonSchemaDefinitionException, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid JSON Schema: {e}") from e
+
+    @staticmethod
+    def _normalize(app_identifier: str, collection_type: str) -> tuple[str, str]:
+        """与 UnifiedRecord 相同的标识符规范化"""
+        return (
+            CollectionSchema.lowercase_identifier(app_identifier),
+            CollectionSchema.lowercase_identifier(collection_type),
+        )
+
+    def _get_metrics(self, app_identifier: str, collection_type: str) -> SchemaMetrics:
+        """获取 (或创建) 统计条目"""
+        key = CollectionSchema.make_id(app_identifier, collection_type)
+        metrics = self._metrics.get(key)
+        if metrics is None:
+            metrics = self._metrics[key] = SchemaMetrics(
+                app_identifier=app_identifier,
+                collection_type=collection_type,
+            )
+        return metrics
+
+    def _cache_schema(self, schema: CollectionSchema) -> Callable[[Any], Any]:
+        """编译并缓存 Schema"""
+        started = time.perf_counter()
+        validator = self.compile(schema.json_schema)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        metrics = self._get_metrics(schema.app_identifier, schema.collection_type)
+        metrics.schema_version = schema.version
+        metrics.compile_count += 1
+        metrics.compile_ms_total += elapsed_ms
+        metrics.last_compile_ms = elapsed_ms
+
+        self._cache[schema.id] = _CachedValidator(
+            checked_at=time.monotonic(),
+            version=schema.version,
+            validator=validator,
+        )
+        return validator
+
+    async def get_validator(
+        self,
+        app_identifier: str,
+        collection_type: str,
+    ) -> Callable[[Any], Any] | None:
+        """获取已编译的校验器，未注册或已停用时返回 None"""
+        app_identifier, collection_type = self._normalize(app_identifier, collection_type)
+        key = CollectionSchema.make_id(app_identifier, collection_type)
+        cached = self._cache.get(key)
+        if cached and time.monotonic() - cached.checked_at < settings.schema_cache_ttl:
+            return cached.validator
+
+        schema = await CollectionSchema.get(key)
+        if schema is None or not schema.is_enabled:
+            self._cache[key] = _CachedValidator(checked_at=time.monotonic())
+            return None
+
+        if cached and cached.validator and cached.version == schema.version:
+            cached.checked_at = time.monotonic()
+            return cached.validator
+
+        return self._cache_schema(schema)
+
+    # ==============================================================================
+    # 校验
+    # ==============================================================================
+
+    async def validate(
+        self,
+        app_identifier: str,
+        collection_type: str,
+        payload: dict[str, Any],
+    ) -> None:
+        """
+        按已注册的 Schema 校验 payload
+
+        Args:
+            app_identifier: 应用标识符
+            collection_type: 数据类型
+            payload: 待校验的业务数据
+
+        Raises:
+            ValueError: payload 不符合 Schema
+        """
+        if not settings.schema_validation_enabled:
+            return
+
+        validator = await self.get_validator(app_identifier, collection_type)
+        if validator is None:
+            return
+
+        metrics = self._get_metrics(*self._normalize(app_identifier, collection_type))
+        started = time.perf_counter()
+        try:
+            validator(payload)
+        except fastjsonschema.JsonSchemaValueException as e:
+            metrics.validation_failures += 1
+            raise ValueError(f"Payload does not match schema: {e.message}") from e
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            metrics.validation_count += 1
+            metrics.validation_ms_total += elapsed_ms
+            metrics.validation_ms_max = max(metrics.validation_ms_max, elapsed_ms)
+
+    def get_metrics(self) -> list[SchemaMetrics]:
+        """按校验总耗时倒序返回统计"""
+        return sorted(
+            self._metrics.values(),
+            key=lambda metrics: metrics.validation_ms_total,
+            reverse=True,
+        )
+
+    def reset_metrics(self) -> None:
+        """清空统计"""
+        self._metrics.clear()
+
+    # ==============================================================================
+    # 注册表管理
+    # ==============================================================================
+
+    async def list_schemas(self, app_identifier: str | None = None) -> list[CollectionSchema]:
+        """列出已注册的 Schema"""
+        filters = []
+        if app_identifier:
+            app_identifier = CollectionSchema.lowercase_identifier(app_identifier)
+            filters.append(CollectionSchema.app_identifier == app_identifier)
+        return await CollectionSchema.find(*filters).sort(+CollectionSchema.id).to_list()
+
+    async def get_schema(
+        self,
+        app_identifier: str,
+        collection_type: str,
+    ) -> CollectionSchema | None:
+        """获取已注册的 Schema"""
+        return await CollectionSchema.get(
+            CollectionSchema.make_id(*self._normalize(app_identifier, collection_type))
+        )
+
+    async def put_schema(
+        self,
+        app_identifier: str,
+        collection_type: str,
+        json_schema: dict[str, Any],
+        is_enabled: bool = True,
+        user_id: UUID | None = None,
+    ) -> CollectionSchema:
+        """
+        注册或替换 Schema (先编译确认 Schema 有效)
+
+        Raises:
+            ValueError: Schema 无效
+        """
+        self.compile(json_schema)
+
+        app_identifier, collection_type = self._normalize(app_identifier, collection_type)
+        schema = await self.get_schema(app_identifier, collection_type)
+        if schema is None:
+            schema = CollectionSchema(
+                id=CollectionSchema.make_id(app_identifier, collection_type),
+                app_identifier=app_identifier,
+                collection_type=collection_type,
+                json_schema=json_schema,
+                is_enabled=is_enabled,
+                created_by=user_id,
+            )
+        else:
+            schema.json_schema = json_schema
+            schema.is_enabled = is_enabled
+            schema.version += 1
+            schema.touch()
+        await schema.save()
+
+        if schema.is_enabled:
+            self._cache_schema(schema)
+        else:
+            self._cache.pop(schema.id, None)
+        return schema
+
+    async def delete_schema(self, app_identifier: str, collection_type: str) -> bool:
+        """删除 Schema，返回是否存在"""
+        schema = await self.get_schema(app_identifier, collection_type)
+        if schema is None:
+            return False
+        await schema.delete()
+        self._cache.pop(schema.id, None)
+        return True
+
+
+# 全局单例
+schema_registry = SchemaRegistry()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+列表页序列化吞吐量基准测试
+
+对比两条路径:
+  1. 默认路径: Beanie 文档 -> response_model 校验 -> model_dump -> json.dumps
+  2. 快速路径: Motor 原始文档 -> 响应结构 dict -> orjson
+
+不需要 MongoDB，使用构造的原始文档。
+
+使用方法:
+    cd backend
+    python scripts/benchmark_serialization.py --page-size 100 --payload-keys 20
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from uuid import uuid4
+
+from bson import Binary
+
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# 配置项必填字段，基准测试不会真正连接
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("CASDOOR_ORIGIN", "http://localhost:8000")
+
+from app.api.v1.schemas.record import UnifiedRecordListResponse  # noqa: E402
+from app.api.v1.serializers import record_document_to_response, render_page  # noqa: E402
+from app.models.unified_record import UnifiedRecord  # noqa: E402
+
+
+def make_raw_documents(count: int, payload_keys: int) -> list[dict]:
+    """构造 Motor 返回的原始文档 (UUID 为 BSON Binary)"""
+    now = datetime.utcnow().replace(microsecond=0)
+    return [
+        {
+            "_id": Binary.from_uuid(uuid4()),
+            "app_identifier": "blog-app",
+            "collection_type": "post",
+            "owner_id": Binary.from_uuid(uuid4()),
+            "payload": {
+                f"field_{i}": {"text": "x" * 32, "count": i, "tags": ["a", "b", "c"]}
+                for i in range(payload_keys)
+            },
+            "title": f"Record {n}",
+            "description": "benchmark record",
+            "is_deleted": False,
+            "is_published": True,
+            "created_at": now,
+            "updated_at": now,
+            "published_at": now,
+            "version": 1,
+            "view_count": n,
+        }
+        for n in range(count)
+    ]
+
+
+def default_path(docs: list[dict]) -> bytes:
+    """模拟 FastAPI 默认序列化流程 (pydantic v2: validate -> serialize -> json.dumps)"""
+    records = [
+        UnifiedRecord.model_construct(
+            **{**record_document_to_response(doc), "revision_id": None}
+        )
+        for doc in docs
+    ]
+    content = {
+        "total": len(records),
+        "page": 1,
+        "page_size": len(records),
+        "items": records,
+    }
+    validated = UnifiedRecordListResponse.model_validate(content, from_attributes=True)
+    return json.dumps(
+        validated.model_dump(mode="json"),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def fast_path(docs: list[dict]) -> bytes:
+    """Motor 原始文档 + orjson"""
+    return render_page(len(docs), 1, len(docs), map(record_document_to_response, docs))
+
+
+def bench(name: str, func, docs: list[dict], seconds: float) -> float:
+    """运行指定时长，返回每秒页数"""
+    func(docs)  # 预热
+    iterations = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        func(docs)
+        iterations += 1
+    elapsed = time.perf_counter() - start
+    pages_per_sec = iterations / elapsed
+    print(
+        f"  {name:<10} {pages_per_sec:10.1f} pages/s  "
+        f"{pages_per_sec * len(docs):12.0f} docs/s  "
+        f"{elapsed / iterations * 1000:8.3f} ms/page"
+    )
+    return pages_per_sec
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="列表页序列化基准测试")
+    parser.add_argument("--page-size", type=int, default=100, help="每页记录数")
+    parser.add_argument("--payload-keys", type=int, default=20, help="payload 顶层键数量")
+    parser.add_argument("--seconds", type=float, default=3.0, help="每条路径运行时长")
+    args = parser.parse_args()
+
+    docs = make_raw_documents(args.page_size, args.payload_keys)
+
+    # 两条路径输出应当等价
+    assert json.loads(default_path(docs)) == json.loads(fast_path(docs))
+
+    print(f"📊 page_size={args.page_size}, payload_keys={args.payload_keys}")
+    baseline = bench("default", default_path, docs, args.seconds)
+    fast = bench("orjson", fast_path, docs, args.seconds)
+    print(f"  ⚡ speedup: {fast / baseline:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+测试秒传持有证明的校验
+
+对象存储用内存桩代替，挑战保存在配置的 Redis 中 (每个挑战校验后即删除)，
+MongoDB 只用于初始化模型，不写入数据。
+
+使用方法:
+    cd backend
+    python scripts/test_instant_upload.py
+"""
+import asyncio
+import hashlib
+import io
+import os
+import sys
+from pathlib import Path
+
+from botocore.exceptions import ClientError
+
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.mongodb import mongodb  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.instant_upload_service import (  # noqa: E402
+    ContentMissingError,
+    instant_uploads,
+)
+from app.services.minio_service import minio_service  # noqa: E402
+
+BUCKET = "instant-upload-test"
+KEY = "instant-upload-test/object.bin"
+CONTENT = os.urandom(200_000)
+
+
+class RangeClient:
+    """按 Range 读取内存对象的 S3 客户端桩；error 不为空时返回该错误码"""
+
+    def __init__(self) -> None:
+        self.objects = {(BUCKET, KEY): CONTENT}
+        self.error: str | None = None
+
+    def get_object(self, Bucket: str, Key: str, Range: str) -> dict:
+        if self.error is not None:
+            raise ClientError({"Error": {"Code": self.error, "Message": self.error}}, "GetObject")
+        if (Bucket, Key) not in self.objects:
+            raise ClientError({"Error": {"Code": "NoSuchKey", "Message": Key}}, "GetObject")
+        start, end = (int(value) for value in Range.removeprefix("bytes=").split("-"))
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)][start : end + 1])}
+
+
+def check(name: str, passed: bool) -> bool:
+    print(f"{'✅' if passed else '❌'} {name}")
+    return passed
+
+
+async def issue(user: User) -> tuple[str, str, str]:
+    """签发挑战，返回 (挑战 ID, 正确证明, 错误证明)"""
+    challenge = await instant_uploads.issue_challenge(
+        {"file_size": len(CONTENT), "bucket_name": BUCKET, "storage_path": KEY},
+        {"filename": "object.bin"},
+        user,
+    )
+    if challenge is None:
+        raise RuntimeError("Redis is not available")
+    sample = CONTENT[challenge.offset : challenge.offset + challenge.length]
+    proof = hashlib.sha256(bytes.fromhex(challenge.nonce) + sample).hexdigest()
+    return challenge.challenge_id, proof, hashlib.sha256(b"guess").hexdigest()
+
+
+async def test_verify() -> bool:
+    client = RangeClient()
+    minio_service.s3_client = client
+    minio_service._initialized = True
+    user = User(casdoor_id="instant-upload-test", email="instant@example.com")
+
+    ok = True
+    challenge_id, proof, _ = await issue(user)
+    state = await instant_uploads.verify(challenge_id, proof, user)
+    ok &= check(
+        "correct proof returns the upload fields",
+        state is not None and state["filename"] == "object.bin",
+    )
+
+    try:
+        await instant_uploads.verify(challenge_id, proof, user)
+        ok &= check("challenge can be used once", False)
+    except ValueError:
+        ok &= check("challenge can be used once", True)
+
+    challenge_id, _, wrong = await issue(user)
+    state = await instant_uploads.verify(challenge_id, wrong, user)
+    ok &= check("wrong proof returns None", state is None)
+
+    # 签发挑战后对象被删除：调用方退回普通上传
+    challenge_id, proof, _ = await issue(user)
+    client.objects.clear()
+    try:
+        await instant_uploads.verify(challenge_id, proof, user)
+        ok &= check("deleted object raises ContentMissingError", False)
+    except ContentMissingError as e:
+        ok &= check("deleted object raises ContentMissingError", e.state["filename"] == "object.bin")
+
+    # 对象不存在以外的存储错误不当作证明失败
+    client.objects[(BUCKET, KEY)] = CONTENT
+    client.error = "AccessDenied"
+    challenge_id, proof, _ = await issue(user)
+    try:
+        await instant_uploads.verify(challenge_id, proof, user)
+        ok &= check("storage error is raised", False)
+    except ClientError:
+        ok &= check("storage error is raised", True)
+    return ok
+
+
+async def main() -> int:
+    await mongodb.connect()
+    try:
+        return 0 if await test_verify() else 1
+    finally:
+        await instant_uploads.close()
+        await mongodb.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
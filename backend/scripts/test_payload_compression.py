@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+测试压缩 payload 的延迟解压
+
+从数据库加载压缩记录后，不读取 payload 的保存不会解压；
+model_dump / 缓存 JSON 往返得到完整 payload。
+MongoDB 使用配置的数据库 (test-compression 应用)，测试结束后删除创建的记录。
+
+使用方法:
+    cd backend
+    python scripts/test_payload_compression.py
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+from bson import Binary
+
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import app.models.unified_record as unified_record_module  # noqa: E402
+from app.core.config import get_settings  # noqa: E402
+from app.core.payload_compression import decompress_payload  # noqa: E402
+from app.db.mongodb import mongodb  # noqa: E402
+from app.models.unified_record import UnifiedRecord  # noqa: E402
+
+settings = get_settings()
+
+APP = "test-compression"
+PAYLOAD = {"tag": "t", "body": "x" * 4096}
+
+decompress_calls = 0
+
+
+def counting_decompress(data: bytes) -> dict:
+    """统计解压次数"""
+    global decompress_calls
+    decompress_calls += 1
+    return decompress_payload(data)
+
+
+def check(name: str, passed: bool) -> bool:
+    print(f"{'✅' if passed else '❌'} {name}")
+    return passed
+
+
+async def test_lazy_payload() -> bool:
+    global decompress_calls
+    settings.payload_compression_enabled = True
+    settings.payload_compression_collections = {f"{APP}:*": ["tag"]}
+    settings.payload_compression_threshold = 64
+    unified_record_module.decompress_payload = counting_decompress
+
+    record = UnifiedRecord(app_identifier=APP, collection_type="post", payload=PAYLOAD)
+    await record.insert()
+    collection = UnifiedRecord.get_motor_collection()
+
+    ok = True
+    try:
+        raw = await collection.find_one({"_id": Binary.from_uuid(record.id)})
+        ok &= check(
+            "stored form keeps only filter keys",
+            raw["payload"] == {"tag": "t"} and raw["payload_compressed"] is not None,
+        )
+        ok &= check("inserted record keeps full payload", record.payload == PAYLOAD)
+
+        # 只修改元数据的保存：不解压、原样写回压缩数据
+        decompress_calls = 0
+        loaded = await UnifiedRecord.get(record.id)
+        loaded.title = "renamed"
+        await loaded.save()
+        raw = await collection.find_one({"_id": Binary.from_uuid(record.id)})
+        ok &= check(
+            "save without reading payload does not decompress",
+            decompress_calls == 0 and not loaded.payload_loaded,
+        )
+        ok &= check(
+            "save keeps stored form",
+            raw["title"] == "renamed"
+            and raw["payload"] == {"tag": "t"}
+            and decompress_payload(raw["payload_compressed"]) == PAYLOAD,
+        )
+
+        # dump / JSON 往返 (读穿透缓存) 解压一次，得到完整 payload
+        decompress_calls = 0
+        loaded = await UnifiedRecord.get(record.id)
+        dumped = loaded.model_dump()
+        restored = UnifiedRecord.model_validate_json(loaded.model_dump_json())
+        ok &= check(
+            "dump round-trip returns the full payload",
+            dumped["payload"] == PAYLOAD
+            and "stored_payload" not in dumped
+            and "payload_compressed" not in dumped
+            and restored.payload == PAYLOAD,
+        )
+        ok &= check("dump decompresses once", decompress_calls == 1)
+
+        # 修改 payload 后保存重新压缩
+        loaded.payload = {**PAYLOAD, "more": 1}
+        await loaded.save()
+        raw = await collection.find_one({"_id": Binary.from_uuid(record.id)})
+        ok &= check(
+            "modified payload is recompressed",
+            raw["payload"] == {"tag": "t"}
+            and decompress_payload(raw["payload_compressed"]) == {**PAYLOAD, "more": 1},
+        )
+    finally:
+        unified_record_module.decompress_payload = decompress_payload
+        await collection.delete_one({"_id": Binary.from_uuid(record.id)})
+    return ok
+
+
+async def main() -> int:
+    await mongodb.connect()
+    try:
+        return 0 if await test_lazy_payload() else 1
+    finally:
+        await mongodb.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+测试存储核对只把明确不存在的对象标记为 FAILED
+
+对象存储用内存桩代替 (HEAD 返回指定错误码)，MongoDB 使用配置的数据库，
+测试结束后删除创建的文件记录。
+
+使用方法:
+    cd backend
+    python scripts/test_storage_reconcile.py
+"""
+import asyncio
+import sys
+from pathlib import Path
+from uuid import uuid4
+
+from botocore.exceptions import ClientError
+
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import get_settings  # noqa: E402
+from app.db.mongodb import mongodb  # noqa: E402
+from app.models.file import File, FileStatus  # noqa: E402
+from app.services.download_service import download_service  # noqa: E402
+from app.services.minio_service import minio_service  # noqa: E402
+
+settings = get_settings()
+
+
+class HeadErrorClient:
+    """对测试对象的 HEAD 请求返回指定错误码的 S3 客户端桩 (其他对象视为存在)"""
+
+    def __init__(self, key: str, code: str):
+        self.key = key
+        self.code = code
+
+    def head_object(self, Bucket: str, Key: str) -> dict:
+        if Key != self.key:
+            return {}
+        raise ClientError({"Error": {"Code": self.code, "Message": self.code}}, "HeadObject")
+
+
+async def reconcile_with(code: str, file_record: File) -> tuple[str, FileStatus]:
+    """用返回 code 的存储核对一次，返回 (结果, 核对后的文件状态)"""
+    minio_service.s3_client = HeadErrorClient(file_record.storage_path, code)
+    await download_service._set_cursor(None)
+    try:
+        missing = await download_service.reconcile(use_lock=False)
+        outcome = "missing" if file_record.id in missing else "present"
+    except ClientError:
+        outcome = "error"
+    reloaded = await File.get(file_record.id)
+    return outcome, reloaded.status
+
+
+async def test_reconcile() -> bool:
+    """非 404 错误不修改文件状态，404 标记为 FAILED"""
+    settings.storage_reconcile_batch_size = 1_000_000
+    file_record = File(
+        app_identifier="reconcile-test",
+        filename="a.txt",
+        file_size=5,
+        content_type="text/plain",
+        file_extension="txt",
+        storage_path=f"reconcile-test/{uuid4()}.txt",
+        bucket_name=settings.minio_bucket,
+        status=FileStatus.COMPLETED,
+    )
+    await file_record.insert()
+
+    ok = True
+    try:
+        for code in ("403", "SlowDown", "500"):
+            outcome, file_status = await reconcile_with(code, file_record)
+            passed = outcome == "error" and file_status == FileStatus.COMPLETED
+            ok &= passed
+            print(f"{'✅' if passed else '❌'} HEAD {code}: {outcome}, status={file_status.value}")
+
+        outcome, file_status = await reconcile_with("404", file_record)
+        passed = outcome == "missing" and file_status == FileStatus.FAILED
+        ok &= passed
+        print(f"{'✅' if passed else '❌'} HEAD 404: {outcome}, status={file_status.value}")
+    finally:
+        await file_record.delete()
+    return ok
+
+
+async def main() -> int:
+    await mongodb.connect()
+    minio_service._initialized = True
+    try:
+        return 0 if await test_reconcile() else 1
+    finally:
+        await download_service.close()
+        await mongodb.disconnect()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
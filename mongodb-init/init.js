@@ -5,7 +5,7 @@
 // 功能:
 //   1. 创建业务数据库
 //   2. 创建应用专用数据库用户 (只读访问)
-//   3. 创建基础索引
+//   3. 索引由后端 IndexManager 管理 (backend/app/db/indexes.py)
 // =============================================================================
 
 // 获取环境变量
@@ -21,37 +21,13 @@ print(`🚀 初始化数据库: ${dbName}`);
 print('===================================================================');
 
 // =============================================================================
-// 1. 创建集合和索引
+// 1. 索引
 // =============================================================================
 
-print('\n📝 创建索引...');
-
-// users 集合索引
-db.users.createIndex({ casdoor_id: 1 }, { unique: true, name: 'idx_users_casdoor_id' });
-db.users.createIndex({ email: 1 }, { unique: true, sparse: true, name: 'idx_users_email' });
-db.users.createIndex({ role: 1 }, { name: 'idx_users_role' });
-db.users.createIndex({ created_at: -1 }, { name: 'idx_users_created_at' });
-print('  ✅ users 集合索引创建完成');
-
-// unified_records 集合索引
-db.unified_records.createIndex(
-  { app_identifier: 1, collection_type: 1, owner_id: 1 },
-  { name: 'idx_records_app_collection_owner' }
-);
-db.unified_records.createIndex({ app_identifier: 1, collection_type: 1 }, { name: 'idx_records_app_collection' });
-db.unified_records.createIndex({ owner_id: 1 }, { name: 'idx_records_owner' });
-db.unified_records.createIndex({ is_deleted: 1, created_at: -1 }, { name: 'idx_records_deleted_created' });
-db.unified_records.createIndex({ is_published: 1 }, { name: 'idx_records_published' });
-db.unified_records.createIndex({ title: 'text', description: 'text' }, { name: 'idx_records_text_search' });
-print('  ✅ unified_records 集合索引创建完成');
-
-// files 集合索引
-db.files.createIndex({ owner_id: 1 }, { name: 'idx_files_owner' });
-db.files.createIndex({ app_identifier: 1, category: 1 }, { name: 'idx_files_app_category' });
-db.files.createIndex({ is_deleted: 1, created_at: -1 }, { name: 'idx_files_deleted_created' });
-db.files.createIndex({ content_type: 1 }, { name: 'idx_files_content_type' });
-db.files.createIndex({ storage_path: 1 }, { unique: true, name: 'idx_files_storage_path' });
-print('  ✅ files 集合索引创建完成');
+// 索引统一在 backend/app/db/indexes.py 中声明，
+// 后端启动后会在后台创建缺失索引，漂移修复请执行:
+//   python scripts/reconcile_indexes.py --drop
+print('\n📝 索引由后端 IndexManager 管理 (backend/app/db/indexes.py)');
 
 // =============================================================================
 // 2. 插入初始数据 (可选)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Unified Backend Platform - Record Partition Migration Script
+
+将应用的 UnifiedRecord 从共享 unified_records 集合在线迁移到独立集合
+
+迁移过程中服务无需停机:
+  1. 写入 MIGRATING 路由并创建分区集合索引
+  2. 等待一个路由刷新间隔，确保所有 worker 已将新记录写入分区集合
+  3. 分批复制文档并删除未被并发修改的源文档，直到共享集合中没有该应用的数据
+  4. 切换为 ACTIVE，之后该应用只读写分区集合
+
+中断后重新执行即可继续。
+
+使用方法:
+    cd /home/gaooooosh/shared-database-service
+    python scripts/partition_records.py --list
+    python scripts/partition_records.py --app blog-app
+    python scripts/partition_records.py --app blog-app --batch-size 1000
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加 backend 目录到 Python 路径
+backend_dir = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from app.core.config import get_settings
+from app.db.mongodb import mongodb
+from app.services.record_partition_service import record_partitions
+
+settings = get_settings()
+
+
+async def main() -> None:
+    """主函数"""
+    parser = argparse.ArgumentParser(description="UnifiedRecord 按应用分区迁移")
+    parser.add_argument("--app", help="要迁移的应用标识符")
+    parser.add_argument("--batch-size", type=int, default=None, help="每批移动的文档数")
+    parser.add_argument("--list", action="store_true", help="列出路由表")
+    parser.add_argument(
+        "--no-wait",
+        action="store_true",
+        help="不等待 worker 刷新路由 (仅在服务已停止时使用)",
+    )
+    args = parser.parse_args()
+
+    if not args.list and not args.app:
+        parser.error("需要 --app 或 --list")
+
+    print("=" * 70)
+    print("Unified Backend Platform - 记录分区迁移")
+    print("=" * 70)
+
+    await mongodb.connect()
+    print(f"✅ 数据库已连接: {settings.mongodb_database}")
+
+    try:
+        if args.list:
+            for route in await record_partitions.list_routes():
+                print(
+                    f"  📁 {route.app_identifier} -> {route.collection_name} "
+                    f"[{route.status.value}] migrated={route.migrated_count}"
+                )
+            return
+
+        print(f"\n🔀 迁移应用: {args.app}")
+        if not args.no_wait:
+            print(f"⏳ 等待 {settings.record_partition_refresh_seconds}s 让所有 worker 刷新路由...")
+
+        route = await record_partitions.migrate(
+            args.app,
+            batch_size=args.batch_size,
+            wait_for_workers=not args.no_wait,
+            on_batch=lambda count: print(f"  📦 已迁移 {count} 条"),
+        )
+        print(f"\n✅ 迁移完成: {route.app_identifier} -> {route.collection_name}")
+        print(f"   共迁移 {route.migrated_count} 条记录")
+    finally:
+        await mongodb.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
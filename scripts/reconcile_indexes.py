@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Unified Backend Platform - Index Reconciliation Script
+
+将 MongoDB 实际索引与 backend/app/db/indexes.py 中的声明对账
+
+使用方法:
+    cd /home/gaooooosh/shared-database-service
+    python scripts/reconcile_indexes.py --dry-run   # 只报告漂移
+    python scripts/reconcile_indexes.py             # 后台创建缺失索引
+    python scripts/reconcile_indexes.py --drop      # 同时删除冗余前缀索引、重建不一致索引
+    python scripts/reconcile_indexes.py --drop --drop-unknown  # 另外删除所有未声明的索引
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加 backend 目录到 Python 路径
+backend_dir = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(backend_dir))
+
+from app.core.config import get_settings
+from app.db.index_manager import index_manager
+from app.db.mongodb import mongodb
+
+settings = get_settings()
+
+
+def print_report(report: dict) -> None:
+    """打印对账结果"""
+    for collection, result in report.items():
+        print(f"\n📁 {collection}")
+        for name in result["ok"]:
+            print(f"  ✅ {name}")
+        for name in result["missing"]:
+            print(f"  ➕ 缺失: {name}")
+        for name in result["mismatched"]:
+            print(f"  ⚠️  定义不一致: {name}")
+        for extra in result["extra"]:
+            if extra.get("retired"):
+                tag = "已停用"
+            elif extra["redundant"]:
+                tag = "冗余前缀"
+            else:
+                tag = "未声明"
+            print(f"  ➖ {tag}: {extra['name']} {extra['key']}")
+        if result.get("created"):
+            print(f"  🔨 已创建: {', '.join(result['created'])}")
+        if result.get("dropped"):
+            print(f"  🗑️  已删除: {', '.join(result['dropped'])}")
+
+
+async def main() -> None:
+    """主函数"""
+    parser = argparse.ArgumentParser(description="MongoDB 索引对账")
+    parser.add_argument("--dry-run", action="store_true", help="只报告，不修改")
+    parser.add_argument("--drop", action="store_true", help="删除冗余前缀索引并重建不一致索引")
+    parser.add_argument(
+        "--drop-unknown",
+        action="store_true",
+        help="同时删除其余未声明的索引 (包括手动创建的索引)",
+    )
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("Unified Backend Platform - 索引对账")
+    print("=" * 70)
+
+    await mongodb.connect()
+    print(f"✅ 数据库已连接: {settings.mongodb_database}")
+
+    try:
+        report = await index_manager.reconcile(
+            await mongodb.get_database(),
+            drop=args.drop,
+            dry_run=args.dry_run,
+            drop_unknown=args.drop_unknown,
+        )
+        print_report(report)
+    finally:
+        await mongodb.disconnect()
+
+    print("\n✅ 对账完成")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())